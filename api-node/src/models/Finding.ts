@@ -24,6 +24,7 @@ export interface IFinding extends Document {
   ruleId?: string;
   suppressed: boolean;
   suppressionReason?: string;
+  fingerprint?: string;
   metadata: any;
   createdAt: Date;
   updatedAt: Date;
@@ -79,6 +80,7 @@ const findingSchema = new Schema<IFinding>(
     ruleId: { type: String },
     suppressed: { type: Boolean, default: false, index: true },
     suppressionReason: { type: String },
+    fingerprint: { type: String },
     metadata: { type: Schema.Types.Mixed, default: {} },
   },
   {
@@ -87,5 +89,15 @@ const findingSchema = new Schema<IFinding>(
 );
 
 findingSchema.index({ repoId: 1, filePath: 1 });
+// The unique { runId, fingerprint } index that keeps a run's findings unique
+// across job retries is built by the worker (see worker-python
+// src/config/database.py), after removing duplicates older retries wrote.
+// Declaring it here too would race that cleanup and fail to build.
+
+// Fingerprints a PR has already reported, for the worker's cross-run dedup
+findingSchema.index(
+  { prId: 1, fingerprint: 1 },
+  { partialFilterExpression: { suppressed: false } }
+);
 
 export const Finding = model<IFinding>("Finding", findingSchema);
@@ -9,18 +9,43 @@ export interface IRun extends Document {
   startedAt?: Date;
   completedAt?: Date;
   durationMs?: number;
+  statsRecorded?: { day: Date; increments: Record<string, number> };
+  headSha?: string;
+  reviewMode: "full" | "incremental";
   tokenCountInput: number;
   tokenCountOutput: number;
   tokenCost: number;
   filesAnalyzed: number;
   linesAnalyzed: number;
   hunksAnalyzed: number;
+  diffTruncated: boolean;
+  filesOversized: number;
   findingsTotal: number;
   findingsStatic: number;
   findingsAi: number;
   findingsSuppressed: number;
+  findingsCarried: number;
   aiModelUsed?: string;
   aiTier?: string;
+  aiChunks: number;
+  aiHunksReviewed: number;
+  aiHunksTruncated: number;
+  aiHunksSkipped: {
+    filePath: string;
+    lineStart: number;
+    lineEnd: number;
+    score: number;
+    tokens: number;
+  }[];
+  aiChunksFailed: number;
+  aiFallbackChunks: number;
+  aiError?: string;
+  aiResponsesTruncated: number;
+  aiFirstFindingMs?: number;
+  aiCacheHits: number;
+  aiCacheMisses: number;
+  aiTokensSaved: number;
+  stageTimings?: Record<string, number>;
   runMode: RunMode;
   triggeredBy?: string;
   triggerEvent?: any;
@@ -47,18 +72,53 @@ const runSchema = new Schema<IRun>(
     startedAt: { type: Date },
     completedAt: { type: Date },
     durationMs: { type: Number },
+    statsRecorded: { type: Schema.Types.Mixed },
+    headSha: { type: String },
+    reviewMode: {
+      type: String,
+      enum: ["full", "incremental"],
+      default: "full",
+    },
     tokenCountInput: { type: Number, default: 0 },
     tokenCountOutput: { type: Number, default: 0 },
     tokenCost: { type: Number, default: 0 },
     filesAnalyzed: { type: Number, default: 0 },
     linesAnalyzed: { type: Number, default: 0 },
     hunksAnalyzed: { type: Number, default: 0 },
+    diffTruncated: { type: Boolean, default: false },
+    filesOversized: { type: Number, default: 0 },
     findingsTotal: { type: Number, default: 0 },
     findingsStatic: { type: Number, default: 0 },
     findingsAi: { type: Number, default: 0 },
     findingsSuppressed: { type: Number, default: 0 },
+    findingsCarried: { type: Number, default: 0 },
     aiModelUsed: { type: String },
     aiTier: { type: String },
+    aiChunks: { type: Number, default: 0 },
+    aiHunksReviewed: { type: Number, default: 0 },
+    aiHunksTruncated: { type: Number, default: 0 },
+    aiHunksSkipped: {
+      type: [
+        {
+          _id: false,
+          filePath: String,
+          lineStart: Number,
+          lineEnd: Number,
+          score: Number,
+          tokens: Number,
+        },
+      ],
+      default: [],
+    },
+    aiChunksFailed: { type: Number, default: 0 },
+    aiFallbackChunks: { type: Number, default: 0 },
+    aiError: { type: String },
+    aiResponsesTruncated: { type: Number, default: 0 },
+    aiFirstFindingMs: { type: Number },
+    aiCacheHits: { type: Number, default: 0 },
+    aiCacheMisses: { type: Number, default: 0 },
+    aiTokensSaved: { type: Number, default: 0 },
+    stageTimings: { type: Schema.Types.Mixed },
     runMode: {
       type: String,
       enum: Object.values(RunMode),
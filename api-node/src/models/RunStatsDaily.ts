@@ -0,0 +1,51 @@
+import { Schema, model, Document, Types } from "mongoose";
+
+// Daily run totals, maintained by the worker as runs finish. Documents
+// without a repoId hold the org-wide totals for the day.
+export interface IRunStatsDaily extends Document {
+  orgId: Types.ObjectId;
+  repoId?: Types.ObjectId | null;
+  day: Date;
+  runsTotal: number;
+  runsCompleted: number;
+  runsFailed: number;
+  runsSkipped: number;
+  durationMsTotal: number;
+  durationCount: number;
+  findingsTotal: number;
+  tokensIn: number;
+  tokensOut: number;
+  tokenCost: number;
+}
+
+const runStatsDailySchema = new Schema<IRunStatsDaily>(
+  {
+    orgId: {
+      type: Schema.Types.ObjectId,
+      ref: "Organization",
+      required: true,
+    },
+    repoId: { type: Schema.Types.ObjectId, ref: "Repository", default: null },
+    day: { type: Date, required: true },
+    runsTotal: { type: Number, default: 0 },
+    runsCompleted: { type: Number, default: 0 },
+    runsFailed: { type: Number, default: 0 },
+    runsSkipped: { type: Number, default: 0 },
+    durationMsTotal: { type: Number, default: 0 },
+    durationCount: { type: Number, default: 0 },
+    findingsTotal: { type: Number, default: 0 },
+    tokensIn: { type: Number, default: 0 },
+    tokensOut: { type: Number, default: 0 },
+    tokenCost: { type: Number, default: 0 },
+  },
+  {
+    collection: "run_stats_daily",
+  }
+);
+
+runStatsDailySchema.index({ orgId: 1, repoId: 1, day: 1 }, { unique: true });
+
+export const RunStatsDaily = model<IRunStatsDaily>(
+  "RunStatsDaily",
+  runStatsDailySchema
+);
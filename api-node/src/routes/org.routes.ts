@@ -3,8 +3,7 @@ import { z } from "zod";
 import { Organization } from "../models/Organization";
 import { Member } from "../models/Member";
 import { Repository } from "../models/Repository";
-import { PullRequest } from "../models/PullRequest";
-import { Run } from "../models/Run";
+import { RunStatsDaily } from "../models/RunStatsDaily";
 import { addRepoSyncJob } from "../config/redis";
 import { authenticateToken, AuthenticatedRequest } from "../middleware/auth";
 import { requireOrgMember, requireRole, RBACRequest } from "../middleware/rbac";
@@ -18,6 +17,9 @@ import { decrypt } from "../utils/crypto";
 
 const router = Router();
 
+// Window of the recent run stats on the org details
+const RUN_STATS_DAYS = 30;
+
 // Create organization from GitHub installation
 const createOrgSchema = z.object({
   installationId: z.number(),
@@ -248,16 +250,37 @@ router.get(
       });
       const memberCount = await Member.countDocuments({ orgId: org._id });
 
-      // Count runs across all repositories of this org
-      const repos = await Repository.find({ orgId: org._id }).select("_id");
-      const repoIds = repos.map((r) => r._id);
-
-      const prs = await PullRequest.find({ repoId: { $in: repoIds } }).select(
-        "_id"
-      );
-      const prIds = prs.map((p) => p._id);
-
-      const runCount = await Run.countDocuments({ prId: { $in: prIds } });
+      // Run stats come from the worker's daily org-wide rollups, so they
+      // cost one document per day rather than a scan of every PR and run.
+      // Runs are counted once finished (completed, failed or skipped).
+      const since = new Date();
+      since.setUTCHours(0, 0, 0, 0);
+      since.setUTCDate(since.getUTCDate() - (RUN_STATS_DAYS - 1));
+      const [runTotals] = await RunStatsDaily.aggregate([
+        { $match: { orgId: org._id, repoId: null } },
+        {
+          $group: {
+            _id: null,
+            runCount: { $sum: "$runsTotal" },
+            recentRuns: { $sum: { $cond: [{ $gte: ["$day", since] }, "$runsTotal", 0] } },
+            recentCompleted: {
+              $sum: { $cond: [{ $gte: ["$day", since] }, "$runsCompleted", 0] },
+            },
+            recentFailed: { $sum: { $cond: [{ $gte: ["$day", since] }, "$runsFailed", 0] } },
+            recentDurationMs: {
+              $sum: { $cond: [{ $gte: ["$day", since] }, "$durationMsTotal", 0] },
+            },
+            recentDurationCount: {
+              $sum: { $cond: [{ $gte: ["$day", since] }, "$durationCount", 0] },
+            },
+            recentFindings: {
+              $sum: { $cond: [{ $gte: ["$day", since] }, "$findingsTotal", 0] },
+            },
+            recentTokenCost: { $sum: { $cond: [{ $gte: ["$day", since] }, "$tokenCost", 0] } },
+          },
+        },
+      ]);
+      const runCount = runTotals?.runCount ?? 0;
 
       res.json({
         id: org._id,
@@ -275,6 +298,17 @@ router.get(
           enabledRepoCount,
           memberCount,
           runCount,
+          recentRuns: {
+            days: RUN_STATS_DAYS,
+            total: runTotals?.recentRuns ?? 0,
+            completed: runTotals?.recentCompleted ?? 0,
+            failed: runTotals?.recentFailed ?? 0,
+            avgDurationMs: runTotals?.recentDurationCount
+              ? Math.round(runTotals.recentDurationMs / runTotals.recentDurationCount)
+              : 0,
+            findings: runTotals?.recentFindings ?? 0,
+            tokenCost: runTotals?.recentTokenCost ?? 0,
+          },
         },
       });
     } catch (error) {
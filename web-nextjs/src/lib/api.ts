@@ -240,6 +240,15 @@ export interface OrganizationDetails extends Organization {
     enabledRepoCount: number;
     memberCount: number;
     runCount: number;
+    recentRuns: {
+      days: number;
+      total: number;
+      completed: number;
+      failed: number;
+      avgDurationMs: number;
+      findings: number;
+      tokenCost: number;
+    };
   };
 }
 
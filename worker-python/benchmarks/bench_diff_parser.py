@@ -0,0 +1,205 @@
+# ===========================================
+# Benchmark - Diff Parser
+# ===========================================
+#
+# Compares the native single-pass diff parser against the unidiff-based
+# one it replaced, on a corpus of real diffs taken from this repository's
+# git history (one `git show` per commit) plus the synthetic large diff.
+# Checks both parsers produce identical ParsedFiles for every diff, and
+# identical hunks from parse_patch for every file's patch, then reports throughput in MB/s, and the memory parsed hunks hold compared
+# with keeping their lines as (line_no, content) tuple lists. Run from worker-python/ inside the git
+# checkout, with the worker's environment configured:
+#
+#   python -m benchmarks.bench_diff_parser
+
+import gc
+import subprocess
+import time
+import tracemalloc
+
+from unidiff import PatchSet
+
+from src.pipeline.diff_processor import (
+    ParsedFile,
+    ParsedHunk,
+    detect_language,
+    parse_diff,
+    parse_patch,
+    should_exclude_file,
+)
+
+from .synthetic import generate_diff
+
+MAX_COMMITS = 200
+REPEATS = 5
+
+
+def load_corpus() -> list[str]:
+    """Real diffs: one per commit in the repository's history."""
+    shas = subprocess.run(
+        ["git", "rev-list", f"--max-count={MAX_COMMITS}", "HEAD"],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    corpus = []
+    for sha in shas:
+        diff = subprocess.run(
+            ["git", "show", "--format=", "--no-color", "--no-ext-diff", sha],
+            capture_output=True, text=True, errors="replace", check=True,
+        ).stdout
+        if diff:
+            corpus.append(diff)
+    return corpus
+
+
+def _strip_prefix(name: str, prefix: str) -> str:
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+
+def unidiff_parse_diff(diff_text: str, excluded_patterns=None) -> list[ParsedFile]:
+    """The previous unidiff-based parse_diff, for comparison."""
+    parsed_files = []
+    for patched_file in PatchSet(diff_text):
+        source, target = patched_file.source_file, patched_file.target_file
+        old_path = _strip_prefix(source, "a/") if source and source != "/dev/null" else None
+        path = _strip_prefix(target, "b/") if target and target != "/dev/null" else old_path
+        if path is None or should_exclude_file(path, excluded_patterns):
+            continue
+
+        hunks = []
+        for hunk in patched_file:
+            lines = []
+            for line in hunk:
+                if line.is_added:
+                    lines.append(("+", line.target_line_no, line.value.rstrip("\n")))
+                elif line.is_removed:
+                    lines.append(("-", line.source_line_no, line.value.rstrip("\n")))
+                elif line.is_context:
+                    lines.append((" ", line.target_line_no, line.value.rstrip("\n")))
+            hunks.append(ParsedHunk.from_lines(
+                hunk.source_start,
+                hunk.source_length,
+                hunk.target_start,
+                hunk.target_length,
+                lines,
+            ))
+
+        if patched_file.is_added_file:
+            status = "added"
+        elif patched_file.is_removed_file:
+            status = "deleted"
+        elif old_path and old_path != path:
+            status = "renamed"
+        else:
+            status = "modified"
+
+        parsed_files.append(ParsedFile(
+            path=path,
+            old_path=old_path,
+            status=status,
+            language=detect_language(path),
+            additions=patched_file.added,
+            deletions=patched_file.removed,
+            hunks=hunks,
+            is_binary=patched_file.is_binary_file,
+        ))
+    return parsed_files
+
+
+def unidiff_parse_patch(patch: str) -> list[ParsedHunk]:
+    """The previous unidiff-based parse_patch, for comparison."""
+    patch_set = PatchSet(f"--- a/file\n+++ b/file\n{patch}\n")
+    if not patch_set:
+        return []
+
+    hunks = []
+    for hunk in patch_set[0]:
+        lines = []
+        for line in hunk:
+            if line.is_added:
+                lines.append(("+", line.target_line_no, line.value.rstrip("\n")))
+            elif line.is_removed:
+                lines.append(("-", line.source_line_no, line.value.rstrip("\n")))
+            elif line.is_context:
+                lines.append((" ", line.target_line_no, line.value.rstrip("\n")))
+        hunks.append(ParsedHunk.from_lines(
+            hunk.source_start,
+            hunk.source_length,
+            hunk.target_start,
+            hunk.target_length,
+            lines,
+        ))
+    return hunks
+
+
+def file_patches(diff_text: str) -> list[str]:
+    """Each file's hunks, as the GitHub API returns them in `patch`."""
+    patches = []
+    for section in diff_text.split("\ndiff --git "):
+        start = section.find("\n@@ ")
+        if start >= 0:
+            patches.append(section[start + 1:].rstrip("\n"))
+    return patches
+
+
+def best_of(fn, corpus: list[str], repeats: int = REPEATS) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for diff in corpus:
+            fn(diff)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained_bytes(build) -> tuple[int, object]:
+    """Memory still allocated by build's result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def as_tuple_lists(files: list[ParsedFile]) -> list:
+    return [
+        (list(hunk.additions), list(hunk.deletions), list(hunk.context))
+        for file in files
+        for hunk in file.hunks
+    ]
+
+
+def main() -> None:
+    corpus = load_corpus()
+    synthetic = [generate_diff(100, 20, 25)]
+
+    print(f"{'corpus':>10} {'diffs':>6} {'MB':>7} {'unidiff MB/s':>13} {'native MB/s':>12} {'speedup':>8}")
+
+    for name, diffs in (("git log", corpus), ("synthetic", synthetic)):
+        for diff in diffs:
+            assert parse_diff(diff) == unidiff_parse_diff(diff), "parsers disagree"
+            for patch in file_patches(diff):
+                assert parse_patch(patch) == unidiff_parse_patch(patch), "patch parsers disagree"
+
+        megabytes = sum(len(diff.encode()) for diff in diffs) / 1e6
+        unidiff_time = best_of(unidiff_parse_diff, diffs)
+        native_time = best_of(parse_diff, diffs)
+        print(
+            f"{name:>10} {len(diffs):>6} {megabytes:>7.2f} "
+            f"{megabytes / unidiff_time:>13.1f} {megabytes / native_time:>12.1f} "
+            f"{unidiff_time / native_time:>7.1f}x"
+        )
+
+    diff = synthetic[0]
+    compact_bytes, files = retained_bytes(lambda: parse_diff(diff))
+    tuple_bytes, _ = retained_bytes(lambda: as_tuple_lists(files))
+    hunks = sum(len(file.hunks) for file in files)
+    print(
+        f"\n{hunks} hunks: {compact_bytes / 1e6:.1f} MB parsed, "
+        f"{tuple_bytes / 1e6:.1f} MB as tuple lists ({tuple_bytes / compact_bytes:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# ===========================================
+# Benchmark - Findings Persistence
+# ===========================================
+#
+# Compares saving a run's findings one at a time (save_finding, which
+# looks up the run with its links for every finding) against the bulk
+# save_findings_batch path, at several finding counts. Also checks that
+# saving the same run twice inserts nothing the second time. Needs a
+# MongoDB at MONGODB_URI; uses (and drops) a separate database. Run from
+# worker-python/ with the worker's environment configured:
+#
+#   python -m benchmarks.bench_findings_storage
+
+import asyncio
+import time
+from datetime import datetime
+
+import motor.motor_asyncio
+from beanie import init_beanie
+from bson import ObjectId
+from pymongo import monitoring
+
+from src.config import settings
+from src.filters.classifier import NormalizedFinding
+from src.models.Finding import Finding
+from src.models.Organization import Organization
+from src.models.PullRequest import PullRequest
+from src.models.Repository import Repository
+from src.models.Run import Run
+from src.output.storage import save_finding, save_findings_batch
+
+SIZES = [10, 100, 1000]
+BENCH_DB = f"{settings.mongodb_db_name}_bench"
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to MongoDB (round trips)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def started(self, event) -> None:
+        self.count += 1
+
+    def succeeded(self, event) -> None:
+        pass
+
+    def failed(self, event) -> None:
+        pass
+
+
+async def create_run(db) -> str:
+    """Insert a repository, PR and run to attach findings to."""
+    repo_id = (await db.repositories.insert_one({
+        "orgId": ObjectId(),
+        "githubRepoId": int(time.time_ns() % 2**31),
+        "name": "app",
+        "fullName": "acme/app",
+        "defaultBranch": "main",
+        "isPrivate": False,
+    })).inserted_id
+    pr_id = (await db.pull_requests.insert_one({
+        "repoId": repo_id,
+        "prNumber": 1,
+        "title": "Benchmark",
+        "headSha": "a" * 40,
+        "baseSha": "b" * 40,
+        "authorLogin": "bench",
+    })).inserted_id
+    run_id = (await db.runs.insert_one({
+        "prId": pr_id,
+        "status": "running",
+        "triggeredBy": "bench",
+        "created_at": datetime.utcnow(),
+    })).inserted_id
+    return str(run_id)
+
+
+def make_findings(run_id: str, count: int) -> list[NormalizedFinding]:
+    return [
+        NormalizedFinding(
+            run_id=run_id,
+            file_path=f"src/module_{i % 20}.py",
+            line_start=i + 1,
+            line_end=i + 1,
+            source="static",
+            category="security",
+            severity="high",
+            confidence="medium",
+            title="Hardcoded secret",
+            message="Possible hardcoded secret detected.",
+            suggestion=None,
+            code_snippet="api_key = '...'",
+            rule_id="SEC001",
+            ai_reasoning=None,
+            ai_model=None,
+            suppressed=False,
+            suppression_reason=None,
+            fingerprint=f"{run_id}:{i}",
+        )
+        for i in range(count)
+    ]
+
+
+async def timed(counter: CommandCounter, coro) -> tuple[float, int]:
+    counter.count = 0
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start, counter.count
+
+
+async def save_one_by_one(findings: list[NormalizedFinding]) -> None:
+    for finding in findings:
+        await save_finding(finding)
+
+
+async def main() -> None:
+    counter = CommandCounter()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri, event_listeners=[counter])
+    db = client[BENCH_DB]
+    await init_beanie(
+        database=db,
+        document_models=[Organization, Repository, PullRequest, Run, Finding],
+    )
+
+    print(
+        f"{'findings':>9} {'loop (ms)':>10} {'loop cmds':>10} "
+        f"{'bulk (ms)':>10} {'bulk cmds':>10} {'speedup':>8} {'retry inserted':>15}"
+    )
+
+    try:
+        for size in SIZES:
+            loop_time, loop_cmds = await timed(
+                counter, save_one_by_one(make_findings(await create_run(db), size))
+            )
+
+            run_id = await create_run(db)
+            findings = make_findings(run_id, size)
+            bulk_time, bulk_cmds = await timed(counter, save_findings_batch(findings))
+            retry_inserted = await save_findings_batch(findings)
+            assert await Finding.get_motor_collection().count_documents({"runId": ObjectId(run_id)}) == size
+
+            print(
+                f"{size:>9} {loop_time * 1000:>10.1f} {loop_cmds:>10} "
+                f"{bulk_time * 1000:>10.1f} {bulk_cmds:>10} "
+                f"{loop_time / bulk_time:>7.1f}x {retry_inserted:>15}"
+            )
+    finally:
+        await client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+# ===========================================
+# Benchmark - Static Rule Engine
+# ===========================================
+#
+# Compares the per-rule line loop against the compiled RuleMatcher on
+# synthetic large diffs. Run from worker-python/ with the worker's
+# environment configured:
+#
+#   python -m benchmarks.bench_static_rules
+
+import time
+
+from src.pipeline.diff_processor import parse_diff
+from src.rules.engine import run_static_analysis, RuleMatcher
+from src.rules.security import SECURITY_RULES
+from src.rules.quality import QUALITY_RULES
+from src.rules.performance import PERFORMANCE_RULES
+from src.rules.engine import ALL_RULES
+
+from .synthetic import generate_diff
+
+SIZES = [
+    # (files, hunks per file, lines per hunk)
+    (10, 10, 10),
+    (50, 10, 10),
+    (100, 20, 25),
+]
+
+REPEATS = 3
+
+
+def best_of(fn, repeats: int = REPEATS) -> tuple[float, object]:
+    """Run fn several times and return the best wall time and last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def check_matcher_equivalence(files) -> None:
+    """Every rule module must give identical per-line results when gated."""
+    rules = tuple(ALL_RULES + SECURITY_RULES + QUALITY_RULES + PERFORMANCE_RULES)
+    matcher = RuleMatcher(rules)
+    for file in files:
+        for hunk in file.hunks:
+            for line_no, content in hunk.additions:
+                gated = set(map(id, matcher.rules_for_line(content)))
+                for rule in rules:
+                    if id(rule) in gated:
+                        continue
+                    assert rule.check(file, hunk, line_no, content) is None, (rule.id, content)
+
+
+# Rules that are not line-scoped and so always run
+HUNK_RULES = [r.id for r in ALL_RULES if not r.line_scoped]
+
+
+def main() -> None:
+    print(f"{'rules':>6} {'lines':>8} {'per-rule (ms)':>14} {'compiled (ms)':>14} {'speedup':>8} {'findings':>9}")
+
+    for file_count, hunks, lines in SIZES:
+        files = parse_diff(generate_diff(file_count, hunks, lines))
+        added = sum(len(h.additions) for f in files for h in f.hunks)
+        check_matcher_equivalence(files)
+
+        for label, disabled in [("all", None), ("line", HUNK_RULES)]:
+            loop_time, loop_findings = best_of(
+                lambda: run_static_analysis(files, disabled_rules=disabled, compiled=False)
+            )
+            fast_time, fast_findings = best_of(
+                lambda: run_static_analysis(files, disabled_rules=disabled, compiled=True)
+            )
+            assert loop_findings == fast_findings, "compiled matcher changed findings"
+
+            print(
+                f"{label:>6} {added:>8} {loop_time * 1000:>14.1f} {fast_time * 1000:>14.1f} "
+                f"{loop_time / fast_time:>7.1f}x {len(fast_findings):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
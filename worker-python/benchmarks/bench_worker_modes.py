@@ -0,0 +1,129 @@
+# ===========================================
+# Benchmark - Worker Modes
+# ===========================================
+#
+# Compares per-job latency of the fork worker mode (a forked work-horse
+# running asyncio.run per job, as RQ's default Worker does) against the
+# persistent mode (jobs submitted to one long-lived event loop). Each job
+# makes a few GitHub-style requests through the pooled client against a
+# local keep-alive server and runs static analysis on a small diff. Run
+# from worker-python/ with the worker's environment configured:
+#
+#   python -m benchmarks.bench_worker_modes
+
+import asyncio
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The stub server speaks HTTP/1.1 only
+os.environ.setdefault("GITHUB_HTTP2", "false")
+
+from src.config import github_client
+from src.config import close_http_client, get_http_client
+from src.main import warm_caches
+from src.pipeline.diff_processor import parse_diff
+from src.rules.engine import analyze_files
+from src.worker import PersistentLoop
+
+from .synthetic import generate_diff
+
+JOBS = 20
+REQUESTS_PER_JOB = 5
+# Simulated server-side latency of a new connection (handshake cost)
+CONNECT_DELAY_SECONDS = 0.02
+
+
+class GitHubStub(BaseHTTPRequestHandler):
+    """Keep-alive server that charges a delay on each new connection."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        time.sleep(CONNECT_DELAY_SECONDS)
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args) -> None:
+        return
+
+
+DIFF = generate_diff(file_count=5, hunks_per_file=5, lines_per_hunk=10)
+
+
+async def job() -> None:
+    client = get_http_client()
+    for _ in range(REQUESTS_PER_JOB):
+        response = await client.get("/repos/acme/app/pulls/1")
+        response.raise_for_status()
+    analyze_files(parse_diff(DIFF))
+
+
+def run_fork_job() -> float:
+    """Fork a work-horse that runs one job in a fresh event loop."""
+    async def isolated_job() -> None:
+        try:
+            await job()
+        finally:
+            await close_http_client()
+
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            asyncio.run(isolated_job())
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    return time.perf_counter() - start
+
+
+def summarize(label: str, startup: float, latencies: list[float]) -> None:
+    ms = sorted(t * 1000 for t in latencies)
+    print(
+        f"{label:>10} {startup * 1000:>12.1f} {statistics.mean(ms):>10.1f} "
+        f"{ms[len(ms) // 2]:>9.1f} {ms[int(len(ms) * 0.95) - 1]:>9.1f}"
+    )
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GitHubStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    github_client.GITHUB_API_URL = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{'mode':>10} {'startup (ms)':>12} {'mean (ms)':>10} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+
+    # Fork: the parent warms caches (inherited by each child), but every
+    # job opens new connections on its own loop
+    start = time.perf_counter()
+    warm_caches()
+    startup = time.perf_counter() - start
+    summarize("fork", startup, [run_fork_job() for _ in range(JOBS)])
+
+    # Persistent: one loop and one connection pool for all jobs
+    start = time.perf_counter()
+    loop = PersistentLoop()
+    loop.start()
+    loop.run(asyncio.sleep(0))
+    startup = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(JOBS):
+        job_start = time.perf_counter()
+        loop.run(job())
+        latencies.append(time.perf_counter() - job_start)
+    loop.run(close_http_client())
+    loop.stop()
+    summarize("persistent", startup, latencies)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
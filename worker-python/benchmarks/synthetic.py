@@ -0,0 +1,87 @@
+# ===========================================
+# Python Worker - Synthetic Diff Generator
+# ===========================================
+
+import random
+
+# Mostly benign code with a sprinkling of lines that trip static rules
+BENIGN_LINES = [
+    "    result = compute_total(items, discount)",
+    "    if user.is_active and not user.is_banned:",
+    "        return render_template('index.html', user=user)",
+    "    const value = props.items ?? [];",
+    "    logger.info('Processed request', request_id=request_id)",
+    "    for (let i = 0; i < rows; i++) {",
+    "    total += item.price * item.quantity",
+    "    return response.json()",
+    "    }",
+    "",
+    "    # Normalize the input before validation",
+    "    self.cache[key] = value",
+    "    await queue.put(message)",
+    "    export function formatDate(date: Date): string {",
+]
+
+FLAGGED_LINES = [
+    "    cursor.execute(f\"SELECT * FROM users WHERE id = {user_id}\")",
+    "    api_key = \"abcd1234efgh5678ijkl\"",
+    "    digest = hashlib.md5(data).hexdigest()",
+    "    const names = users.map((u) => u.name);",
+    "    except: pass",
+    "    console.log('debug', payload)",
+    "    # TODO: remove once the migration lands",
+    "    os.system('rm -rf ' + path)",
+    "    element.innerHTML = html",
+    "    if retries > 250:",
+    "    rows = Session.query(User).all()",
+    "    for order in orders:",
+    "        html += '<li>'",
+]
+
+EXTENSIONS = [".py", ".ts", ".js", ".java", ".go"]
+
+
+def generate_diff(
+    file_count: int = 50,
+    hunks_per_file: int = 10,
+    lines_per_hunk: int = 10,
+    flagged_ratio: float = 0.05,
+    seed: int = 42,
+) -> str:
+    """Generate a unified diff of added/context lines for benchmarking."""
+    rng = random.Random(seed)
+    parts: list[str] = []
+
+    for f in range(file_count):
+        ext = EXTENSIONS[f % len(EXTENSIONS)]
+        path = f"src/module_{f}/file_{f}{ext}"
+        parts.append(f"diff --git a/{path} b/{path}\n")
+        parts.append("index 1111111..2222222 100644\n")
+        parts.append(f"--- a/{path}\n")
+        parts.append(f"+++ b/{path}\n")
+
+        old_line = 1
+        new_line = 1
+        for _ in range(hunks_per_file):
+            body: list[str] = []
+            old_count = 0
+            new_count = 0
+            for _ in range(lines_per_hunk):
+                roll = rng.random()
+                if roll < 0.2:
+                    body.append(" " + rng.choice(BENIGN_LINES) + "\n")
+                    old_count += 1
+                    new_count += 1
+                elif roll < 0.3:
+                    body.append("-" + rng.choice(BENIGN_LINES) + "\n")
+                    old_count += 1
+                else:
+                    pool = FLAGGED_LINES if rng.random() < flagged_ratio else BENIGN_LINES
+                    body.append("+" + rng.choice(pool) + "\n")
+                    new_count += 1
+            parts.append(f"@@ -{old_line},{old_count} +{new_line},{new_count} @@\n")
+            parts.extend(body)
+            old_line += old_count + 5
+            new_line += new_count + 5
+
+    return "".join(parts)
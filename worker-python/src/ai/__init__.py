@@ -1,4 +1,7 @@
-from .reviewer import run_ai_review, AIFinding, get_openai_client
+from .reviewer import run_ai_review, AIFinding
+from .clients import get_openai_client, close_openai_clients
+from .batching import plan_review_batches, BatchPlan, ReviewChunk
+from .cache import ReviewCache
 from .prompts import (
     build_review_prompt,
     build_security_prompt,
@@ -6,9 +9,26 @@ from .prompts import (
     load_prompt,
     estimate_tokens,
 )
+from .tokens import (
+    TokenBudget,
+    TokenCounter,
+    count_tokens,
+    get_token_budget,
+    get_token_counter,
+    truncate_tokens,
+)
+from .transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ReservedStream,
+    TokenRateLimiter,
+    create_chat_completion,
+    create_chat_completion_with_fallback,
+)
 from .models import (
     ModelTier,
     ModelConfig,
+    get_model_config,
     get_model_for_task,
     should_use_tier2,
     calculate_cost,
@@ -25,13 +45,31 @@ __all__ = [
     "run_ai_review",
     "AIFinding",
     "get_openai_client",
+    "close_openai_clients",
+    "plan_review_batches",
+    "BatchPlan",
+    "ReviewChunk",
+    "ReviewCache",
     "build_review_prompt",
     "build_security_prompt",
     "build_performance_prompt",
     "load_prompt",
     "estimate_tokens",
+    "TokenBudget",
+    "TokenCounter",
+    "count_tokens",
+    "get_token_budget",
+    "get_token_counter",
+    "truncate_tokens",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ReservedStream",
+    "TokenRateLimiter",
+    "create_chat_completion",
+    "create_chat_completion_with_fallback",
     "ModelTier",
     "ModelConfig",
+    "get_model_config",
     "get_model_for_task",
     "should_use_tier2",
     "calculate_cost",
@@ -0,0 +1,252 @@
+# ===========================================
+# Python Worker - AI Review Batch Planner
+# ===========================================
+
+from dataclasses import dataclass, field
+from typing import Optional
+import structlog
+
+from ..pipeline.diff_processor import ParsedFile, ParsedHunk, get_hunk_context
+from .tokens import TokenCounter, get_token_counter
+
+logger = structlog.get_logger(__name__)
+
+TRUNCATION_MARKER = "\n[Hunk truncated...]"
+MARKER_TOKENS = 16
+
+
+@dataclass
+class ChunkHunk:
+    """A hunk placed in a chunk."""
+    file: ParsedFile
+    hunk: ParsedHunk
+    tokens: int
+    truncated: bool
+
+
+@dataclass
+class ReviewChunk:
+    """A token-budgeted slice of the PR sent to the model in one request."""
+    sections: list[str] = field(default_factory=list)
+    file_paths: list[str] = field(default_factory=list)
+    hunks: list[ChunkHunk] = field(default_factory=list)
+    tokens: int = 0
+    hunk_count: int = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.sections)
+
+
+@dataclass
+class SkippedHunk:
+    """A hunk left out of the review by the input cap."""
+    file_path: str
+    line_start: int
+    line_end: int
+    score: float
+    tokens: int
+
+
+@dataclass
+class BatchPlan:
+    """Chunks to review plus coverage of the PR's hunks."""
+    chunks: list[ReviewChunk]
+    hunks_total: int
+    hunks_reviewed: int
+    hunks_truncated: int  # Cut to fit a chunk, or dropped by the input cap
+    skipped: list[SkippedHunk] = field(default_factory=list)
+
+
+def format_file_header(file: ParsedFile) -> str:
+    """Format the header introducing a file's hunks."""
+    header = f"\n## File: {file.path} ({file.language})\n"
+    header += f"Status: {file.status}, +{file.additions}/-{file.deletions}\n\n"
+    return header
+
+
+def format_hunk_section(index: int, hunk: ParsedHunk) -> str:
+    """Format a single hunk for the review prompt."""
+    return f"### Hunk {index + 1}:\n```\n{get_hunk_context(hunk)}\n```\n\n"
+
+
+@dataclass
+class FileSections:
+    """A file's prompt header and hunk sections, with their token counts."""
+    file: ParsedFile
+    header: str
+    header_tokens: int
+    sections: list[str]
+    section_tokens: list[int]
+
+
+def select_hunks(
+    prepared: list[FileSections],
+    scores: dict[int, float],
+    chunk_tokens: int,
+    max_input_tokens: int,
+) -> set[int]:
+    """
+    Pick hunks to fit max_input_tokens greedily by score per token, so the
+    riskiest code is reviewed first. Returns ids of the selected hunks.
+    """
+    candidates = []
+    for entry in prepared:
+        for hunk, tokens in zip(entry.file.hunks, entry.section_tokens):
+            # A hunk larger than a chunk is cut to about one chunk
+            cost = max(min(tokens, chunk_tokens), 1)
+            candidates.append((scores.get(id(hunk), 0.0) / cost, entry, hunk, cost))
+    candidates.sort(key=lambda c: c[0], reverse=True)
+
+    selected: set[int] = set()
+    headed: set[int] = set()
+    planned = 0
+    for _, entry, hunk, cost in candidates:
+        if id(entry) not in headed:
+            cost += entry.header_tokens
+        if planned + cost > max_input_tokens:
+            continue
+        selected.add(id(hunk))
+        headed.add(id(entry))
+        planned += cost
+    return selected
+
+
+def plan_review_batches(
+    files: list[ParsedFile],
+    chunk_tokens: int,
+    max_input_tokens: int,
+    counter: Optional[TokenCounter] = None,
+    scores: Optional[dict[int, float]] = None,
+) -> BatchPlan:
+    """
+    Split files into chunks of at most chunk_tokens each, counted with the
+    review model's tokenizer.
+
+    If the PR is over max_input_tokens and hunk scores are given (see
+    ai/ranking.py), the hunks with the most score per token are kept and
+    the rest skipped. Files are kept whole in one chunk where possible; a
+    file too large for any chunk is split at hunk boundaries with its
+    header repeated. A hunk larger than a chunk on its own is cut. Once
+    max_input_tokens have been planned, remaining hunks are dropped. Hunks
+    skipped or dropped are counted as truncated and listed in the plan.
+    """
+    counter = counter or get_token_counter()
+    chunks: list[ReviewChunk] = []
+    current = ReviewChunk()
+    planned_tokens = 0
+    hunks_reviewed = 0
+    hunks_truncated = 0
+    skipped: list[SkippedHunk] = []
+
+    def flush() -> None:
+        nonlocal current
+        if current.hunk_count:
+            chunks.append(current)
+        current = ReviewChunk()
+
+    def skip(file: ParsedFile, hunk: ParsedHunk, tokens: int) -> None:
+        nonlocal hunks_truncated
+        hunks_truncated += 1
+        skipped.append(SkippedHunk(
+            file_path=file.path,
+            line_start=hunk.new_start,
+            line_end=hunk.new_start + max(hunk.new_lines, 1) - 1,
+            score=round(scores.get(id(hunk), 0.0), 2) if scores else 0.0,
+            tokens=tokens,
+        ))
+
+    prepared = []
+    for file in files:
+        if file.is_binary or not file.hunks:
+            continue
+        header = format_file_header(file)
+        sections = [format_hunk_section(i, hunk) for i, hunk in enumerate(file.hunks)]
+        prepared.append(FileSections(
+            file=file,
+            header=header,
+            header_tokens=counter.count(header),
+            sections=sections,
+            section_tokens=[counter.count_cached(s) for s in sections],
+        ))
+    hunks_total = sum(len(entry.sections) for entry in prepared)
+
+    selected: Optional[set[int]] = None
+    total_tokens = sum(entry.header_tokens + sum(entry.section_tokens) for entry in prepared)
+    if scores is not None and total_tokens > max_input_tokens:
+        selected = select_hunks(prepared, scores, chunk_tokens, max_input_tokens)
+
+    for entry in prepared:
+        file, header, header_tokens = entry.file, entry.header, entry.header_tokens
+        hunks = list(zip(file.hunks, entry.sections, entry.section_tokens))
+        if selected is not None:
+            for hunk, _, tokens in hunks:
+                if id(hunk) not in selected:
+                    skip(file, hunk, tokens)
+            hunks = [h for h in hunks if id(h[0]) in selected]
+            if not hunks:
+                continue
+
+        # Move the whole file to a fresh chunk if it fits there but not here
+        file_tokens = header_tokens + sum(tokens for _, _, tokens in hunks)
+        if current.tokens + file_tokens > chunk_tokens and file_tokens <= chunk_tokens:
+            flush()
+
+        header_added = False
+        for hunk, section, tokens in hunks:
+            header_cost = 0 if header_added else header_tokens
+
+            if current.tokens + header_cost + tokens > chunk_tokens and current.hunk_count:
+                flush()
+                header_added = False
+                header_cost = header_tokens
+
+            # A hunk too large for an empty chunk is cut to fit
+            truncated = header_cost + tokens > chunk_tokens
+            if truncated:
+                keep_tokens = chunk_tokens - header_cost - MARKER_TOKENS
+                section = counter.truncate(section, keep_tokens) + TRUNCATION_MARKER + "\n```\n\n"
+                tokens = counter.count(section)
+
+            if planned_tokens + header_cost + tokens > max_input_tokens:
+                skip(file, hunk, tokens)
+                continue
+
+            if not header_added:
+                current.sections.append(header)
+                current.file_paths.append(file.path)
+                current.tokens += header_tokens
+                planned_tokens += header_tokens
+                header_added = True
+
+            current.sections.append(section)
+            current.hunks.append(ChunkHunk(file=file, hunk=hunk, tokens=tokens, truncated=truncated))
+            current.tokens += tokens
+            current.hunk_count += 1
+            planned_tokens += tokens
+
+            if truncated:
+                hunks_truncated += 1
+            else:
+                hunks_reviewed += 1
+
+    flush()
+
+    plan = BatchPlan(
+        chunks=chunks,
+        hunks_total=hunks_total,
+        hunks_reviewed=hunks_reviewed,
+        hunks_truncated=hunks_truncated,
+        skipped=skipped,
+    )
+
+    logger.info(
+        "Planned AI review batches",
+        chunk_count=len(chunks),
+        hunks_total=hunks_total,
+        hunks_reviewed=hunks_reviewed,
+        hunks_truncated=hunks_truncated,
+        hunks_skipped=len(skipped),
+        ranked=selected is not None,
+    )
+    return plan
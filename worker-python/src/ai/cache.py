@@ -0,0 +1,224 @@
+# ===========================================
+# Python Worker - AI Review Result Cache
+# ===========================================
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field, replace
+from typing import Optional
+import structlog
+
+from ..config import settings, get_async_redis_client
+from ..pipeline.diff_processor import ParsedFile, ParsedHunk
+from .batching import ChunkHunk, ReviewChunk
+
+logger = structlog.get_logger(__name__)
+
+# Bump when the cached entry format or what goes into the key changes
+CACHE_FORMAT_VERSION = "2"
+
+# AIFinding fields restored from the hunk and key rather than stored
+CACHED_FINDING_EXCLUDED = ("file_path", "line_start", "line_end", "ai_model")
+
+
+def prompt_version(prompt: str) -> str:
+    """Short hash identifying a system prompt's content."""
+    return hashlib.sha256(prompt.encode()).hexdigest()[:12]
+
+
+def normalize_hunk(hunk: ParsedHunk) -> str:
+    """
+    The hunk's lines in diff order, each as its kind and content without
+    line numbers or trailing whitespace, so the same change hashes alike
+    wherever it lands but reordered lines don't.
+    """
+    body = hunk.body
+    return "\n".join(
+        f"{chr(kind)}{body[start:end].rstrip()}"
+        for kind, start, end in zip(hunk.kinds, hunk.starts, hunk.ends)
+    )
+
+
+@dataclass
+class ReviewCacheLookup:
+    """Cached findings for a PR, and the files left to send to the model."""
+    findings: list[dict] = field(default_factory=list)  # AIFinding fields but ai_model
+    files: list[ParsedFile] = field(default_factory=list)
+    hits: int = 0
+    misses: int = 0
+    tokens_saved: int = 0
+
+
+class ReviewCache:
+    """
+    Per-hunk AI review results in Redis.
+
+    Entries are keyed by the normalized hunk content and file language
+    plus the model, AI mode and prompt version, and hold the findings the
+    model reported on the hunk with lines relative to its start. Entries
+    expire after AI_CACHE_TTL_SECONDS; hits extend their TTL, so with a
+    volatile-lru maxmemory policy cold entries are evicted first.
+    """
+
+    def __init__(self, model: str, ai_mode: str, system_prompt: str) -> None:
+        self.scope = f"{CACHE_FORMAT_VERSION}|{model}|{ai_mode}|{prompt_version(system_prompt)}"
+        self._keys: dict[int, str] = {}
+
+    def key(self, file: ParsedFile, hunk: ParsedHunk) -> str:
+        cached = self._keys.get(id(hunk))
+        if cached is None:
+            raw = f"{self.scope}|{file.language}|{normalize_hunk(hunk)}"
+            cached = f"ai:review:{hashlib.sha256(raw.encode()).hexdigest()}"
+            self._keys[id(hunk)] = cached
+        return cached
+
+    async def lookup(self, files: list[ParsedFile]) -> ReviewCacheLookup:
+        """Get cached findings for the PR's hunks; misses are left to review."""
+        result = ReviewCacheLookup()
+        hunks = [
+            (file, hunk)
+            for file in files
+            if not file.is_binary
+            for hunk in file.hunks
+        ]
+        if not hunks:
+            result.files = files
+            return result
+
+        keys = [self.key(file, hunk) for file, hunk in hunks]
+        try:
+            redis = get_async_redis_client()
+            values = await redis.mget(keys)
+        except Exception as e:
+            logger.warning("AI review cache unavailable", error=str(e))
+            values = [None] * len(keys)
+
+        hit_keys = []
+        missed: dict[int, list[ParsedHunk]] = {}
+        for (file, hunk), key, value in zip(hunks, keys, values):
+            entry = _decode_entry(key, value)
+            if entry is None:
+                missed.setdefault(id(file), []).append(hunk)
+                result.misses += 1
+                continue
+
+            hit_keys.append(key)
+            result.hits += 1
+            result.tokens_saved += entry["tokens"]
+            for raw in entry["findings"]:
+                start_offset = raw.pop("line_start_offset")
+                end_offset = raw.pop("line_end_offset")
+                result.findings.append({
+                    **raw,
+                    "file_path": file.path,
+                    "line_start": hunk.new_start + start_offset,
+                    "line_end": None if end_offset is None else hunk.new_start + end_offset,
+                })
+
+        result.files = [
+            replace(file, hunks=missed[id(file)])
+            for file in files
+            if id(file) in missed
+        ]
+
+        if hit_keys:
+            await self._touch(hit_keys)
+
+        logger.info(
+            "AI review cache lookup",
+            hits=result.hits,
+            misses=result.misses,
+            tokens_saved=result.tokens_saved,
+        )
+        return result
+
+    async def store(self, chunk: ReviewChunk, findings: list, usage: dict) -> None:
+        """
+        Cache a reviewed chunk's findings per hunk; cut hunks are skipped.
+        
+        If any finding lies outside the chunk's hunks, nothing is cached:
+        replaying the hunks alone would lose it.
+        """
+        by_hunk: dict[int, list] = {id(placed.hunk): [] for placed in chunk.hunks}
+        for finding in findings:
+            placed = _find_hunk(chunk, finding.file_path, finding.line_start)
+            if placed is None:
+                logger.info(
+                    "Not caching AI review chunk with a finding outside its hunks",
+                    file_path=finding.file_path,
+                    line_start=finding.line_start,
+                )
+                return
+            by_hunk[id(placed.hunk)].append(finding)
+
+        # Output tokens are shared out by each hunk's share of the input
+        tokens_out = usage.get("tokens_out", 0)
+        entries = {}
+        for placed in chunk.hunks:
+            if placed.truncated:
+                continue
+            start = placed.hunk.new_start
+            entries[self.key(placed.file, placed.hunk)] = json.dumps({
+                "tokens": placed.tokens + tokens_out * placed.tokens // max(chunk.tokens, 1),
+                "findings": [
+                    {
+                        **{
+                            k: v for k, v in asdict(finding).items()
+                            if k not in CACHED_FINDING_EXCLUDED
+                        },
+                        "line_start_offset": finding.line_start - start,
+                        "line_end_offset": None if finding.line_end is None else finding.line_end - start,
+                    }
+                    for finding in by_hunk[id(placed.hunk)]
+                ],
+            })
+
+        if not entries:
+            return
+        try:
+            redis = get_async_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, value in entries.items():
+                    pipe.set(key, value, ex=settings.ai_cache_ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Failed to cache AI review results", error=str(e))
+
+    async def _touch(self, keys: list[str]) -> None:
+        try:
+            redis = get_async_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.expire(key, settings.ai_cache_ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Failed to refresh AI review cache TTLs", error=str(e))
+
+
+def _decode_entry(key: str, value: Optional[bytes]) -> Optional[dict]:
+    """Decode a cache entry; a corrupt one counts as a miss."""
+    if not value:
+        return None
+    try:
+        entry = json.loads(value)
+        valid = isinstance(entry["tokens"], int) and all(
+            isinstance(raw, dict) and "line_start_offset" in raw and "line_end_offset" in raw
+            for raw in entry["findings"]
+        )
+    except (ValueError, TypeError, KeyError):
+        valid = False
+    if not valid:
+        logger.warning("Ignoring corrupt AI review cache entry", key=key)
+        return None
+    return entry
+
+
+def _find_hunk(chunk: ReviewChunk, file_path: str, line: int) -> Optional[ChunkHunk]:
+    """Find the chunk's hunk containing a line, if any."""
+    for placed in chunk.hunks:
+        if placed.file.path != file_path:
+            continue
+        start = placed.hunk.new_start
+        if start <= line < start + max(placed.hunk.new_lines, 1):
+            return placed
+    return None
@@ -0,0 +1,99 @@
+# ===========================================
+# Python Worker - LLM Client Registry
+# ===========================================
+
+import asyncio
+import hashlib
+from typing import Optional
+import httpx
+import structlog
+from openai import AsyncOpenAI
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+_clients: dict[tuple[str, str], AsyncOpenAI] = {}
+_clients_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _key_id(api_key: str) -> str:
+    """Short fingerprint of an API key, for logs."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:8]
+
+
+def _create_openai_client(base_url: str, api_key: str) -> AsyncOpenAI:
+    timeout = httpx.Timeout(
+        settings.ai_request_timeout_seconds,
+        connect=settings.ai_connect_timeout_seconds,
+    )
+    http_client = httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings.ai_max_connections,
+            max_keepalive_connections=settings.ai_max_keepalive,
+            keepalive_expiry=settings.ai_keepalive_expiry_seconds,
+        ),
+    )
+    # Retries are left to the transport (see ai/transport.py)
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout,
+        max_retries=0,
+        http_client=http_client,
+    )
+
+
+def get_openai_client(
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> AsyncOpenAI:
+    """
+    Get the worker's pooled client for an OpenAI-compatible API, by base
+    URL and API key (default AI_BASE_URL and AI_API_KEY), so several
+    providers can be routed to at once.
+
+    Like the GitHub HTTP client, connections are bound to the event loop
+    that opened them, so the clients are recreated when the loop changes.
+    """
+    global _clients_loop
+
+    base_url = base_url or settings.ai_base_url
+    api_key = api_key or settings.ai_api_key
+
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        _clients.clear()
+        _clients_loop = loop
+
+    key = (base_url, api_key)
+    client = _clients.get(key)
+    if client is None or client.is_closed():
+        client = _clients[key] = _create_openai_client(base_url, api_key)
+        logger.info(
+            "AI client initialized",
+            base_url=base_url,
+            api_key_id=_key_id(api_key),
+            max_connections=settings.ai_max_connections,
+        )
+
+    return client
+
+
+async def close_openai_clients() -> None:
+    """Close every pooled AI client."""
+    global _clients_loop
+
+    if not _clients:
+        return
+    # Clients from a loop that has since closed can't be closed cleanly
+    if _clients_loop is asyncio.get_running_loop():
+        await asyncio.gather(
+            *[client.close() for client in _clients.values()],
+            return_exceptions=True,
+        )
+    count = len(_clients)
+    _clients.clear()
+    _clients_loop = None
+    logger.info("AI clients closed", count=count)
@@ -25,6 +25,7 @@ class ModelConfig:
     context_window: int
     cost_per_1k_input: float
     cost_per_1k_output: float
+    tokenizer: Optional[str] = None  # tiktoken encoding; None if the family has no public one
 
 
 AVAILABLE_MODELS = {
@@ -36,6 +37,34 @@ AVAILABLE_MODELS = {
         context_window=128000,
         cost_per_1k_input=0.01,
         cost_per_1k_output=0.03,
+        tokenizer="cl100k_base",
+    ),
+    "gpt-4-turbo": ModelConfig(
+        name="openai/gpt-4-turbo",
+        tier=ModelTier.TIER_2,
+        max_tokens=4096,
+        context_window=128000,
+        cost_per_1k_input=0.01,
+        cost_per_1k_output=0.03,
+        tokenizer="cl100k_base",
+    ),
+    "gpt-4o": ModelConfig(
+        name="gpt-4o",
+        tier=ModelTier.TIER_2,
+        max_tokens=16384,
+        context_window=128000,
+        cost_per_1k_input=0.0025,
+        cost_per_1k_output=0.01,
+        tokenizer="o200k_base",
+    ),
+    "gpt-4o-mini": ModelConfig(
+        name="gpt-4o-mini",
+        tier=ModelTier.TIER_1,
+        max_tokens=16384,
+        context_window=128000,
+        cost_per_1k_input=0.00015,
+        cost_per_1k_output=0.0006,
+        tokenizer="o200k_base",
     ),
     "gpt-3.5-turbo": ModelConfig(
         name="gpt-3.5-turbo",
@@ -44,6 +73,7 @@ AVAILABLE_MODELS = {
         context_window=16385,
         cost_per_1k_input=0.0005,
         cost_per_1k_output=0.0015,
+        tokenizer="cl100k_base",
     ),
     # Anthropic via OpenRouter
     "claude-3-sonnet": ModelConfig(
@@ -74,6 +104,21 @@ AVAILABLE_MODELS = {
 }
 
 
+def get_model_config(model: str) -> Optional[ModelConfig]:
+    """
+    Look up a model by key or by name, with or without its provider prefix
+    (e.g. "gpt-3.5-turbo", "openai/gpt-3.5-turbo", "anthropic/claude-3-haiku").
+    """
+    if model in AVAILABLE_MODELS:
+        return AVAILABLE_MODELS[model]
+    
+    bare = model.rsplit("/", 1)[-1]
+    for key, config in AVAILABLE_MODELS.items():
+        if model == config.name or bare == key or bare == config.name.rsplit("/", 1)[-1]:
+            return config
+    return None
+
+
 def get_model_for_task(
     task_type: str,
     ai_mode: str,
@@ -9,6 +9,105 @@ import structlog
 
 logger = structlog.get_logger(__name__)
 
+# Characters the streaming parser acts on; everything else is skipped
+STRUCTURAL_CHARS = re.compile(r'["\\\[\]{}]')
+
+
+class StreamingFindingParser:
+    """
+    Incremental, tolerant parser for a findings response.
+    
+    Fed the response text as it arrives, it returns each finding as soon
+    as its closing brace is seen. Findings are the objects in the
+    outermost JSON array, whether the response is a bare array or an
+    object with a findings array, with or without a markdown fence or
+    prose around it. Anything after the last complete finding, such as a
+    response cut off at max_tokens, is ignored. Only the finding being
+    read is buffered.
+    """
+    
+    def __init__(self):
+        self._buffer = ''
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._array_depth: Optional[int] = None  # Stack depth of the findings array
+        self._finding_start: Optional[int] = None
+        self.complete = False  # A top-level JSON value has been closed
+        self.found_array = False  # A findings array has been opened
+    
+    def feed(self, text: str) -> list[dict]:
+        """Add response text; returns the findings completed by it."""
+        buffer = self._buffer + text
+        pos = len(self._buffer)
+        if self._escaped and pos < len(buffer):
+            self._escaped = False
+            pos += 1
+        
+        findings = []
+        stack = self._stack
+        while True:
+            match = STRUCTURAL_CHARS.search(buffer, pos)
+            if match is None:
+                break
+            char = match.group()
+            index = match.start()
+            pos = index + 1
+            
+            if self._in_string:
+                if char == '\\':
+                    if pos < len(buffer):
+                        pos += 1
+                    else:
+                        self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                # Quotes outside any JSON value are prose
+                self._in_string = bool(stack)
+            elif char in '[{':
+                stack.append(char)
+                if char == '[' and self._array_depth is None:
+                    self._array_depth = len(stack)
+                    self.found_array = True
+                elif char == '{' and self._array_depth is not None and len(stack) == self._array_depth + 1:
+                    self._finding_start = index
+            elif stack:
+                stack.pop()
+                if char == '}' and self._finding_start is not None and len(stack) == self._array_depth:
+                    finding = self._decode(buffer[self._finding_start:pos])
+                    if finding is not None:
+                        findings.append(finding)
+                    self._finding_start = None
+                elif char == ']' and self._array_depth is not None and len(stack) < self._array_depth:
+                    # Findings array closed; a later array may hold more
+                    self._array_depth = None
+                if not stack:
+                    self.complete = True
+        
+        if self._finding_start is None:
+            self._buffer = ''
+        else:
+            self._buffer = buffer[self._finding_start:]
+            self._finding_start = 0
+        return findings
+    
+    @staticmethod
+    def _decode(text: str) -> Optional[dict]:
+        try:
+            finding = json.loads(text)
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed finding in AI response", length=len(text))
+            return None
+        return finding if isinstance(finding, dict) else None
+
+
+def parse_partial_findings(response_text: str) -> list[dict]:
+    """Get the complete findings of a response, even if it was cut off."""
+    return StreamingFindingParser().feed(response_text)
+
 
 def extract_json_from_response(response_text: str) -> Optional[list[dict]]:
     """
@@ -41,6 +140,12 @@ def extract_json_from_response(response_text: str) -> Optional[list[dict]]:
     except json.JSONDecodeError:
         pass
     
+    # Keep the complete findings of a truncated response
+    findings = parse_partial_findings(response_text)
+    if findings:
+        logger.warning("Recovered findings from incomplete JSON response", count=len(findings))
+        return findings
+    
     logger.warning("Could not extract JSON from response")
     return None
 
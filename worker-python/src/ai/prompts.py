@@ -5,13 +5,18 @@
 import os
 from pathlib import Path
 from functools import lru_cache
+from typing import Optional
 
 
 from ..config.settings import settings
+from .tokens import count_tokens, truncate_tokens
 
 
 PROMPT_DIR = Path(settings.prompts_dir)
 
+# Tokens of diff included in a single-prompt review
+PROMPT_DIFF_TOKENS = 2000
+
 
 @lru_cache(maxsize=10)
 def load_prompt(prompt_name: str) -> str:
@@ -62,6 +67,7 @@ def build_review_prompt(
     language: str,
     context: str = "",
     static_signals: list[dict] = None,
+    model: Optional[str] = None,
 ) -> str:
     """Build the full prompt for code review."""
     base_prompt = load_prompt("review")
@@ -92,7 +98,7 @@ def build_review_prompt(
     parts.extend([
         "## Code Changes",
         "```diff",
-        diff_content[:8000],  # Truncate very large diffs
+        truncate_tokens(diff_content, PROMPT_DIFF_TOKENS, model),  # Truncate very large diffs
         "```",
         "",
         "## Response Format",
@@ -117,7 +123,7 @@ def build_review_prompt(
     return "\n".join(parts)
 
 
-def build_security_prompt(diff_content: str, language: str) -> str:
+def build_security_prompt(diff_content: str, language: str, model: Optional[str] = None) -> str:
     """Build security-focused review prompt."""
     base_prompt = load_prompt("security")
     
@@ -127,13 +133,13 @@ def build_security_prompt(diff_content: str, language: str) -> str:
 
 ## Code Changes
 ```diff
-{diff_content[:8000]}
+{truncate_tokens(diff_content, PROMPT_DIFF_TOKENS, model)}
 ```
 
 Respond with JSON array of security findings with CWE IDs."""
 
 
-def build_performance_prompt(diff_content: str, language: str) -> str:
+def build_performance_prompt(diff_content: str, language: str, model: Optional[str] = None) -> str:
     """Build performance-focused review prompt."""
     base_prompt = load_prompt("performance")
     
@@ -143,12 +149,12 @@ def build_performance_prompt(diff_content: str, language: str) -> str:
 
 ## Code Changes
 ```diff
-{diff_content[:8000]}
+{truncate_tokens(diff_content, PROMPT_DIFF_TOKENS, model)}
 ```
 
 Respond with JSON array of performance findings with impact estimates."""
 
 
-def estimate_tokens(text: str) -> int:
-    """Rough estimate of token count (about 4 chars per token)."""
-    return len(text) // 4
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of text with the model's tokenizer (see ai/tokens.py)."""
+    return count_tokens(text, model)
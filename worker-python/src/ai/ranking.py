@@ -0,0 +1,132 @@
+# ===========================================
+# Python Worker - AI Review Hunk Ranking
+# ===========================================
+
+import math
+import re
+from typing import Optional
+import structlog
+
+from ..pipeline.diff_processor import ParsedFile, ParsedHunk
+from ..pipeline.path_classifier import get_path_classifier
+
+logger = structlog.get_logger(__name__)
+
+# Score added per static finding on a hunk, by severity
+STATIC_FINDING_SCORES = {"block": 8.0, "high": 5.0, "medium": 3.0, "low": 1.0}
+
+# Path keywords of security-sensitive code
+SECURITY_PATH_PATTERN = re.compile(
+    r"auth|password|passwd|token|secret|crypto|sql|injection|session|permission|"
+    r"oauth|login|payment|billing|admin",
+    re.IGNORECASE,
+)
+SECURITY_PATH_SCORE = 3.0
+
+# Language adjustments: memory-unsafe or security-sensitive languages up,
+# markup and data down
+LANGUAGE_SCORES = {
+    "c": 1.5,
+    "cpp": 1.5,
+    "go": 1.0,
+    "rust": 1.0,
+    "java": 1.0,
+    "php": 1.0,
+    "sql": 1.0,
+    "json": -1.0,
+    "yaml": -1.0,
+    "markdown": -2.0,
+    "css": -1.0,
+    "scss": -1.0,
+    "html": -0.5,
+}
+
+# Per doubling of the hunk's changed lines
+CHURN_SCORE = 1.0
+
+# Generated code, by path or by a marker near the top of the file
+GENERATED_PATH_PATTERN = re.compile(
+    r"(^|/)(generated|__generated__|gen)/|_pb2(_grpc)?\.py$|\.pb\.go$|\.g\.dart$|"
+    r"\.generated\.|\.gen\.(go|ts|js)$|(^|/)migrations/"
+)
+GENERATED_MARKER_PATTERN = re.compile(r"@generated|Code generated .* DO NOT EDIT|auto-generated", re.IGNORECASE)
+GENERATED_MARKER_LINES = 5
+
+# Multipliers for code that rarely needs review
+TEST_FILE_FACTOR = 0.3
+GENERATED_FILE_FACTOR = 0.1
+
+
+def is_generated_file(file: ParsedFile) -> bool:
+    """Check if a file looks machine-generated, by path or header marker."""
+    if GENERATED_PATH_PATTERN.search(file.path):
+        return True
+    if file.hunks and file.hunks[0].new_start <= GENERATED_MARKER_LINES:
+        for line_no, content in file.hunks[0].additions:
+            if line_no > GENERATED_MARKER_LINES:
+                break
+            if GENERATED_MARKER_PATTERN.search(content):
+                return True
+    return False
+
+
+def score_hunk(
+    file: ParsedFile,
+    hunk: ParsedHunk,
+    static_findings: list,
+    file_score: float,
+    file_factor: float,
+) -> float:
+    """
+    Risk score of one hunk: its file's score plus static findings on its
+    lines and churn, scaled down for test and generated files.
+    """
+    start = hunk.new_start
+    end = start + max(hunk.new_lines, 1)
+    score = file_score
+
+    for finding in static_findings:
+        if finding.line_start and start <= finding.line_start < end:
+            severity = getattr(finding.severity, "value", finding.severity)
+            score += STATIC_FINDING_SCORES.get(severity, 1.0)
+
+    score += CHURN_SCORE * math.log2(1 + len(hunk.additions) + len(hunk.deletions))
+    return max(score, 0.0) * file_factor
+
+
+def rank_hunks(
+    files: list[ParsedFile],
+    static_findings: Optional[list] = None,
+) -> dict[int, float]:
+    """
+    Score every hunk by its risk signals: static findings on its lines, a
+    security-sensitive path, the file's language, its churn, and whether
+    it is in a test or generated file. Returns scores by id(hunk).
+    """
+    findings_by_path: dict[str, list] = {}
+    for finding in static_findings or []:
+        findings_by_path.setdefault(finding.file_path, []).append(finding)
+
+    classifier = get_path_classifier()
+    scores: dict[int, float] = {}
+
+    for file in files:
+        if file.is_binary:
+            continue
+
+        file_score = LANGUAGE_SCORES.get(file.language, 0.0)
+        if SECURITY_PATH_PATTERN.search(file.path):
+            file_score += SECURITY_PATH_SCORE
+
+        if is_generated_file(file):
+            file_factor = GENERATED_FILE_FACTOR
+        elif classifier.is_noisy(file.path):
+            file_factor = TEST_FILE_FACTOR
+        else:
+            file_factor = 1.0
+
+        findings = findings_by_path.get(file.path, [])
+        for hunk in file.hunks:
+            scores[id(hunk)] = score_hunk(file, hunk, findings, file_score, file_factor)
+
+    return scores
@@ -2,18 +2,37 @@
 # Python Worker - AI Reviewer
 # ===========================================
 
+import asyncio
 import json
+import time
 from typing import Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from openai import AsyncOpenAI
 from pathlib import Path
 import structlog
 
 from ..config import settings
-from ..pipeline.diff_processor import ParsedFile, ParsedHunk, get_hunk_context
+from ..pipeline.diff_processor import ParsedFile
+from .batching import plan_review_batches, ReviewChunk
+from .clients import get_openai_client
+from .cache import ReviewCache, ReviewCacheLookup
+from .parser import StreamingFindingParser, parse_partial_findings
+from .ranking import rank_hunks
+from .tokens import get_token_budget
+from .transport import STREAM_ERRORS, create_chat_completion_with_fallback
 
 logger = structlog.get_logger(__name__)
 
+# Tokens held back in each chunk for a static analysis signal line
+STATIC_SIGNAL_TOKENS = 32
+
+# Prefix of the user message before a chunk's context
+REVIEW_MESSAGE_PREFIX = "Review these code changes:\n\n"
+
+# Skipped hunks listed in the usage (and on the run)
+MAX_SKIPPED_HUNKS_RECORDED = 200
+
 
 @dataclass
 class AIFinding:
@@ -31,14 +50,10 @@ class AIFinding:
     ai_model: str
 
 
-def get_openai_client() -> AsyncOpenAI:
-    """Get OpenAI client configured for OpenRouter."""
-    return AsyncOpenAI(
-        api_key=settings.ai_api_key,
-        base_url=settings.ai_base_url,
-    )
+REVIEW_PROMPT_NAMES = ("review", "security", "performance")
 
 
+@lru_cache(maxsize=len(REVIEW_PROMPT_NAMES))
 def load_prompt(prompt_name: str) -> str:
     """Load prompt template from file."""
     prompt_path = Path(settings.prompts_dir) / f"{prompt_name}.prompt.md"
@@ -97,43 +112,151 @@ def select_model_tier(files: list[ParsedFile]) -> tuple[str, str]:
     return settings.ai_model_tier1, "tier1"
 
 
-def build_review_context(files: list[ParsedFile], static_findings: list = None) -> str:
-    """Build context string for AI review."""
-    context_parts = []
-    
-    for file in files:
-        if file.is_binary:
-            continue
-        
-        file_context = f"\n## File: {file.path} ({file.language})\n"
-        file_context += f"Status: {file.status}, +{file.additions}/-{file.deletions}\n\n"
-        
-        for i, hunk in enumerate(file.hunks):
-            file_context += f"### Hunk {i + 1}:\n```\n"
-            file_context += get_hunk_context(hunk)
-            file_context += "\n```\n\n"
-        
-        context_parts.append(file_context)
+def build_review_context(chunk: ReviewChunk, static_findings: list = None) -> str:
+    """Build context string for reviewing one chunk."""
+    context_parts = [chunk.text]
     
-    # Add static findings as signals
-    if static_findings:
+    # Add static findings on this chunk's files as signals
+    chunk_paths = set(chunk.file_paths)
+    signals = [f for f in static_findings or [] if f.file_path in chunk_paths]
+    if signals:
         context_parts.append("\n## Static Analysis Signals:\n")
-        for finding in static_findings[:5]:  # Limit to avoid token bloat
+        for finding in signals[:settings.ai_max_static_signals]:  # Limit to avoid token bloat
             context_parts.append(f"- {finding.title} at {finding.file_path}:{finding.line_start}\n")
     
     return "".join(context_parts)
 
 
+async def review_chunk(
+    client: AsyncOpenAI,
+    model: str,
+    system_prompt: str,
+    context: str,
+    max_tokens: Optional[int] = None,
+    fallback: Optional[tuple[str, int]] = None,
+) -> tuple[list[AIFinding], dict]:
+    """
+    Send one chunk to the model and parse its findings. If the model is
+    saturated, the chunk goes to the fallback (model, max_tokens) instead;
+    usage["model"] is the model that answered.
+    
+    With AI_STREAMING the response is streamed and findings are parsed as
+    they arrive; the stream is closed however reading it ends. Either way,
+    a response cut off at max_tokens, or a stream that broke off, keeps
+    its complete findings and is flagged in usage["truncated"];
+    usage["complete"] is set only if the whole response parsed to a
+    findings array, and usage["first_finding_at"] is the perf_counter()
+    time the first finding was parsed.
+    """
+    stream_kwargs = {}
+    if settings.ai_streaming:
+        stream_kwargs = {"stream": True, "stream_options": {"include_usage": True}}
+    
+    response, used_model = await create_chat_completion_with_fallback(
+        client,
+        model,
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"{REVIEW_MESSAGE_PREFIX}{context}"},
+        ],
+        max_tokens or settings.ai_max_tokens,
+        fallback=fallback,
+        temperature=settings.ai_temperature,
+        response_format={"type": "json_object"},
+        **stream_kwargs,
+    )
+    
+    if settings.ai_streaming:
+        async with response:
+            return await read_review_stream(response, used_model)
+    
+    choice = response.choices[0]
+    findings, complete = parse_ai_response(choice.message.content or "", used_model)
+    usage = {
+        "model": used_model,
+        "tokens_in": response.usage.prompt_tokens if response.usage else 0,
+        "tokens_out": response.usage.completion_tokens if response.usage else 0,
+        "truncated": choice.finish_reason == "length",
+        "complete": complete,
+        "first_finding_at": time.perf_counter() if findings else None,
+    }
+    return findings, usage
+
+
+async def read_review_stream(stream, model: str) -> tuple[list[AIFinding], dict]:
+    """
+    Parse findings from a streamed response as each one completes. If the
+    stream breaks off, the findings parsed so far are kept and the
+    response is flagged as truncated.
+    """
+    parser = StreamingFindingParser()
+    findings = []
+    usage = {
+        "model": model,
+        "tokens_in": 0,
+        "tokens_out": 0,
+        "truncated": False,
+        "complete": False,
+        "first_finding_at": None,
+    }
+    
+    try:
+        async for chunk in stream:
+            if chunk.usage:
+                usage["tokens_in"] = chunk.usage.prompt_tokens
+                usage["tokens_out"] = chunk.usage.completion_tokens
+            for choice in chunk.choices:
+                if choice.delta and choice.delta.content:
+                    for raw in parser.feed(choice.delta.content):
+                        finding = build_ai_finding(raw, model)
+                        if finding is None:
+                            continue
+                        if usage["first_finding_at"] is None:
+                            usage["first_finding_at"] = time.perf_counter()
+                        findings.append(finding)
+                if choice.finish_reason == "length":
+                    usage["truncated"] = True
+    except STREAM_ERRORS as e:
+        logger.warning("AI response stream broke off", model=model, findings_kept=len(findings), error=str(e))
+        usage["truncated"] = True
+        return findings, usage
+    
+    usage["complete"] = parser.complete and parser.found_array
+    if usage["truncated"]:
+        logger.warning("AI response cut off at max_tokens", model=model, findings_kept=len(findings))
+    return findings, usage
+
+
 async def run_ai_review(
     files: list[ParsedFile],
     static_findings: list = None,
     ai_mode: str = "balanced",
     model_override: Optional[str] = None,
+    max_input_tokens: Optional[int] = None,
 ) -> tuple[list[AIFinding], dict]:
-    """Run AI review on parsed files."""
+    """
+    Run AI review on parsed files.
+    
+    Hunks with a cached result for this model, mode and prompt (see
+    ai/cache.py) are not sent again. The rest are split into chunks
+    counted with the model's tokenizer (see ai/tokens.py) and sized to fit
+    its context window, at most AI_CHUNK_TOKENS each (see
+    ai/batching.py). If the PR is over max_input_tokens, hunks are ranked
+    by risk (see ai/ranking.py) and the most valuable per token are kept;
+    usage lists the ones skipped. Chunks are reviewed concurrently, up to
+    AI_MAX_CONCURRENCY at a time, through the retrying, circuit-broken
+    transport (see ai/transport.py); when a tier-2 model is saturated,
+    chunks that fit the tier-1 model go to it instead. Findings and token
+    usage are merged across chunks, and usage reports how many hunks were
+    reviewed vs. truncated by max_input_tokens, failed and fallback
+    chunks, responses cut off at max_tokens, the time to the first
+    finding, plus cache hits and tokens saved.
+    """
     if not files:
         return [], {"model": None, "tokens_in": 0, "tokens_out": 0}
     
+    started = time.perf_counter()
+    
     # Select model
     if model_override:
         model = model_override
@@ -150,90 +273,190 @@ async def run_ai_review(
     
     system_prompt = load_prompt(prompt_name)
     
-    # Build context
-    context = build_review_context(files, static_findings)
+    # Only review hunks without a cached result
+    cache = ReviewCache(model, ai_mode, system_prompt) if settings.ai_cache_enabled else None
+    cached = await cache.lookup(files) if cache else ReviewCacheLookup(files=files)
+    first_finding_at = time.perf_counter() if cached.findings else None
+    
+    # Plan chunks that fit the model's context window
+    budget = get_token_budget(model)
+    available = (
+        budget.input_tokens(system_prompt)
+        - budget.counter.count(REVIEW_MESSAGE_PREFIX)
+        - STATIC_SIGNAL_TOKENS * (settings.ai_max_static_signals + 1)
+    )
+    plan = plan_review_batches(
+        cached.files,
+        chunk_tokens=min(settings.ai_chunk_tokens, available),
+        max_input_tokens=max_input_tokens or settings.ai_max_input_tokens,
+        counter=budget.counter,
+        scores=rank_hunks(cached.files, static_findings),
+    )
     
-    # Truncate if too long
-    max_context_tokens = settings.ai_max_tokens * 2  # Rough estimate
-    if len(context) > max_context_tokens * 4:  # ~4 chars per token
-        context = context[: max_context_tokens * 4] + "\n\n[Context truncated...]"
+    # Saturated tier-2 chunks fall back to tier 1 if they fit its window
+    fallback_model = settings.ai_model_tier1
+    fallback_tokens = 0
+    if settings.ai_fallback_enabled and tier == "tier2" and fallback_model != model:
+        fallback_budget = get_token_budget(fallback_model)
+        fallback_tokens = (
+            fallback_budget.input_tokens(system_prompt)
+            - fallback_budget.counter.count(REVIEW_MESSAGE_PREFIX)
+            - STATIC_SIGNAL_TOKENS * (settings.ai_max_static_signals + 1)
+        )
     
     client = get_openai_client()
+    semaphore = asyncio.Semaphore(settings.ai_max_concurrency)
     
-    try:
-        response = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Review these code changes:\n\n{context}"},
-            ],
-            max_tokens=settings.ai_max_tokens,
-            temperature=settings.ai_temperature,
-            response_format={"type": "json_object"},
-        )
-        
-        usage = {
-            "model": model,
-            "tier": tier,
-            "tokens_in": response.usage.prompt_tokens if response.usage else 0,
-            "tokens_out": response.usage.completion_tokens if response.usage else 0,
-        }
-        
-        # Parse response
-        content = response.choices[0].message.content
-        findings = parse_ai_response(content, model)
-        
-        logger.info(
-            "AI review complete",
-            model=model,
-            finding_count=len(findings),
-            tokens_in=usage["tokens_in"],
-            tokens_out=usage["tokens_out"],
-        )
+    async def review(chunk: ReviewChunk) -> tuple[list[AIFinding], dict]:
+        fallback = None
+        if 0 < chunk.tokens <= fallback_tokens:
+            fallback = (fallback_model, fallback_budget.max_output_tokens)
+        async with semaphore:
+            chunk_findings, chunk_usage = await review_chunk(
+                client,
+                model,
+                system_prompt,
+                build_review_context(chunk, static_findings),
+                max_tokens=budget.max_output_tokens,
+                fallback=fallback,
+            )
+        # Only cache complete, well-formed answers from the selected model
+        if (
+            cache
+            and chunk_usage["model"] == model
+            and chunk_usage["complete"]
+            and not chunk_usage["truncated"]
+        ):
+            await cache.store(chunk, chunk_findings, chunk_usage)
+        return chunk_findings, chunk_usage
+    
+    results = await asyncio.gather(
+        *[review(chunk) for chunk in plan.chunks],
+        return_exceptions=True,
+    )
+    
+    findings = [AIFinding(**raw, ai_model=model) for raw in cached.findings]
+    usage = {
+        "model": model,
+        "tier": tier,
+        "tokens_in": 0,
+        "tokens_out": 0,
+        "chunks": len(plan.chunks),
+        "chunks_failed": 0,
+        "fallback_chunks": 0,
+        "responses_truncated": 0,
+        "first_finding_ms": None,
+        "hunks_total": plan.hunks_total + cached.hits,
+        "hunks_reviewed": plan.hunks_reviewed + cached.hits,
+        "hunks_truncated": plan.hunks_truncated,
+        "hunks_skipped": [
+            {
+                "filePath": hunk.file_path,
+                "lineStart": hunk.line_start,
+                "lineEnd": hunk.line_end,
+                "score": hunk.score,
+                "tokens": hunk.tokens,
+            }
+            for hunk in plan.skipped[:MAX_SKIPPED_HUNKS_RECORDED]
+        ],
+        "cache_hits": cached.hits,
+        "cache_misses": cached.misses,
+        "tokens_saved": cached.tokens_saved,
+    }
+    
+    errors = []
+    for chunk, result in zip(plan.chunks, results):
+        if isinstance(result, BaseException):
+            logger.error("AI review chunk failed", error=str(result), model=model)
+            usage["chunks_failed"] += 1
+            usage["hunks_reviewed"] -= chunk.hunk_count
+            usage["hunks_truncated"] += chunk.hunk_count
+            errors.append(str(result))
+            continue
         
-        return findings, usage
+        chunk_findings, chunk_usage = result
+        findings.extend(chunk_findings)
+        if chunk_usage["model"] != model:
+            usage["fallback_chunks"] += 1
+        if chunk_usage["truncated"]:
+            usage["responses_truncated"] += 1
+        chunk_first = chunk_usage["first_finding_at"]
+        if chunk_first is not None and (first_finding_at is None or chunk_first < first_finding_at):
+            first_finding_at = chunk_first
+        usage["tokens_in"] += chunk_usage["tokens_in"]
+        usage["tokens_out"] += chunk_usage["tokens_out"]
     
-    except Exception as e:
-        logger.error("AI review failed", error=str(e), model=model)
-        return [], {"model": model, "error": str(e), "tokens_in": 0, "tokens_out": 0}
+    if first_finding_at is not None:
+        usage["first_finding_ms"] = int((first_finding_at - started) * 1000)
+    if errors:
+        usage["error"] = errors[0]
+    
+    logger.info(
+        "AI review complete",
+        model=model,
+        finding_count=len(findings),
+        chunks=usage["chunks"],
+        chunks_failed=usage["chunks_failed"],
+        fallback_chunks=usage["fallback_chunks"],
+        responses_truncated=usage["responses_truncated"],
+        first_finding_ms=usage["first_finding_ms"],
+        hunks_reviewed=usage["hunks_reviewed"],
+        hunks_truncated=usage["hunks_truncated"],
+        cache_hits=usage["cache_hits"],
+        tokens_in=usage["tokens_in"],
+        tokens_out=usage["tokens_out"],
+    )
+    
+    return findings, usage
+
+
+def build_ai_finding(raw: dict, model: str) -> Optional[AIFinding]:
+    """Build a finding from one raw finding object, or None if it's malformed."""
+    try:
+        return AIFinding(
+            file_path=raw.get("file", raw.get("file_path", "")),
+            line_start=int(raw.get("line_start", raw.get("line", 0))),
+            line_end=int(raw.get("line_end", raw.get("line_start", raw.get("line", 0)))),
+            category=raw.get("category", "maintainability"),
+            severity=raw.get("severity", "medium"),
+            confidence=raw.get("confidence", "medium"),
+            title=raw.get("title", "AI Review Finding"),
+            message=raw.get("message", ""),
+            suggestion=raw.get("suggestion"),
+            ai_reasoning=raw.get("reasoning"),
+            ai_model=model,
+        )
+    except (KeyError, ValueError, TypeError) as e:
+        logger.warning("Failed to parse AI finding", error=str(e), raw=raw)
+        return None
 
 
-def parse_ai_response(content: str, model: str) -> list[AIFinding]:
-    """Parse AI response into findings."""
+def parse_ai_response(content: str, model: str) -> tuple[list[AIFinding], bool]:
+    """
+    Parse AI response into findings, and whether it was a findings array.
+    If it isn't valid JSON, e.g. cut off at max_tokens, the findings
+    completed before the cut are kept.
+    """
+    complete = False
     try:
         data = json.loads(content)
-        
+    except json.JSONDecodeError as e:
+        raw_findings = parse_partial_findings(content)
+        logger.warning(
+            "Failed to parse AI response as JSON",
+            error=str(e),
+            findings_recovered=len(raw_findings),
+        )
+    else:
         # Handle both direct array and object with findings key
-        if isinstance(data, list):
-            raw_findings = data
-        elif isinstance(data, dict) and "findings" in data:
-            raw_findings = data["findings"]
-        else:
-            raw_findings = []
-        
-        findings = []
-        for raw in raw_findings:
-            try:
-                finding = AIFinding(
-                    file_path=raw.get("file", raw.get("file_path", "")),
-                    line_start=int(raw.get("line_start", raw.get("line", 0))),
-                    line_end=int(raw.get("line_end", raw.get("line_start", raw.get("line", 0)))),
-                    category=raw.get("category", "maintainability"),
-                    severity=raw.get("severity", "medium"),
-                    confidence=raw.get("confidence", "medium"),
-                    title=raw.get("title", "AI Review Finding"),
-                    message=raw.get("message", ""),
-                    suggestion=raw.get("suggestion"),
-                    ai_reasoning=raw.get("reasoning"),
-                    ai_model=model,
-                )
-                findings.append(finding)
-            except (KeyError, ValueError, TypeError) as e:
-                logger.warning("Failed to parse AI finding", error=str(e), raw=raw)
-                continue
-        
-        return findings
+        if isinstance(data, dict):
+            data = data.get("findings")
+        complete = isinstance(data, list)
+        raw_findings = data if complete else []
     
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse AI response as JSON", error=str(e))
-        return []
+    findings = []
+    for raw in raw_findings:
+        finding = build_ai_finding(raw, model)
+        if finding is not None:
+            findings.append(finding)
+    return findings, complete
@@ -0,0 +1,161 @@
+# ===========================================
+# Python Worker - Token Budgeting
+# ===========================================
+
+import hashlib
+import importlib.util
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import structlog
+
+from ..config import settings
+from .models import get_model_config
+
+logger = structlog.get_logger(__name__)
+
+# Encoding for models without one of their own, or not in AVAILABLE_MODELS
+DEFAULT_TOKENIZER = "cl100k_base"
+
+# Context window assumed for models not in AVAILABLE_MODELS
+DEFAULT_CONTEXT_WINDOW = 16385
+
+# Share of the context window held back when counts are approximate
+APPROXIMATE_MARGIN = 0.1
+
+# Fallback estimate when no tokenizer can be loaded
+CHARS_PER_TOKEN = 4
+
+# Tokens the chat format adds around each message
+MESSAGE_OVERHEAD_TOKENS = 8
+
+# Token counts memoized per counter, by text hash
+TOKEN_COUNT_CACHE_SIZE = 16384
+
+
+def _load_encoding(name: str):
+    """
+    Load a tiktoken encoding from tiktoken's local cache (TIKTOKEN_CACHE_DIR
+    in offline deployments), or None if it can't be loaded.
+    """
+    if importlib.util.find_spec("tiktoken") is None:
+        logger.warning("tiktoken is not installed, estimating token counts")
+        return None
+
+    import tiktoken
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning("Failed to load tokenizer, estimating token counts", encoding=name, error=str(e))
+        return None
+
+
+class TokenCounter:
+    """
+    Counts and cuts text in tokens of one encoding, falling back to about
+    4 chars per token if the encoding can't be loaded.
+    """
+
+    def __init__(self, encoding_name: str):
+        self.encoding_name = encoding_name
+        self.encoding = _load_encoding(encoding_name)
+        self._counts: OrderedDict[bytes, int] = OrderedDict()
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // CHARS_PER_TOKEN
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_cached(self, text: str) -> int:
+        """Count tokens, memoized by the text's hash (for hunks and prompts seen again)."""
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts.move_to_end(key)
+            return count
+
+        count = self._counts[key] = self.count(text)
+        if len(self._counts) > TOKEN_COUNT_CACHE_SIZE:
+            self._counts.popitem(last=False)
+        return count
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens tokens."""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+@lru_cache
+def get_token_counter(encoding_name: str = DEFAULT_TOKENIZER) -> TokenCounter:
+    """Get the shared counter for an encoding."""
+    return TokenCounter(encoding_name)
+
+
+@dataclass
+class TokenBudget:
+    """A model's tokenizer and how much of its context window prompts can use."""
+    model: str
+    counter: TokenCounter
+    context_window: int
+    max_output_tokens: int
+    exact: bool  # Counted with the model family's own tokenizer
+
+    def input_tokens(self, system_prompt: str) -> int:
+        """
+        Tokens left for the user message once the system prompt, the
+        response and, for approximate counts, a safety margin are reserved.
+        """
+        window = self.context_window
+        if not self.exact:
+            window = int(window * (1 - APPROXIMATE_MARGIN))
+        return (
+            window
+            - self.max_output_tokens
+            - self.counter.count_cached(system_prompt)
+            - 2 * MESSAGE_OVERHEAD_TOKENS
+        )
+
+
+def get_token_budget(model: Optional[str] = None) -> TokenBudget:
+    """Get the token budget of a model, selected through AVAILABLE_MODELS."""
+    config = get_model_config(model) if model else None
+    if config is None:
+        counter = get_token_counter()
+        return TokenBudget(
+            model=model or "",
+            counter=counter,
+            context_window=DEFAULT_CONTEXT_WINDOW,
+            max_output_tokens=settings.ai_max_tokens,
+            exact=False,
+        )
+
+    counter = get_token_counter(config.tokenizer or DEFAULT_TOKENIZER)
+    return TokenBudget(
+        model=model,
+        counter=counter,
+        context_window=config.context_window,
+        max_output_tokens=min(settings.ai_max_tokens, config.max_tokens),
+        exact=config.tokenizer is not None and counter.exact,
+    )
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens in text with a model's tokenizer."""
+    return get_token_budget(model).counter.count(text)
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text to at most max_tokens of a model's tokens."""
+    return get_token_budget(model).counter.truncate(text, max_tokens)
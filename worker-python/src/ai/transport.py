@@ -0,0 +1,355 @@
+# ===========================================
+# Python Worker - Resilient LLM Transport
+# ===========================================
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+import httpx
+import openai
+import structlog
+from openai import AsyncOpenAI
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from tenacity.wait import wait_base
+
+from ..config import settings, get_async_redis_client
+from .tokens import get_token_budget
+
+logger = structlog.get_logger(__name__)
+
+# Errors worth retrying: rate limits, timeouts, dropped connections and 5xx
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Errors counted towards opening a provider's circuit. Rate limits are per
+# model and key, and are waited out instead
+CIRCUIT_ERRORS = (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+# Errors after which the fallback model is tried
+SATURATION_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.InternalServerError)
+
+# Errors reading a streamed response after it started: dropped connections,
+# read timeouts and error events
+STREAM_ERRORS = (httpx.TransportError, openai.APIError)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str):
+        super().__init__(f"Circuit open for AI provider {provider}")
+        self.provider = provider
+
+
+def provider_of(model: str) -> str:
+    """Provider of a model: its OpenRouter prefix, else the configured provider."""
+    provider, _, name = model.partition("/")
+    return provider if name else settings.ai_provider
+
+
+def retry_after_seconds(error: Optional[BaseException]) -> Optional[float]:
+    """Delay a failed response asked for in retry-after-ms or Retry-After."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class wait_retry_after(wait_base):
+    """Wait as long as the server's Retry-After asks, else fall back to another wait."""
+
+    def __init__(self, fallback: wait_base, max_wait: float):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state) -> float:
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = retry_after_seconds(error)
+        if delay is None:
+            return self.fallback(retry_state)
+        return min(delay, self.max_wait)
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker with its state in Redis, so every worker
+    sees it. AI_CIRCUIT_FAILURE_THRESHOLD outage failures within
+    AI_CIRCUIT_WINDOW_SECONDS open the circuit for AI_CIRCUIT_COOLDOWN_SECONDS;
+    calls fail fast while it is open, and resume after the cooldown. If
+    Redis is unavailable the circuit is treated as closed.
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.failures_key = f"ai:circuit:{provider}:failures"
+        self.open_key = f"ai:circuit:{provider}:open"
+
+    async def is_open(self) -> bool:
+        try:
+            return bool(await get_async_redis_client().exists(self.open_key))
+        except Exception as e:
+            logger.warning("AI circuit state unavailable", provider=self.provider, error=str(e))
+            return False
+
+    async def record_failure(self) -> None:
+        try:
+            redis = get_async_redis_client()
+            failures = await redis.incr(self.failures_key)
+            if failures == 1:
+                await redis.expire(self.failures_key, settings.ai_circuit_window_seconds)
+            if failures >= settings.ai_circuit_failure_threshold:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.set(self.open_key, 1, ex=settings.ai_circuit_cooldown_seconds)
+                    pipe.delete(self.failures_key)
+                    await pipe.execute()
+                logger.warning(
+                    "AI circuit opened",
+                    provider=self.provider,
+                    failures=failures,
+                    cooldown_seconds=settings.ai_circuit_cooldown_seconds,
+                )
+        except Exception as e:
+            logger.warning("Failed to record AI provider failure", provider=self.provider, error=str(e))
+
+
+class TokenRateLimiter:
+    """
+    Client-side token bucket holding this worker under a tokens-per-minute
+    rate. Requests reserve their prompt plus max output tokens up front
+    and give back what the response didn't use.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: int) -> None:
+        # A request larger than the bucket waits for a full one
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.available < tokens:
+                # Wake at least every second to pick up released tokens
+                await asyncio.sleep(min((tokens - self.available) / self.rate, 1.0))
+                self._refill()
+            self.available -= tokens
+
+    def release(self, tokens: int) -> None:
+        self._refill()
+        self.available = min(self.capacity, self.available + tokens)
+
+
+class ReservedStream:
+    """
+    A streamed response holding a rate limit reservation until closed.
+
+    Closing it (also as an async context manager) closes the underlying
+    stream and gives back the output tokens the response didn't use: as
+    reported in its final usage chunk, else estimated from the text
+    received, e.g. when the connection dropped.
+    """
+
+    def __init__(self, stream, limiter: Optional[TokenRateLimiter], model: str, max_tokens: int):
+        self._stream = stream
+        self._limiter = limiter
+        self._model = model
+        self._max_tokens = max_tokens
+        self._completion_tokens: Optional[int] = None
+        self._parts: list[str] = []
+        self._settled = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self._stream.__anext__()
+        if chunk.usage:
+            self._completion_tokens = chunk.usage.completion_tokens
+        for choice in chunk.choices:
+            if choice.delta and choice.delta.content:
+                self._parts.append(choice.delta.content)
+        return chunk
+
+    async def __aenter__(self) -> "ReservedStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        try:
+            await self._stream.close()
+        finally:
+            self._settle()
+
+    def _settle(self) -> None:
+        if self._settled or self._limiter is None:
+            return
+        self._settled = True
+        used = self._completion_tokens
+        if used is None:
+            used = get_token_budget(self._model).counter.count("".join(self._parts))
+        self._limiter.release(max(self._max_tokens - used, 0))
+
+
+_limiters: dict[str, TokenRateLimiter] = {}
+_limiters_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_rate_limiter(model: str) -> Optional[TokenRateLimiter]:
+    """Get this event loop's limiter for a model, or None if AI_TOKENS_PER_MINUTE is unset."""
+    global _limiters_loop
+
+    if settings.ai_tokens_per_minute <= 0:
+        return None
+    loop = asyncio.get_running_loop()
+    if _limiters_loop is not loop:
+        _limiters.clear()
+        _limiters_loop = loop
+    limiter = _limiters.get(model)
+    if limiter is None:
+        limiter = _limiters[model] = TokenRateLimiter(settings.ai_tokens_per_minute)
+    return limiter
+
+
+async def create_chat_completion(
+    client: AsyncOpenAI,
+    model: str,
+    messages: list[dict],
+    max_tokens: int,
+    **kwargs,
+):
+    """
+    Create a chat completion under the model's token rate limit, retrying
+    rate limits, timeouts, connection errors and 5xx with jittered
+    exponential backoff (or the server's Retry-After). Raises
+    CircuitOpenError without calling the provider while its circuit is
+    open; timeouts, connection errors and 5xx count towards opening it.
+
+    A streamed response is returned as a ReservedStream, which must be
+    closed to settle its rate limit reservation.
+    """
+    breaker = CircuitBreaker(provider_of(model))
+    if await breaker.is_open():
+        raise CircuitOpenError(breaker.provider)
+
+    limiter = get_rate_limiter(model)
+    reserved = 0
+    if limiter is not None:
+        counter = get_token_budget(model).counter
+        reserved = sum(counter.count(m["content"]) for m in messages) + max_tokens
+        await limiter.acquire(reserved)
+
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(max(settings.ai_retry_attempts, 1)),
+        wait=wait_retry_after(
+            wait_random_exponential(multiplier=1, max=settings.ai_retry_max_wait_seconds),
+            settings.ai_retry_max_wait_seconds,
+        ),
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
+        reraise=True,
+    )
+
+    try:
+        async for attempt in retrying:
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    if await breaker.is_open():
+                        raise CircuitOpenError(breaker.provider)
+                    logger.info(
+                        "Retrying AI request",
+                        model=model,
+                        attempt=attempt.retry_state.attempt_number,
+                    )
+                try:
+                    response = await client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        **kwargs,
+                    )
+                except RETRYABLE_ERRORS as e:
+                    logger.warning("AI request failed", model=model, error=str(e))
+                    if isinstance(e, CIRCUIT_ERRORS):
+                        await breaker.record_failure()
+                    raise
+    except BaseException:
+        if limiter is not None:
+            limiter.release(reserved)
+        raise
+
+    # Streamed responses report usage at the end; they settle when closed
+    if kwargs.get("stream"):
+        return ReservedStream(response, limiter, model, max_tokens)
+    if limiter is not None and response.usage:
+        limiter.release(max(max_tokens - response.usage.completion_tokens, 0))
+    return response
+
+
+async def create_chat_completion_with_fallback(
+    client: AsyncOpenAI,
+    model: str,
+    messages: list[dict],
+    max_tokens: int,
+    fallback: Optional[tuple[str, int]] = None,
+    **kwargs,
+) -> tuple[object, str]:
+    """
+    Create a chat completion, switching to the fallback (model, max_tokens)
+    if the model stays rate limited, times out or its circuit is open.
+    Returns the response and the model that produced it.
+    """
+    try:
+        return await create_chat_completion(client, model, messages, max_tokens, **kwargs), model
+    except (CircuitOpenError, *SATURATION_ERRORS) as e:
+        if fallback is None or fallback[0] == model:
+            raise
+        fallback_model, fallback_max_tokens = fallback
+        logger.warning(
+            "AI model saturated, using fallback",
+            model=model,
+            fallback_model=fallback_model,
+            error=str(e),
+        )
+        response = await create_chat_completion(
+            client,
+            fallback_model,
+            messages,
+            fallback_max_tokens,
+            **kwargs,
+        )
+        return response, fallback_model
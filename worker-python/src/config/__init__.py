@@ -6,6 +6,8 @@ from .database import (
 from .redis_client import (
     get_redis_client,
     close_redis_client,
+    get_async_redis_client,
+    close_async_redis_client,
     get_analysis_queue,
     get_repo_sync_queue,
     create_worker,
@@ -15,10 +17,19 @@ from .redis_client import (
 from .github_client import (
     get_github_client,
     get_installation_token,
+    get_installation_token_async,
+    get_token_cache_stats,
     get_pull_request_diff,
+    stream_pull_request_diff,
+    compare_commits,
     get_pull_request_files,
     post_pr_review,
     get_file_content,
+    fetch_file_contents,
+    get_http_client,
+    init_http_client,
+    close_http_client,
+    get_http_client_stats,
 )
 
 __all__ = [
@@ -28,6 +39,8 @@ __all__ = [
     "close_database",
     "get_redis_client",
     "close_redis_client",
+    "get_async_redis_client",
+    "close_async_redis_client",
     "get_analysis_queue",
     "get_repo_sync_queue",
     "create_worker",
@@ -35,8 +48,17 @@ __all__ = [
     "QUEUE_REPO_SYNC",
     "get_github_client",
     "get_installation_token",
+    "get_installation_token_async",
+    "get_token_cache_stats",
     "get_pull_request_diff",
+    "stream_pull_request_diff",
+    "compare_commits",
     "get_pull_request_files",
     "post_pr_review",
     "get_file_content",
+    "fetch_file_contents",
+    "get_http_client",
+    "init_http_client",
+    "close_http_client",
+    "get_http_client_stats",
 ]
@@ -10,6 +10,7 @@ from ..models.Member import Member
 from ..models.Repository import Repository
 from ..models.PullRequest import PullRequest
 from ..models.Run import Run
+from ..models.RunStatsDaily import RunStatsDaily
 from ..models.Finding import Finding
 from ..models.AuditLog import AuditLog
 
@@ -17,6 +18,49 @@ logger = structlog.get_logger(__name__)
 
 _client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
 
+# Key of Finding's unique index on a run's fingerprints
+RUN_FINGERPRINT_INDEX_KEY = [("runId", 1), ("fingerprint", 1)]
+
+
+async def dedupe_run_findings(db) -> int:
+    """
+    Delete duplicate (runId, fingerprint) findings, keeping the first, so
+    the unique index on them can be built. Job retries wrote duplicates
+    before the index existed. Skipped once the index is in place.
+    """
+    collection = db[Finding.Settings.name]
+    indexes = await collection.index_information()
+    if any(
+        index["key"] == RUN_FINGERPRINT_INDEX_KEY and index.get("unique")
+        for index in indexes.values()
+    ):
+        return 0
+    
+    duplicates = collection.aggregate(
+        [
+            {"$match": {"fingerprint": {"$type": "string"}}},
+            {"$sort": {"_id": 1}},
+            {
+                "$group": {
+                    "_id": {"runId": "$runId", "fingerprint": "$fingerprint"},
+                    "ids": {"$push": "$_id"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+    
+    deleted = 0
+    async for group in duplicates:
+        result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        deleted += result.deleted_count
+    
+    if deleted:
+        logger.warning("Deleted duplicate run findings before indexing", deleted=deleted)
+    return deleted
+
 async def init_database() -> None:
     """Initialize MongoDB connection and Beanie models."""
     global _client
@@ -29,6 +73,9 @@ async def init_database() -> None:
     _client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_uri)
     db = _client[settings.mongodb_db_name]
     
+    # Beanie builds the unique (runId, fingerprint) index, which fails on duplicates
+    await dedupe_run_findings(db)
+    
     logger.info("Initializing Beanie models")
     await init_beanie(
         database=db,
@@ -37,6 +84,7 @@ async def init_database() -> None:
             Repository,
             PullRequest,
             Run,
+            RunStatsDaily,
             Finding,
             AuditLog,
         ],
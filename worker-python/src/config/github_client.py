@@ -2,15 +2,23 @@
 # Python Worker - GitHub Client Configuration
 # ===========================================
 
+import asyncio
+import importlib.util
+import json
 import jwt
+import re
+import threading
 import time
 import httpx
-from typing import Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 from github import Github, GithubIntegration
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from functools import lru_cache, partial
 import structlog
 
 from .settings import settings
+from .redis_client import get_async_redis_client, get_redis_client
 
 logger = structlog.get_logger(__name__)
 
@@ -25,6 +33,170 @@ class InstallationAuth:
 
 _installation_tokens: dict[int, InstallationAuth] = {}
 
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_API_VERSION = "2022-11-28"
+
+
+# ===========================================
+# Pooled HTTP Client
+# ===========================================
+
+@dataclass
+class HttpClientStats:
+    """Request and connection counters for the pooled GitHub client."""
+    requests: int = 0
+    connections_opened: int = 0
+    latency_ms_total: float = 0.0
+    latency_ms_max: float = 0.0
+
+    @property
+    def connections_reused(self) -> int:
+        """Requests served over an already-open connection."""
+        return max(self.requests - self.connections_opened, 0)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.connections_reused / self.requests, 3) if self.requests else 0.0,
+            "latency_ms_avg": round(self.latency_ms_total / self.requests, 1) if self.requests else 0.0,
+            "latency_ms_max": round(self.latency_ms_max, 1),
+        }
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_http_stats = HttpClientStats()
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    """httpcore trace hook; counts new connections."""
+    if event_name == "connection.connect_tcp.complete":
+        _http_stats.connections_opened += 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions["trace"] = _trace
+    request.extensions["started_at"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    started = response.request.extensions.get("started_at")
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _http_stats.requests += 1
+    _http_stats.latency_ms_total += elapsed_ms
+    _http_stats.latency_ms_max = max(_http_stats.latency_ms_max, elapsed_ms)
+    logger.debug(
+        "GitHub request",
+        method=response.request.method,
+        path=response.request.url.path,
+        status=response.status_code,
+        http_version=response.http_version,
+        elapsed_ms=round(elapsed_ms, 1),
+    )
+
+
+@lru_cache
+def _use_http2() -> bool:
+    if not settings.github_http2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=GITHUB_API_URL,
+        http2=_use_http2(),
+        timeout=httpx.Timeout(settings.github_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.github_max_connections,
+            max_keepalive_connections=settings.github_max_keepalive,
+            keepalive_expiry=settings.github_keepalive_expiry_seconds,
+        ),
+        headers={"X-GitHub-Api-Version": GITHUB_API_VERSION},
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the worker's pooled GitHub HTTP client.
+
+    Connections are bound to the event loop that opened them, so a new
+    client is created if called from a different loop than the current
+    one was created on.
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = _create_http_client()
+        _http_client_loop = loop
+        logger.info(
+            "GitHub HTTP client initialized",
+            max_connections=settings.github_max_connections,
+            max_keepalive=settings.github_max_keepalive,
+        )
+
+    return _http_client
+
+
+async def init_http_client() -> None:
+    """Create the pooled GitHub HTTP client on the running loop."""
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    """Close the pooled GitHub HTTP client and log its stats."""
+    global _http_client, _http_client_loop
+
+    if _http_client is not None:
+        # A client from a loop that has since closed can't be closed cleanly
+        if _http_client_loop is asyncio.get_running_loop():
+            await _http_client.aclose()
+        _http_client = None
+        _http_client_loop = None
+        logger.info("GitHub HTTP client closed", **_http_stats.to_dict())
+
+
+def get_http_client_stats() -> dict[str, Any]:
+    """Get request, connection reuse and latency metrics for GitHub calls."""
+    return _http_stats.to_dict()
+
+
+# ===========================================
+# Installation Tokens
+# ===========================================
+
+TOKEN_EXPIRY_BUFFER_SECONDS = 300  # Never hand out a token this close to expiry
+TOKEN_REFRESH_AHEAD_SECONDS = 600  # Refresh in the background inside this window
+TOKEN_MINT_LOCK_MS = 10_000
+TOKEN_MINT_POLL_SECONDS = 0.1
+
+
+@dataclass
+class TokenCacheStats:
+    """Hit and mint counters for the installation token cache."""
+    local_hits: int = 0
+    shared_hits: int = 0
+    mints: int = 0
+    mint_waits: int = 0  # Waited for another worker's mint instead of minting
+    background_refreshes: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+_token_lock = threading.Lock()
+_token_refreshes: dict[int, asyncio.Task] = {}
+_token_stats = TokenCacheStats()
+
 
 def get_github_integration() -> GithubIntegration:
     """Get GitHub App integration instance."""
@@ -34,27 +206,246 @@ def get_github_integration() -> GithubIntegration:
     )
 
 
+def create_app_jwt() -> str:
+    """Create a short-lived JWT authenticating as the GitHub App."""
+    now = int(time.time())
+    payload = {
+        "iat": now - 60,  # Allow for clock drift
+        "exp": now + 540,
+        "iss": settings.github_app_id,
+    }
+    return jwt.encode(payload, settings.github_private_key_parsed, algorithm="RS256")
+
+
+def _token_cache_key(installation_id: int) -> str:
+    return f"gh:installation-token:{installation_id}"
+
+
+def _local_token(installation_id: int) -> Optional[InstallationAuth]:
+    with _token_lock:
+        cached = _installation_tokens.get(installation_id)
+    if cached and cached.expires_at > time.time() + TOKEN_EXPIRY_BUFFER_SECONDS:
+        return cached
+    return None
+
+
+def _store_local_token(auth: InstallationAuth) -> None:
+    with _token_lock:
+        _installation_tokens[auth.installation_id] = auth
+
+
+def _is_newer(shared: InstallationAuth) -> bool:
+    """Whether a shared token can stand in for a refresh of this process's copy."""
+    if shared.expires_at >= time.time() + TOKEN_REFRESH_AHEAD_SECONDS:
+        return True
+    with _token_lock:
+        local = _installation_tokens.get(shared.installation_id)
+    return local is None or shared.expires_at > local.expires_at
+
+
+def _decode_token(installation_id: int, raw: Optional[bytes]) -> Optional[InstallationAuth]:
+    if not raw:
+        return None
+    data = json.loads(raw)
+    auth = InstallationAuth(
+        installation_id=installation_id,
+        token=data["token"],
+        expires_at=data["expires_at"],
+    )
+    if auth.expires_at > time.time() + TOKEN_EXPIRY_BUFFER_SECONDS:
+        return auth
+    return None
+
+
+def _encode_token(auth: InstallationAuth) -> tuple[str, int]:
+    """Serialize a token and get the TTL to store it with."""
+    payload = json.dumps({"token": auth.token, "expires_at": auth.expires_at})
+    ttl = int(auth.expires_at - time.time() - TOKEN_EXPIRY_BUFFER_SECONDS)
+    return payload, max(ttl, 1)
+
+
+def _parse_expiry(expires_at: Optional[str]) -> float:
+    if not expires_at:
+        return time.time() + 3600  # Tokens last 1 hour
+    return datetime.fromisoformat(expires_at.replace("Z", "+00:00")).timestamp()
+
+
 def get_installation_token(installation_id: int) -> str:
-    """Get or refresh installation access token."""
-    cached = _installation_tokens.get(installation_id)
+    """
+    Get or refresh installation access token (blocking).
+
+    For synchronous callers such as PyGithub clients. Async code should
+    use get_installation_token_async, which doesn't block the event loop.
+    """
+    cached = _local_token(installation_id)
+    if cached:
+        _token_stats.local_hits += 1
+        return cached.token
     
-    # Return cached if still valid (with 5 min buffer)
-    if cached and cached.expires_at > time.time() + 300:
+    redis = get_redis_client()
+    key = _token_cache_key(installation_id)
+    try:
+        cached = _decode_token(installation_id, redis.get(key))
+    except Exception as e:
+        logger.warning("Token cache read failed", installation_id=installation_id, error=str(e))
+    if cached:
+        _token_stats.shared_hits += 1
+        _store_local_token(cached)
         return cached.token
     
     integration = get_github_integration()
-    auth = integration.get_access_token(installation_id)
+    access = integration.get_access_token(installation_id)
+    _token_stats.mints += 1
     
-    _installation_tokens[installation_id] = InstallationAuth(
+    auth = InstallationAuth(
         installation_id=installation_id,
-        token=auth.token,
-        expires_at=time.time() + 3600,  # Tokens last 1 hour
+        token=access.token,
+        expires_at=access.expires_at.timestamp() if access.expires_at else time.time() + 3600,
     )
+    _store_local_token(auth)
+    try:
+        payload, ttl = _encode_token(auth)
+        redis.set(key, payload, ex=ttl)
+    except Exception as e:
+        logger.warning("Token cache write failed", installation_id=installation_id, error=str(e))
     
     logger.debug("Refreshed installation token", installation_id=installation_id)
     return auth.token
 
 
+async def _mint_installation_token(installation_id: int) -> InstallationAuth:
+    response = await get_http_client().post(
+        f"/app/installations/{installation_id}/access_tokens",
+        headers={
+            "Authorization": f"Bearer {create_app_jwt()}",
+            "Accept": "application/vnd.github+json",
+        },
+    )
+    response.raise_for_status()
+    data = response.json()
+    _token_stats.mints += 1
+    
+    logger.debug("Minted installation token", installation_id=installation_id)
+    return InstallationAuth(
+        installation_id=installation_id,
+        token=data["token"],
+        expires_at=_parse_expiry(data.get("expires_at")),
+    )
+
+
+async def _refresh_installation_token(installation_id: int) -> InstallationAuth:
+    """
+    Mint a token and share it through Redis.
+
+    A short Redis lock makes the mint single-flight across workers: the
+    worker holding it mints while the others poll for its result, falling
+    back to minting themselves if the holder doesn't finish in time. The
+    shared token is read again under the lock, so workers that queued up
+    behind a mint take its result instead of minting again.
+    """
+    redis = get_async_redis_client()
+    key = _token_cache_key(installation_id)
+    lock_key = f"{key}:lock"
+    
+    try:
+        acquired = await redis.set(lock_key, b"1", nx=True, px=TOKEN_MINT_LOCK_MS)
+    except Exception as e:
+        logger.warning("Token cache unavailable", installation_id=installation_id, error=str(e))
+        auth = await _mint_installation_token(installation_id)
+        _store_local_token(auth)
+        return auth
+    
+    if not acquired:
+        _token_stats.mint_waits += 1
+        deadline = time.monotonic() + TOKEN_MINT_LOCK_MS / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(TOKEN_MINT_POLL_SECONDS)
+            auth = _decode_token(installation_id, await redis.get(key))
+            if auth and _is_newer(auth):
+                _store_local_token(auth)
+                return auth
+    
+    try:
+        if acquired:
+            auth = _decode_token(installation_id, await redis.get(key))
+            if auth and _is_newer(auth):
+                _token_stats.shared_hits += 1
+                _store_local_token(auth)
+                return auth
+        
+        auth = await _mint_installation_token(installation_id)
+        _store_local_token(auth)
+        payload, ttl = _encode_token(auth)
+        await redis.set(key, payload, ex=ttl)
+        return auth
+    finally:
+        if acquired:
+            await redis.delete(lock_key)
+
+
+def _on_refresh_done(installation_id: int, task: asyncio.Task) -> None:
+    if _token_refreshes.get(installation_id) is task:
+        del _token_refreshes[installation_id]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(
+            "Installation token refresh failed",
+            installation_id=installation_id,
+            error=str(task.exception()),
+        )
+
+
+def _start_token_refresh(installation_id: int) -> asyncio.Task:
+    """Start a refresh, or join the one already in flight on this loop."""
+    task = _token_refreshes.get(installation_id)
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(
+            _refresh_installation_token(installation_id),
+            name=f"token-refresh:{installation_id}",
+        )
+        task.add_done_callback(partial(_on_refresh_done, installation_id))
+        _token_refreshes[installation_id] = task
+    return task
+
+
+async def get_installation_token_async(installation_id: int) -> str:
+    """
+    Get an installation access token without blocking the event loop.
+
+    Tokens are looked up in the process, then in Redis, so all workers
+    share one token per installation. Concurrent misses share a single
+    mint, and a token close to expiry is returned while a replacement is
+    minted in the background.
+    """
+    cached = _local_token(installation_id)
+    if cached:
+        _token_stats.local_hits += 1
+    else:
+        try:
+            raw = await get_async_redis_client().get(_token_cache_key(installation_id))
+            cached = _decode_token(installation_id, raw)
+        except Exception as e:
+            logger.warning("Token cache read failed", installation_id=installation_id, error=str(e))
+        if cached:
+            _token_stats.shared_hits += 1
+            _store_local_token(cached)
+    
+    if cached:
+        if cached.expires_at < time.time() + TOKEN_REFRESH_AHEAD_SECONDS:
+            if installation_id not in _token_refreshes:
+                _token_stats.background_refreshes += 1
+            _start_token_refresh(installation_id)
+        return cached.token
+    
+    # Shielded so a cancelled caller doesn't cancel a mint others are awaiting
+    auth = await asyncio.shield(_start_token_refresh(installation_id))
+    return auth.token
+
+
+def get_token_cache_stats() -> dict[str, int]:
+    """Get installation token cache hit and mint counters."""
+    return _token_stats.to_dict()
+
+
 def get_github_client(installation_id: int) -> Github:
     """Get authenticated GitHub client for an installation."""
     token = get_installation_token(installation_id)
@@ -68,19 +459,71 @@ async def get_pull_request_diff(
     pull_number: int
 ) -> str:
     """Fetch PR diff using httpx for async support."""
-    token = get_installation_token(installation_id)
+    token = await get_installation_token_async(installation_id)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}/pulls/{pull_number}",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github.v3.diff",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-        )
+    response = await get_http_client().get(
+        f"/repos/{owner}/{repo}/pulls/{pull_number}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3.diff",
+        },
+    )
+    response.raise_for_status()
+    return response.text
+
+
+async def stream_pull_request_diff(
+    installation_id: int,
+    owner: str,
+    repo: str,
+    pull_number: int
+) -> AsyncIterator[str]:
+    """
+    Stream a PR diff line by line, each line keeping its newline.
+
+    Lines are split on "\n" only, so CRLF content is preserved. Close the
+    iterator (e.g. with contextlib.aclosing) to stop reading early.
+    """
+    token = await get_installation_token_async(installation_id)
+    
+    async with get_http_client().stream(
+        "GET",
+        f"/repos/{owner}/{repo}/pulls/{pull_number}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3.diff",
+        },
+    ) as response:
         response.raise_for_status()
-        return response.text
+        pending = b""
+        async for chunk in response.aiter_bytes():
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8", errors="replace") + "\n"
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+
+
+async def compare_commits(
+    installation_id: int,
+    owner: str,
+    repo: str,
+    base: str,
+    head: str,
+) -> dict:
+    """Compare two commits; the response lists changed files with patches."""
+    token = await get_installation_token_async(installation_id)
+    
+    response = await get_http_client().get(
+        f"/repos/{owner}/{repo}/compare/{base}...{head}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3+json",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 async def get_pull_request_files(
@@ -90,19 +533,17 @@ async def get_pull_request_files(
     pull_number: int
 ) -> list[dict]:
     """Fetch PR files metadata."""
-    token = get_installation_token(installation_id)
+    token = await get_installation_token_async(installation_id)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}/pulls/{pull_number}/files",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github.v3+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_http_client().get(
+        f"/repos/{owner}/{repo}/pulls/{pull_number}/files",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3+json",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 async def post_pr_review(
@@ -114,7 +555,7 @@ async def post_pr_review(
     body: Optional[str] = None
 ) -> dict:
     """Post a PR review with inline comments."""
-    token = get_installation_token(installation_id)
+    token = await get_installation_token_async(installation_id)
     
     payload = {
         "event": "COMMENT",
@@ -132,18 +573,55 @@ async def post_pr_review(
     if body:
         payload["body"] = body
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://api.github.com/repos/{owner}/{repo}/pulls/{pull_number}/reviews",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github.v3+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-            json=payload,
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_http_client().post(
+        f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3+json",
+        },
+        json=payload,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+# ===========================================
+# File Content Cache
+# ===========================================
+
+# Commit SHAs name immutable trees, so content at one never needs revalidating
+_COMMIT_SHA = re.compile(r"^[0-9a-f]{40}$")
+_MISSING = b"\x00missing"
+
+
+def _file_cache_key(owner: str, repo: str, ref: str, path: str) -> str:
+    return f"gh:content:{owner}/{repo}:{ref}:{path}"
+
+
+async def _read_file_cache(key: str) -> Optional[dict[bytes, bytes]]:
+    try:
+        cached = await get_async_redis_client().hgetall(key)
+        return cached or None
+    except Exception as e:
+        logger.warning("File cache read failed", key=key, error=str(e))
+        return None
+
+
+async def _write_file_cache(key: str, body: bytes, etag: Optional[str]) -> None:
+    if len(body) > settings.max_file_size_kb * 1024:
+        return
+    try:
+        mapping = {"body": body, "etag": etag or ""}
+        async with get_async_redis_client().pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, settings.file_cache_ttl_seconds)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("File cache write failed", key=key, error=str(e))
+
+
+def _decode_cached(body: bytes) -> Optional[str]:
+    return None if body == _MISSING else body.decode("utf-8", errors="replace")
 
 
 async def get_file_content(
@@ -153,22 +631,68 @@ async def get_file_content(
     path: str,
     ref: str
 ) -> Optional[str]:
-    """Get file content at a specific ref."""
-    token = get_installation_token(installation_id)
+    """
+    Get file content at a specific ref.
+
+    Content is cached in Redis by repo, ref and path. Cached content at a
+    commit SHA is returned as is; for other refs it is revalidated with
+    If-None-Match, and a 304 does not count against the rate limit.
+    """
+    key = _file_cache_key(owner, repo, ref, path)
+    cached = await _read_file_cache(key)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}/contents/{path}",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github.v3.raw",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-            params={"ref": ref},
-        )
+    if cached and _COMMIT_SHA.match(ref):
+        return _decode_cached(cached[b"body"])
+    
+    token = await get_installation_token_async(installation_id)
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3.raw",
+    }
+    if cached and cached.get(b"etag"):
+        headers["If-None-Match"] = cached[b"etag"].decode()
+    
+    response = await get_http_client().get(
+        f"/repos/{owner}/{repo}/contents/{path}",
+        headers=headers,
+        params={"ref": ref},
+    )
+    
+    if response.status_code == 304 and cached:
+        return _decode_cached(cached[b"body"])
+    
+    if response.status_code == 404:
+        await _write_file_cache(key, _MISSING, None)
+        return None
         
-        if response.status_code == 404:
-            return None
-            
-        response.raise_for_status()
-        return response.text
+    response.raise_for_status()
+    await _write_file_cache(key, response.content, response.headers.get("ETag"))
+    return response.text
+
+
+async def fetch_file_contents(
+    installation_id: int,
+    owner: str,
+    repo: str,
+    ref: str,
+    paths: list[str],
+    concurrency: Optional[int] = None,
+) -> dict[str, Optional[str]]:
+    """
+    Fetch several files at one ref concurrently.
+
+    At most `concurrency` requests (default GITHUB_FETCH_CONCURRENCY) are
+    in flight at once. Files that are missing or fail to fetch map to None.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.github_fetch_concurrency)
+    
+    async def fetch(path: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await get_file_content(installation_id, owner, repo, path, ref)
+            except Exception as e:
+                logger.warning("Failed to fetch file content", file=path, error=str(e))
+                return None
+    
+    contents = await asyncio.gather(*[fetch(path) for path in paths])
+    return dict(zip(paths, contents))
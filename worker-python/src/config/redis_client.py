@@ -2,7 +2,9 @@
 # Python Worker - Redis Client Configuration
 # ===========================================
 
+import asyncio
 import redis
+import redis.asyncio
 from redis import Redis
 from rq import Queue, Worker
 from typing import Optional, List
@@ -13,6 +15,8 @@ from .settings import settings
 logger = structlog.get_logger(__name__)
 
 _redis_client: Optional[Redis] = None
+_async_redis_client: Optional[redis.asyncio.Redis] = None
+_async_redis_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
 def get_redis_client() -> Redis:
@@ -39,6 +43,39 @@ def close_redis_client() -> None:
         logger.info("Redis client closed")
 
 
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """
+    Get or create the asyncio Redis client for use inside the pipeline.
+
+    Like the GitHub HTTP client, its connections belong to the event loop
+    that opened them, so a new client is created when the loop changes.
+    """
+    global _async_redis_client, _async_redis_loop
+    
+    loop = asyncio.get_running_loop()
+    if _async_redis_client is None or _async_redis_loop is not loop:
+        _async_redis_client = redis.asyncio.from_url(
+            settings.redis_url,
+            decode_responses=False,
+        )
+        _async_redis_loop = loop
+        logger.info("Async Redis client initialized")
+    
+    return _async_redis_client
+
+
+async def close_async_redis_client() -> None:
+    """Close the asyncio Redis client."""
+    global _async_redis_client, _async_redis_loop
+    
+    if _async_redis_client is not None:
+        if _async_redis_loop is asyncio.get_running_loop():
+            await _async_redis_client.aclose()
+        _async_redis_client = None
+        _async_redis_loop = None
+        logger.info("Async Redis client closed")
+
+
 # Queue names - must match Node.js
 QUEUE_ANALYSIS = "analysis-jobs"
 QUEUE_REPO_SYNC = "repo-sync-jobs"
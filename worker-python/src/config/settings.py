@@ -45,6 +45,13 @@ class Settings(BaseSettings):
     # GitHub App
     github_app_id: str = Field(..., alias="GITHUB_APP_ID")
     github_app_private_key: str = Field(..., alias="GITHUB_APP_PRIVATE_KEY")
+    github_http2: bool = Field(default=True, alias="GITHUB_HTTP2")
+    github_max_connections: int = Field(default=20, alias="GITHUB_MAX_CONNECTIONS")
+    github_max_keepalive: int = Field(default=10, alias="GITHUB_MAX_KEEPALIVE")
+    github_keepalive_expiry_seconds: float = Field(default=30.0, alias="GITHUB_KEEPALIVE_EXPIRY_SECONDS")
+    github_timeout_seconds: float = Field(default=30.0, alias="GITHUB_TIMEOUT_SECONDS")
+    github_fetch_concurrency: int = Field(default=8, alias="GITHUB_FETCH_CONCURRENCY")
+    file_cache_ttl_seconds: int = Field(default=86400, alias="FILE_CACHE_TTL_SECONDS")
     
     # AI Configuration (OpenRouter)
     ai_provider: str = Field(default="openrouter", alias="AI_PROVIDER")
@@ -54,6 +61,26 @@ class Settings(BaseSettings):
     ai_model_tier2: str = Field(default="openai/gpt-4-turbo", alias="AI_MODEL_TIER2")
     ai_max_tokens: int = Field(default=4096, alias="AI_MAX_TOKENS")
     ai_temperature: float = Field(default=0.3, alias="AI_TEMPERATURE")
+    ai_static_signal_wait_ms: int = Field(default=500, alias="AI_STATIC_SIGNAL_WAIT_MS")
+    ai_max_static_signals: int = Field(default=10, alias="AI_MAX_STATIC_SIGNALS")
+    ai_chunk_tokens: int = Field(default=8000, alias="AI_CHUNK_TOKENS")
+    ai_max_input_tokens: int = Field(default=64000, alias="AI_MAX_INPUT_TOKENS")
+    ai_max_concurrency: int = Field(default=4, alias="AI_MAX_CONCURRENCY")
+    ai_cache_enabled: bool = Field(default=True, alias="AI_CACHE_ENABLED")
+    ai_cache_ttl_seconds: int = Field(default=7 * 86400, alias="AI_CACHE_TTL_SECONDS")
+    ai_request_timeout_seconds: float = Field(default=120, alias="AI_REQUEST_TIMEOUT_SECONDS")
+    ai_connect_timeout_seconds: float = Field(default=10.0, alias="AI_CONNECT_TIMEOUT_SECONDS")
+    ai_max_connections: int = Field(default=20, alias="AI_MAX_CONNECTIONS")
+    ai_max_keepalive: int = Field(default=10, alias="AI_MAX_KEEPALIVE")
+    ai_keepalive_expiry_seconds: float = Field(default=60.0, alias="AI_KEEPALIVE_EXPIRY_SECONDS")
+    ai_retry_attempts: int = Field(default=4, alias="AI_RETRY_ATTEMPTS")
+    ai_retry_max_wait_seconds: float = Field(default=30, alias="AI_RETRY_MAX_WAIT_SECONDS")
+    ai_circuit_failure_threshold: int = Field(default=5, alias="AI_CIRCUIT_FAILURE_THRESHOLD")
+    ai_circuit_window_seconds: int = Field(default=60, alias="AI_CIRCUIT_WINDOW_SECONDS")
+    ai_circuit_cooldown_seconds: int = Field(default=30, alias="AI_CIRCUIT_COOLDOWN_SECONDS")
+    ai_tokens_per_minute: int = Field(default=0, alias="AI_TOKENS_PER_MINUTE")  # 0 = unlimited
+    ai_fallback_enabled: bool = Field(default=True, alias="AI_FALLBACK_ENABLED")
+    ai_streaming: bool = Field(default=True, alias="AI_STREAMING")
     
     # Encryption
     encryption_key: str = Field(..., alias="ENCRYPTION_KEY")
@@ -63,10 +90,16 @@ class Settings(BaseSettings):
     max_pr_lines: int = Field(default=5000, alias="MAX_PR_LINES")
     max_comments_per_pr: int = Field(default=10, alias="MAX_COMMENTS_PER_PR")
     max_file_size_kb: int = Field(default=500, alias="MAX_FILE_SIZE_KB")
+    dedupe_across_runs: bool = Field(default=True, alias="DEDUPE_ACROSS_RUNS")
+    pr_fingerprint_ttl_seconds: int = Field(default=30 * 86400, alias="PR_FINGERPRINT_TTL_SECONDS")
+    incremental_review: bool = Field(default=True, alias="INCREMENTAL_REVIEW")
     
     # Worker Configuration
+    worker_mode: str = Field(default="fork", alias="WORKER_MODE")  # fork, persistent, async
     worker_concurrency: int = Field(default=4, alias="WORKER_CONCURRENCY")
     job_timeout_seconds: int = Field(default=300, alias="JOB_TIMEOUT_SECONDS")
+    static_analysis_workers: int = Field(default=0, alias="STATIC_ANALYSIS_WORKERS")  # 0 = CPU count
+    static_parallel_min_lines: int = Field(default=2000, alias="STATIC_PARALLEL_MIN_LINES")
     
     # Paths
     # Default to current directory's src/prompts
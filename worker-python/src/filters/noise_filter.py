@@ -6,6 +6,7 @@ import re
 from typing import Optional
 import structlog
 
+from ..pipeline.path_classifier import get_path_classifier
 from .classifier import NormalizedFinding
 
 logger = structlog.get_logger(__name__)
@@ -26,19 +27,6 @@ NOISE_PATTERNS = [
     r"indentation",
 ]
 
-# Files that typically generate false positives
-NOISY_FILES = [
-    r"\.test\.(js|ts|py)$",
-    r"\.spec\.(js|ts)$",
-    r"_test\.py$",
-    r"test_.*\.py$",
-    r"__mocks__/",
-    r"fixtures/",
-    r"\.stories\.(js|ts|tsx)$",
-    r"\.config\.(js|ts|mjs)$",
-]
-
-
 def is_noise_pattern(message: str) -> bool:
     """Check if the finding message matches known noise patterns."""
     message_lower = message.lower()
@@ -50,10 +38,7 @@ def is_noise_pattern(message: str) -> bool:
 
 def is_noisy_file(file_path: str) -> bool:
     """Check if the file typically generates noisy findings."""
-    for pattern in NOISY_FILES:
-        if re.search(pattern, file_path):
-            return True
-    return False
+    return get_path_classifier().is_noisy(file_path)
 
 
 def calculate_noise_score(finding: NormalizedFinding) -> float:
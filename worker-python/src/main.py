@@ -3,13 +3,14 @@
 # ===========================================
 
 import asyncio
+import json
 import signal
 import sys
 import threading
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from typing import Any
 import structlog
-from rq import Worker
+from rq import SimpleWorker, Worker
 from rq.job import Job
 
 from .config import (
@@ -18,9 +19,25 @@ from .config import (
     close_database,
     get_redis_client,
     close_redis_client,
+    init_http_client,
+    close_http_client,
+    close_async_redis_client,
+    get_http_client_stats,
+    get_token_cache_stats,
     QUEUE_ANALYSIS,
 )
 from .pipeline.orchestrator import run_analysis
+from .rules import warm_rule_matchers
+from .rules.parallel import shutdown_static_executor
+from .ai.clients import close_openai_clients
+from .ai.reviewer import load_prompt, REVIEW_PROMPT_NAMES
+from .worker import (
+    start_persistent_loop,
+    stop_persistent_loop,
+    has_persistent_loop,
+    run_async,
+    AsyncWorker,
+)
 
 # Configure structured logging
 structlog.configure(
@@ -44,21 +61,22 @@ structlog.configure(
 logger = structlog.get_logger(__name__)
 
 
-def process_analysis_job(job_data: dict) -> dict:
-    """Process an analysis job from the queue."""
+# Job function name as enqueued, whichever way this module was started
+ANALYSIS_JOB_FUNC = "src.main.process_analysis_job"
+
+
+async def run_analysis_job(job_data: dict) -> dict:
+    """Run an analysis job on the current event loop."""
     logger.info("Processing analysis job", job_id=job_data.get("job_id"))
     
-    # Run async orchestrator
-    result = asyncio.run(
-        run_analysis(
-            pr_id=job_data["prId"],
-            repo_id=job_data["repoId"],
-            org_id=job_data["orgId"],
-            pr_number=job_data["prNumber"],
-            head_sha=job_data["headSha"],
-            run_id=job_data.get("runId", ""),
-            run_mode=job_data.get("runMode", "shadow"),
-        )
+    result = await run_analysis(
+        pr_id=job_data["prId"],
+        repo_id=job_data["repoId"],
+        org_id=job_data["orgId"],
+        pr_number=job_data["prNumber"],
+        head_sha=job_data["headSha"],
+        run_id=job_data.get("runId", ""),
+        run_mode=job_data.get("runMode", "shadow"),
     )
     
     return {
@@ -69,10 +87,37 @@ def process_analysis_job(job_data: dict) -> dict:
     }
 
 
+def process_analysis_job(job_data: dict) -> dict:
+    """Process an analysis job from the queue."""
+    async def run_job():
+        try:
+            return await run_analysis_job(job_data)
+        finally:
+            if not has_persistent_loop():
+                # Pooled connections die with this job's event loop
+                await close_http_client()
+                await close_openai_clients()
+                await close_async_redis_client()
+                # A work-horse exits without shutdown hooks; don't orphan a pool
+                shutdown_static_executor()
+    
+    # Run async orchestrator
+    return run_async(run_job())
+
+
+def warm_caches() -> None:
+    """Build compiled rule matchers and load prompt templates up front."""
+    warm_rule_matchers()
+    for prompt_name in REVIEW_PROMPT_NAMES:
+        load_prompt(prompt_name)
+
+
 async def worker_startup() -> None:
     """Initialize worker resources."""
     logger.info("Initializing worker")
     await init_database()
+    await init_http_client()
+    warm_caches()
     logger.info("Worker initialized")
 
 
@@ -80,42 +125,81 @@ async def worker_shutdown() -> None:
     """Cleanup worker resources."""
     logger.info("Shutting down worker")
     await close_database()
+    await close_http_client()
+    await close_openai_clients()
+    await close_async_redis_client()
     close_redis_client()
+    shutdown_static_executor()
     logger.info("Worker shutdown complete")
 
 
+def create_rq_worker() -> Worker:
+    """
+    Create the RQ worker for the configured WORKER_MODE.
+
+    fork: RQ's default worker, which forks a work-horse per job.
+    persistent: jobs run in this process on a long-lived event loop, so
+    database, HTTP and Redis pools and warmed caches survive across jobs.
+    (async mode doesn't use an RQ worker; see run_async_worker.)
+    """
+    import uuid
+    worker_class = SimpleWorker if settings.worker_mode == "persistent" else Worker
+    
+    return worker_class(
+        queues=[QUEUE_ANALYSIS],
+        connection=get_redis_client(),
+        name=f"worker-{settings.node_env}-{uuid.uuid4().hex[:8]}",
+    )
+
+
+async def run_async_worker() -> None:
+    """Run up to WORKER_CONCURRENCY analysis jobs at once on one event loop."""
+    await worker_startup()
+    try:
+        worker = AsyncWorker(
+            queue_names=[QUEUE_ANALYSIS],
+            connection=get_redis_client(),
+            handlers={ANALYSIS_JOB_FUNC: run_analysis_job},
+        )
+        await worker.run()
+    finally:
+        await worker_shutdown()
+
+
 def run_worker():
     """Run the RQ worker."""
+    if settings.worker_mode == "async":
+        asyncio.run(run_async_worker())
+        return
+    
+    if settings.worker_mode == "persistent":
+        start_persistent_loop()
+    
     # Initialize database pool
-    asyncio.run(worker_startup())
+    run_async(worker_startup())
     
-    # Setup signal handlers
-
+    def shutdown():
+        run_async(worker_shutdown())
+        stop_persistent_loop()
     
+    # Setup signal handlers
     def signal_handler(sig, frame):
         logger.info("Received shutdown signal", signal=sig)
-        asyncio.run(worker_shutdown())
+        shutdown()
         sys.exit(0)
     
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
     # Create and run worker
-    redis_conn = get_redis_client()
-    
-    import uuid
-    worker = Worker(
-        queues=[QUEUE_ANALYSIS],
-        connection=redis_conn,
-        name=f"worker-{settings.node_env}-{uuid.uuid4().hex[:8]}",
-    )
+    worker = create_rq_worker()
     
-    logger.info("Starting worker", queues=[QUEUE_ANALYSIS])
+    logger.info("Starting worker", queues=[QUEUE_ANALYSIS], mode=settings.worker_mode)
     
     try:
         worker.work(with_scheduler=False)
     finally:
-        asyncio.run(worker_shutdown())
+        shutdown()
 
 
 class HealthCheckHandler(BaseHTTPRequestHandler):
@@ -123,6 +207,17 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
     
     def do_GET(self):
         """Handle GET requests."""
+        if self.path == "/metrics":
+            body = json.dumps({
+                "github_http": get_http_client_stats(),
+                "github_tokens": get_token_cache_stats(),
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
         self.send_response(200)
         self.send_header("Content-type", "text/plain")
         self.end_headers()
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 from .Run import Run
 from .PullRequest import PullRequest
 from .Repository import Repository
@@ -43,4 +44,15 @@ class Finding(Document):
             "repoId",
             "severity",
             "fingerprint",
+            # Makes saving a run's findings idempotent across job retries
+            IndexModel(
+                [("runId", ASCENDING), ("fingerprint", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"fingerprint": {"$type": "string"}},
+            ),
+            # Fingerprints a PR has already reported, for cross-run dedup
+            IndexModel(
+                [("prId", ASCENDING), ("fingerprint", ASCENDING)],
+                partialFilterExpression={"suppressed": False},
+            ),
         ]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, List
 from beanie import Document, Link
 from pydantic import Field
 from .PullRequest import PullRequest
@@ -14,6 +14,9 @@ class Run(Document):
     started_at: Optional[datetime] = Field(None, alias="startedAt")
     completed_at: Optional[datetime] = Field(None, alias="completedAt")
     duration_ms: Optional[int] = Field(None, alias="durationMs")
+    stats_recorded: Optional[dict] = Field(None, alias="statsRecorded")  # Day and counts added to the rollups
+    head_sha: Optional[str] = Field(None, alias="headSha")  # Commit the run analyzed
+    review_mode: str = Field("full", alias="reviewMode")  # full, incremental
     
     # Analysis metrics
     token_count_input: int = Field(0, alias="tokenCountInput")
@@ -22,16 +25,36 @@ class Run(Document):
     files_analyzed: int = Field(0, alias="filesAnalyzed")
     lines_analyzed: int = Field(0, alias="linesAnalyzed")
     hunks_analyzed: int = Field(0, alias="hunksAnalyzed")
+    diff_truncated: bool = Field(False, alias="diffTruncated")  # Stopped at the PR line budget
+    files_oversized: int = Field(0, alias="filesOversized")  # Skipped for MAX_FILE_SIZE_KB
     
     # Finding stats
     findings_total: int = Field(0, alias="findingsTotal")
     findings_static: int = Field(0, alias="findingsStatic")
     findings_ai: int = Field(0, alias="findingsAi")
     findings_suppressed: int = Field(0, alias="findingsSuppressed")
+    findings_carried: int = Field(0, alias="findingsCarried")  # Kept from the previous run
     
     ai_model_used: Optional[str] = Field(None, alias="aiModelUsed")
     ai_tier: Optional[str] = Field(None, alias="aiTier")
     
+    # AI review coverage
+    ai_chunks: int = Field(0, alias="aiChunks")
+    ai_hunks_reviewed: int = Field(0, alias="aiHunksReviewed")
+    ai_hunks_truncated: int = Field(0, alias="aiHunksTruncated")
+    ai_hunks_skipped: List[dict] = Field(default_factory=list, alias="aiHunksSkipped")  # Left out by the AI input cap
+    ai_chunks_failed: int = Field(0, alias="aiChunksFailed")
+    ai_fallback_chunks: int = Field(0, alias="aiFallbackChunks")  # Answered by the tier-1 fallback
+    ai_error: Optional[str] = Field(None, alias="aiError")  # First failed chunk's error
+    ai_responses_truncated: int = Field(0, alias="aiResponsesTruncated")  # Cut off at max_tokens
+    ai_first_finding_ms: Optional[int] = Field(None, alias="aiFirstFindingMs")
+    ai_cache_hits: int = Field(0, alias="aiCacheHits")
+    ai_cache_misses: int = Field(0, alias="aiCacheMisses")
+    ai_tokens_saved: int = Field(0, alias="aiTokensSaved")
+    
+    # Wall-clock milliseconds per pipeline stage
+    stage_timings: Dict[str, int] = Field(default_factory=dict, alias="stageTimings")
+    
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
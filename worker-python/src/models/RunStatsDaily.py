@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class RunStatsDaily(Document):
+    """Run totals for one org (repoId unset) or one repository on one UTC day."""
+    org_id: PydanticObjectId = Field(..., alias="orgId")
+    repo_id: Optional[PydanticObjectId] = Field(None, alias="repoId")
+    day: datetime
+    
+    runs_total: int = Field(0, alias="runsTotal")
+    runs_completed: int = Field(0, alias="runsCompleted")
+    runs_failed: int = Field(0, alias="runsFailed")
+    runs_skipped: int = Field(0, alias="runsSkipped")
+    
+    # Sum and count so averages can be taken over any range of days
+    duration_ms_total: int = Field(0, alias="durationMsTotal")
+    duration_count: int = Field(0, alias="durationCount")
+    
+    findings_total: int = Field(0, alias="findingsTotal")
+    tokens_in: int = Field(0, alias="tokensIn")
+    tokens_out: int = Field(0, alias="tokensOut")
+    token_cost: float = Field(0.0, alias="tokenCost")
+    
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "run_stats_daily"
+        indexes = [
+            IndexModel(
+                [("orgId", ASCENDING), ("repoId", ASCENDING), ("day", ASCENDING)],
+                unique=True,
+            ),
+        ]
@@ -1,6 +1,7 @@
 from .commenter import post_review_comments, format_inline_comment, format_summary_comment
 from .storage import (
     create_run,
+    update_run,
     update_run_started,
     update_run_completed,
     update_run_failed,
@@ -9,7 +10,11 @@ from .storage import (
     save_findings_batch,
     get_run_findings,
     get_existing_fingerprints,
+    get_reported_fingerprints,
+    record_reported_fingerprints,
     get_run_stats,
+    record_run_stats,
+    rebuild_run_stats,
 )
 from .formatter import (
     format_finding_markdown,
@@ -23,6 +28,7 @@ __all__ = [
     "format_inline_comment",
     "format_summary_comment",
     "create_run",
+    "update_run",
     "update_run_started",
     "update_run_completed",
     "update_run_failed",
@@ -31,7 +37,11 @@ __all__ = [
     "save_findings_batch",
     "get_run_findings",
     "get_existing_fingerprints",
+    "get_reported_fingerprints",
+    "record_reported_fingerprints",
     "get_run_stats",
+    "record_run_stats",
+    "rebuild_run_stats",
     "format_finding_markdown",
     "format_summary_table",
     "format_file_section",
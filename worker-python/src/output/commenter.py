@@ -52,11 +52,19 @@ def format_summary_comment(
     findings: list[NormalizedFinding],
     run_id: str,
     shadow_mode: bool = False,
+    notice: Optional[str] = None,
 ) -> str:
-    """Format summary comment for PR."""
+    """
+    Format summary comment for PR.
+    
+    A notice (e.g. that only part of the diff was reviewed) is shown
+    above the findings.
+    """
     active = [f for f in findings if not f.suppressed]
     
     if not active:
+        if notice:
+            return f"✅ **AI Code Review**: No issues found.\n\n> ⚠️ {notice}"
         return "✅ **AI Code Review**: No issues found in this PR."
     
     # Group by severity
@@ -70,6 +78,9 @@ def format_summary_comment(
     if shadow_mode:
         lines.append("> ⚠️ **Shadow Mode**: This is a preview review and won't block the PR.\n")
     
+    if notice:
+        lines.append(f"> ⚠️ {notice}\n")
+    
     lines.append(f"Found **{len(active)}** issue(s):\n")
     
     for severity in ["block", "high", "medium", "low"]:
@@ -110,8 +121,13 @@ async def post_review_comments(
     run_id: str,
     shadow_mode: bool = False,
     max_comments: int = 10,
+    notice: Optional[str] = None,
 ) -> dict:
-    """Post review comments to PR."""
+    """
+    Post review comments to PR.
+    
+    With a notice, the summary is posted even when there are no findings.
+    """
     if shadow_mode:
         logger.info(
             "Shadow mode: skipping comment posting",
@@ -127,7 +143,7 @@ async def post_review_comments(
     
     active = [f for f in findings if not f.suppressed]
     
-    if not active:
+    if not active and not notice:
         logger.info("No active findings to post", pr=f"{owner}/{repo}#{pull_number}")
         return {
             "posted": True,
@@ -147,7 +163,7 @@ async def post_review_comments(
             })
     
     # Create summary
-    summary = format_summary_comment(findings, run_id, shadow_mode)
+    summary = format_summary_comment(findings, run_id, shadow_mode, notice)
     
     try:
         result = await post_pr_review(
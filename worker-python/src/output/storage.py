@@ -1,10 +1,15 @@
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List, Set, Dict, Any
 import structlog
 from beanie import PydanticObjectId
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 
+from ..config import settings, get_async_redis_client
 from ..models.Run import Run
+from ..models.RunStatsDaily import RunStatsDaily
 from ..models.Finding import Finding
 from ..models.PullRequest import PullRequest
 from ..models.Repository import Repository
@@ -31,74 +36,123 @@ async def create_run(
     return str(run.id)
 
 
-async def update_run_started(run_id: str) -> None:
-    """Mark run as started."""
-    run = await Run.get(PydanticObjectId(run_id))
-    if run:
-        run.status = "running"
-        run.started_at = datetime.utcnow()
-        await run.save()
+# Pipeline metric keys -> Run document fields
+RUN_METRIC_FIELDS = {
+    "files_analyzed": "filesAnalyzed",
+    "lines_analyzed": "linesAnalyzed",
+    "hunks_analyzed": "hunksAnalyzed",
+    "findings_total": "findingsTotal",
+    "findings_static": "findingsStatic",
+    "findings_ai": "findingsAi",
+    "findings_suppressed": "findingsSuppressed",
+    "tokens_in": "tokenCountInput",
+    "tokens_out": "tokenCountOutput",
+    "token_cost": "tokenCost",
+    "ai_model": "aiModelUsed",
+    "ai_tier": "aiTier",
+    "review_mode": "reviewMode",
+    "findings_carried": "findingsCarried",
+    "diff_truncated": "diffTruncated",
+    "files_oversized": "filesOversized",
+    "ai_chunks": "aiChunks",
+    "ai_hunks_reviewed": "aiHunksReviewed",
+    "ai_hunks_truncated": "aiHunksTruncated",
+    "ai_hunks_skipped": "aiHunksSkipped",
+    "ai_chunks_failed": "aiChunksFailed",
+    "ai_fallback_chunks": "aiFallbackChunks",
+    "ai_error": "aiError",
+    "ai_responses_truncated": "aiResponsesTruncated",
+    "ai_first_finding_ms": "aiFirstFindingMs",
+    "ai_cache_hits": "aiCacheHits",
+    "ai_cache_misses": "aiCacheMisses",
+    "ai_tokens_saved": "aiTokensSaved",
+    "stage_timings": "stageTimings",
+}
+
+
+def run_metric_fields(metrics: dict) -> Dict[str, Any]:
+    """Map pipeline metrics onto Run document fields."""
+    return {
+        field: metrics[key]
+        for key, field in RUN_METRIC_FIELDS.items()
+        if key in metrics
+    }
+
+
+async def update_run(run_id: str, fields: Dict[str, Any]) -> bool:
+    """
+    Apply a partial update to a run in one write.
+    
+    Uses $set without reading the run first, so only the given fields
+    change and concurrent updates from the API to other fields are kept.
+    Returns False if the run doesn't exist.
+    """
+    result = await Run.get_motor_collection().update_one(
+        {"_id": ObjectId(run_id)},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}},
+    )
+    return result.matched_count > 0
+
+
+def _finished_fields(started_at: Optional[datetime]) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    fields: Dict[str, Any] = {"completedAt": now}
+    if started_at:
+        fields["durationMs"] = int((now - started_at).total_seconds() * 1000)
+    return fields
+
+
+async def update_run_started(run_id: str, head_sha: Optional[str] = None) -> datetime:
+    """Mark run as started on a head commit and return the start time."""
+    started_at = datetime.utcnow()
+    fields: Dict[str, Any] = {"status": "running", "startedAt": started_at}
+    if head_sha:
+        fields["headSha"] = head_sha
+    await update_run(run_id, fields)
+    return started_at
 
 
 async def update_run_completed(
     run_id: str,
     metrics: dict,
+    started_at: Optional[datetime] = None,
 ) -> None:
-    """Mark run as completed with metrics."""
-    run = await Run.get(PydanticObjectId(run_id))
-    if not run:
-        return
-
-    now = datetime.utcnow()
-    duration = 0
-    if run.started_at:
-        duration = int((now - run.started_at).total_seconds() * 1000)
-
-    run.status = "completed"
-    run.completed_at = now
-    run.duration_ms = duration
-    run.files_analyzed = metrics.get("files_analyzed", 0)
-    run.lines_analyzed = metrics.get("lines_analyzed", 0)
-    run.hunks_analyzed = metrics.get("hunks_analyzed", 0)
-    run.findings_total = metrics.get("findings_total", 0)
-    run.findings_static = metrics.get("findings_static", 0)
-    run.findings_ai = metrics.get("findings_ai", 0)
-    run.findings_suppressed = metrics.get("findings_suppressed", 0)
-    run.token_count_input = metrics.get("tokens_in", 0)
-    run.token_count_output = metrics.get("tokens_out", 0)
-    run.token_cost = metrics.get("token_cost", 0)
-    run.ai_model_used = metrics.get("ai_model")
-    run.ai_tier = metrics.get("ai_tier")
-    
-    await run.save()
+    """Mark run as completed with metrics, duration and completion time."""
+    await update_run(run_id, {
+        "status": "completed",
+        "reason": None,
+        "error": None,
+        **run_metric_fields(metrics),
+        **_finished_fields(started_at),
+    })
     logger.info("Run completed", run_id=run_id)
 
 
 async def update_run_failed(
     run_id: str,
     error: str,
+    started_at: Optional[datetime] = None,
 ) -> None:
     """Mark run as failed with error."""
-    run = await Run.get(PydanticObjectId(run_id))
-    if run:
-        run.status = "failed"
-        run.error = error
-        run.completed_at = datetime.utcnow()
-        await run.save()
+    await update_run(run_id, {
+        "status": "failed",
+        "error": error,
+        **_finished_fields(started_at),
+    })
     logger.error("Run failed", run_id=run_id, error=error)
 
 
 async def update_run_skipped(
     run_id: str,
     reason: str,
+    started_at: Optional[datetime] = None,
 ) -> None:
     """Mark run as skipped with reason."""
-    run = await Run.get(PydanticObjectId(run_id))
-    if run:
-        run.status = "skipped"
-        run.reason = reason
-        run.completed_at = datetime.utcnow()
-        await run.save()
+    await update_run(run_id, {
+        "status": "skipped",
+        "reason": reason,
+        **_finished_fields(started_at),
+    })
     logger.info("Run skipped", run_id=run_id, reason=reason)
 
 
@@ -133,19 +187,109 @@ async def save_finding(finding: NormalizedFinding) -> str:
     return str(doc.id)
 
 
-async def save_findings_batch(findings: List[NormalizedFinding]) -> int:
-    """Save multiple findings efficiently."""
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _ref_id(value: Any) -> Optional[ObjectId]:
+    """Get the ObjectId from a reference stored as an ObjectId or DBRef."""
+    return getattr(value, "id", value)
+
+
+async def resolve_run_refs(run_id: str) -> tuple[Optional[ObjectId], Optional[ObjectId]]:
+    """Get a run's PR and repository ids with two projected lookups."""
+    run = await Run.get_motor_collection().find_one(
+        {"_id": ObjectId(run_id)},
+        {"prId": 1},
+    )
+    pr_id = _ref_id(run.get("prId")) if run else None
+    if pr_id is None:
+        return None, None
+    
+    pr = await PullRequest.get_motor_collection().find_one({"_id": pr_id}, {"repoId": 1})
+    return pr_id, _ref_id(pr.get("repoId")) if pr else None
+
+
+def build_finding_document(
+    finding: NormalizedFinding,
+    run_id: ObjectId,
+    pr_id: Optional[ObjectId],
+    repo_id: Optional[ObjectId],
+    created_at: datetime,
+) -> Dict[str, Any]:
+    """Build the raw findings collection document for a finding."""
+    return {
+        "runId": run_id,
+        "prId": pr_id,
+        "repoId": repo_id,
+        "filePath": finding.file_path,
+        "lineStart": finding.line_start,
+        "lineEnd": finding.line_end,
+        "source": finding.source,
+        "category": finding.category,
+        "severity": finding.severity,
+        "confidence": finding.confidence,
+        "title": finding.title,
+        "message": finding.message,
+        "suggestion": finding.suggestion,
+        "codeSnippet": finding.code_snippet,
+        "ruleId": finding.rule_id,
+        "aiReasoning": finding.ai_reasoning,
+        "aiModel": finding.ai_model,
+        "suppressed": finding.suppressed,
+        "suppressionReason": finding.suppression_reason,
+        "fingerprint": finding.fingerprint,
+        "created_at": created_at,
+    }
+
+
+async def save_findings_batch(
+    findings: List[NormalizedFinding],
+    pr_id: Optional[str] = None,
+    repo_id: Optional[str] = None,
+) -> int:
+    """
+    Save a run's findings with one unordered bulk write.
+    
+    All findings must belong to the same run. PR and repository ids are
+    looked up once if not given. Findings are upserted on (runId,
+    fingerprint), so saving the same run again (e.g. on a job retry)
+    inserts nothing new. Returns the number of findings inserted.
+    """
     if not findings:
         return 0
     
-    # Efficient batch saving might need optimization if we need pr_id/repo_id
-    # For now, following the pattern of save_finding
-    count = 0
+    run_id = ObjectId(findings[0].run_id)
+    if pr_id is None:
+        pr_oid, repo_oid = await resolve_run_refs(str(run_id))
+    else:
+        pr_oid = ObjectId(pr_id)
+        repo_oid = ObjectId(repo_id) if repo_id else None
+    
+    now = datetime.utcnow()
+    operations = []
     for finding in findings:
-        await save_finding(finding)
-        count += 1
+        doc = build_finding_document(finding, run_id, pr_oid, repo_oid, now)
+        if finding.fingerprint:
+            operations.append(UpdateOne(
+                {"runId": run_id, "fingerprint": finding.fingerprint},
+                {"$setOnInsert": doc},
+                upsert=True,
+            ))
+        else:
+            operations.append(InsertOne(doc))
+    
+    try:
+        result = await Finding.get_motor_collection().bulk_write(operations, ordered=False)
+        count = result.upserted_count + result.inserted_count
+    except BulkWriteError as e:
+        # A concurrent save of the same run lost the upsert race; those
+        # findings already exist
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+            raise
+        count = e.details.get("nUpserted", 0) + e.details.get("nInserted", 0)
     
-    logger.info("Saved findings", count=count)
+    logger.info("Saved findings", count=count, skipped=len(findings) - count)
     return count
 
 
@@ -153,55 +297,254 @@ async def get_run_findings(
     run_id: str,
     only_active: bool = True,
 ) -> List[Dict[str, Any]]:
-    """Get all findings for a run."""
-    query: Dict[str, Any] = {"runId": PydanticObjectId(run_id)}
+    """Get all findings for a run as raw findings collection documents."""
+    query: Dict[str, Any] = {"runId": ObjectId(run_id)}
     if only_active:
         query["suppressed"] = False
     
-    findings = await Finding.find(query).sort("severity", "createdAt").to_list()
-    return [f.dict(by_alias=True) for f in findings]
+    cursor = Finding.get_motor_collection().find(query, {"_id": 0, "prId": 0, "repoId": 0})
+    return await cursor.to_list(None)
+
+
+async def get_previous_run(pr_id: str, exclude_run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get the id and head commit of the latest completed run on a PR.
+    
+    Only runs that recorded their head commit and reviewed every hunk
+    are considered: a run that stopped at the PR line budget, whose AI
+    chunks failed, or whose hunks or responses were truncated or skipped,
+    left part of the PR unreviewed.
+    """
+    query: Dict[str, Any] = {
+        "prId": ObjectId(pr_id),
+        "status": "completed",
+        "headSha": {"$type": "string"},
+        "diffTruncated": {"$ne": True},
+        "aiChunksFailed": {"$not": {"$gt": 0}},
+        "aiHunksTruncated": {"$not": {"$gt": 0}},
+        "aiHunksSkipped.0": {"$exists": False},
+        "aiResponsesTruncated": {"$not": {"$gt": 0}},
+    }
+    if exclude_run_id:
+        query["_id"] = {"$ne": ObjectId(exclude_run_id)}
+    
+    return await Run.get_motor_collection().find_one(
+        query,
+        {"headSha": 1},
+        sort=[("completedAt", -1)],
+    )
+
+
+async def get_existing_fingerprints(
+    pr_id: str,
+    exclude_run_id: Optional[str] = None,
+) -> Set[str]:
+    """
+    Get fingerprints of findings reported by previous runs on a PR.
+    
+    A distinct query over the partial (prId, fingerprint) index of
+    unsuppressed findings; no run or finding documents are loaded.
+    """
+    query: Dict[str, Any] = {
+        "prId": ObjectId(pr_id),
+        "suppressed": False,
+        "fingerprint": {"$type": "string"},
+    }
+    if exclude_run_id:
+        query["runId"] = {"$ne": ObjectId(exclude_run_id)}
+    
+    fingerprints = await Finding.get_motor_collection().distinct("fingerprint", query)
+    return set(fingerprints)
+
 
+# Marks a PR's fingerprint set as loaded from MongoDB, so an empty PR isn't a
+# cache miss; a set without it holds only recorded fingerprints
+_FINGERPRINT_SET_MARKER = ""
 
-async def get_existing_fingerprints(pr_id: str) -> Set[str]:
-    """Get fingerprints from previous runs on same PR."""
-    # Find all completed runs for this PR
-    runs = await Run.find({"prId": PydanticObjectId(pr_id), "status": "completed"}).to_list()
-    run_ids = [r.id for r in runs]
+
+def _fingerprint_set_key(pr_id: str) -> str:
+    return f"pr:{pr_id}:fingerprints"
+
+
+async def get_reported_fingerprints(
+    pr_id: str,
+    fingerprints: List[str],
+    exclude_run_id: Optional[str] = None,
+) -> Set[str]:
+    """
+    Get which of the given fingerprints a previous run on the PR reported.
     
-    if not run_ids:
+    Membership is checked against a Redis set per PR, so the cost doesn't
+    grow with the PR's history. On a miss the set is loaded from MongoDB
+    with get_existing_fingerprints; if Redis is unavailable MongoDB is
+    queried directly. The set only holds fingerprints of runs whose review
+    was posted (see record_reported_fingerprints), so a retried run never
+    finds its own.
+    """
+    if not fingerprints:
         return set()
     
-    # Find all findings for these runs
-    findings = await Finding.find({"runId": {"$in": run_ids}}).to_list()
-    return {f.fingerprint for f in findings if f.fingerprint}
+    key = _fingerprint_set_key(pr_id)
+    try:
+        redis = get_async_redis_client()
+        # One call checks the marker with the fingerprints, so a TTL expiry can't slip between
+        loaded, *hits = await redis.smismember(key, [_FINGERPRINT_SET_MARKER, *fingerprints])
+        if loaded:
+            return {fp for fp, hit in zip(fingerprints, hits) if hit}
+    except Exception as e:
+        logger.warning("Fingerprint cache read failed", pr_id=pr_id, error=str(e))
+        existing = await get_existing_fingerprints(pr_id, exclude_run_id)
+        return existing.intersection(fingerprints)
+    
+    existing = await get_existing_fingerprints(pr_id, exclude_run_id)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, _FINGERPRINT_SET_MARKER, *existing)
+            pipe.expire(key, settings.pr_fingerprint_ttl_seconds)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Fingerprint cache write failed", pr_id=pr_id, error=str(e))
+    
+    return existing.intersection(fingerprints)
+
+
+async def record_reported_fingerprints(pr_id: str, fingerprints: List[str]) -> None:
+    """
+    Add a run's fingerprints to the PR's Redis set once its review has
+    been posted.
+    
+    If the set isn't loaded (no marker), the next lookup still loads it
+    from MongoDB, which includes these findings.
+    """
+    if not fingerprints:
+        return
+    
+    key = _fingerprint_set_key(pr_id)
+    try:
+        redis = get_async_redis_client()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, *fingerprints)
+            pipe.expire(key, settings.pr_fingerprint_ttl_seconds)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Fingerprint cache write failed", pr_id=pr_id, error=str(e))
+
+
+# ===========================================
+# Daily Run Stats Rollups
+# ===========================================
+
+RUN_STATUS_COUNTERS = {
+    "completed": "runsCompleted",
+    "failed": "runsFailed",
+    "skipped": "runsSkipped",
+}
+
 
+def _utc_day(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
 
-async def get_run_stats(org_id: str, days: int = 30) -> Dict[str, Any]:
-    """Get aggregate run statistics for an organization."""
-    # In MongoDB, we'd use aggregation for this across multiple collections
-    # But since repo information is in its own collection, we need to find them first
-    repos = await Repository.find({"orgId": PydanticObjectId(org_id)}).to_list()
-    repo_ids = [r.id for r in repos]
+
+def _stats_updates(
+    org_oid: ObjectId,
+    repo_oid: ObjectId,
+    day: datetime,
+    increments: Dict[str, Any],
+    now: datetime,
+) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"orgId": org_oid, "repoId": scope, "day": day},
+            {"$inc": increments, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        for scope in (None, repo_oid)
+    ]
+
+
+async def record_run_stats(
+    run_id: str,
+    org_id: str,
+    repo_id: str,
+    status: str,
+    metrics: Optional[dict] = None,
+    started_at: Optional[datetime] = None,
+) -> None:
+    """
+    Add a finished run to the day's org and repository rollups.
+    
+    Counted once per run: what was added is kept on the run
+    (statsRecorded), swapped in atomically, and a run recorded again (a
+    cancelled attempt and its retry) first takes back its earlier
+    contribution. One unordered bulk write of $inc upserts; stats failures
+    are logged and never fail the run.
+    """
+    metrics = metrics or {}
+    increments: Dict[str, Any] = {
+        "runsTotal": 1,
+        "findingsTotal": metrics.get("findings_total", 0),
+        "tokensIn": metrics.get("tokens_in", 0),
+        "tokensOut": metrics.get("tokens_out", 0),
+        "tokenCost": metrics.get("token_cost", 0),
+    }
+    if status in RUN_STATUS_COUNTERS:
+        increments[RUN_STATUS_COUNTERS[status]] = 1
+    
+    now = datetime.utcnow()
+    if started_at:
+        increments["durationMsTotal"] = int((now - started_at).total_seconds() * 1000)
+        increments["durationCount"] = 1
+    day = _utc_day(now)
+    org_oid, repo_oid = ObjectId(org_id), ObjectId(repo_id)
     
-    prs = await PullRequest.find({"repoId": {"$in": repo_ids}}).to_list()
-    pr_ids = [p.id for p in prs]
+    try:
+        previous = await Run.get_motor_collection().find_one_and_update(
+            {"_id": ObjectId(run_id)},
+            {"$set": {"statsRecorded": {"day": day, "increments": increments}}},
+            projection={"statsRecorded": 1},
+        )
+        recorded = (previous or {}).get("statsRecorded")
+        
+        operations = _stats_updates(org_oid, repo_oid, day, increments, now)
+        if recorded:
+            reverted = {field: -value for field, value in recorded["increments"].items()}
+            operations += _stats_updates(org_oid, repo_oid, recorded["day"], reverted, now)
+        await RunStatsDaily.get_motor_collection().bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.warning("Failed to record run stats", org_id=org_id, repo_id=repo_id, error=str(e))
+
+
+async def get_run_stats(
+    org_id: str,
+    days: int = 30,
+    repo_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Get aggregate run statistics for an organization, or one of its
+    repositories, over the last `days` days (including today).
     
-    # Now aggregate runs for these PRs
-    # This might be slow if there are many PRs
+    Reads at most one rollup document per day.
+    """
+    since = _utc_day(datetime.utcnow()) - timedelta(days=days - 1)
     pipeline = [
-        {"$match": {"prId": {"$in": pr_ids}}},
+        {"$match": {
+            "orgId": ObjectId(org_id),
+            "repoId": ObjectId(repo_id) if repo_id else None,
+            "day": {"$gte": since},
+        }},
         {"$group": {
             "_id": None,
-            "total_runs": {"$sum": 1},
-            "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-            "failed": {"$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}},
-            "avg_duration": {"$avg": "$durationMs"},
+            "total_runs": {"$sum": "$runsTotal"},
+            "completed": {"$sum": "$runsCompleted"},
+            "failed": {"$sum": "$runsFailed"},
+            "duration_total": {"$sum": "$durationMsTotal"},
+            "duration_count": {"$sum": "$durationCount"},
             "total_findings": {"$sum": "$findingsTotal"},
             "total_cost": {"$sum": "$tokenCost"},
-        }}
+        }},
     ]
     
-    results = await Run.aggregate(pipeline).to_list()
+    results = await RunStatsDaily.get_motor_collection().aggregate(pipeline).to_list(None)
     if not results:
         return {
             "total_runs": 0,
@@ -213,11 +556,100 @@ async def get_run_stats(org_id: str, days: int = 30) -> Dict[str, Any]:
         }
     
     res = results[0]
+    duration_count = res.get("duration_count", 0)
     return {
         "total_runs": res.get("total_runs", 0),
         "completed": res.get("completed", 0),
         "failed": res.get("failed", 0),
-        "avg_duration_ms": float(res.get("avg_duration") or 0.0),
+        "avg_duration_ms": res["duration_total"] / duration_count if duration_count else 0.0,
         "total_findings": res.get("total_findings", 0),
         "total_cost": float(res.get("total_cost") or 0.0),
     }
+
+
+async def rebuild_run_stats(org_id: str, days: int = 90) -> None:
+    """
+    Recompute an organization's rollups for the last `days` days from
+    its runs, e.g. to backfill history or repair drift.
+    
+    Runs are joined to their PR and repository with $lookup, grouped per
+    repository per day, and merged over the existing rollups; the
+    org-wide documents are then rebuilt from the repository ones.
+    """
+    org_oid = ObjectId(org_id)
+    since = _utc_day(datetime.utcnow()) - timedelta(days=days - 1)
+    day_expr = {"$dateTrunc": {"date": "$completedAt", "unit": "day"}}
+    
+    await Run.get_motor_collection().aggregate([
+        {"$match": {
+            "completedAt": {"$gte": since},
+            "status": {"$in": list(RUN_STATUS_COUNTERS)},
+        }},
+        {"$lookup": {
+            "from": PullRequest.get_collection_name(),
+            "localField": "prId",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"repoId": 1}}],
+            "as": "pr",
+        }},
+        {"$unwind": "$pr"},
+        {"$lookup": {
+            "from": Repository.get_collection_name(),
+            "localField": "pr.repoId",
+            "foreignField": "_id",
+            "pipeline": [{"$match": {"orgId": org_oid}}, {"$project": {"_id": 1}}],
+            "as": "repo",
+        }},
+        {"$unwind": "$repo"},
+        {"$group": {
+            "_id": {"repoId": "$repo._id", "day": day_expr},
+            "runsTotal": {"$sum": 1},
+            "runsCompleted": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+            "runsFailed": {"$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}},
+            "runsSkipped": {"$sum": {"$cond": [{"$eq": ["$status", "skipped"]}, 1, 0]}},
+            "durationMsTotal": {"$sum": {"$ifNull": ["$durationMs", 0]}},
+            "durationCount": {"$sum": {"$cond": [{"$ifNull": ["$durationMs", False]}, 1, 0]}},
+            "findingsTotal": {"$sum": "$findingsTotal"},
+            "tokensIn": {"$sum": "$tokenCountInput"},
+            "tokensOut": {"$sum": "$tokenCountOutput"},
+            "tokenCost": {"$sum": "$tokenCost"},
+        }},
+        {"$set": {
+            "orgId": org_oid,
+            "repoId": "$_id.repoId",
+            "day": "$_id.day",
+            "updated_at": "$$NOW",
+        }},
+        {"$unset": "_id"},
+        {"$merge": {
+            "into": RunStatsDaily.get_collection_name(),
+            "on": ["orgId", "repoId", "day"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]).to_list(None)
+    
+    await RunStatsDaily.get_motor_collection().aggregate([
+        {"$match": {"orgId": org_oid, "repoId": {"$ne": None}, "day": {"$gte": since}}},
+        {"$group": {
+            "_id": "$day",
+            **{
+                field: {"$sum": f"${field}"}
+                for field in (
+                    "runsTotal", "runsCompleted", "runsFailed", "runsSkipped",
+                    "durationMsTotal", "durationCount", "findingsTotal",
+                    "tokensIn", "tokensOut", "tokenCost",
+                )
+            },
+        }},
+        {"$set": {"orgId": org_oid, "repoId": None, "day": "$_id", "updated_at": "$$NOW"}},
+        {"$unset": "_id"},
+        {"$merge": {
+            "into": RunStatsDaily.get_collection_name(),
+            "on": ["orgId", "repoId", "day"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]).to_list(None)
+    
+    logger.info("Rebuilt run stats", org_id=org_id, days=days)
@@ -2,11 +2,17 @@ from .diff_processor import (
     parse_diff,
     ParsedFile,
     ParsedHunk,
+    HunkLines,
     detect_language,
     should_exclude_file,
     get_changed_line_numbers,
     get_hunk_context,
 )
+from .path_classifier import (
+    PathClass,
+    PathClassifier,
+    get_path_classifier,
+)
 from .hunk_extractor import (
     extract_hunks,
     filter_hunks_for_analysis,
@@ -16,6 +22,7 @@ from .hunk_extractor import (
 from .context_builder import (
     build_analysis_context,
     build_file_context,
+    extract_file_context,
     format_context_for_prompt,
     AnalysisContext,
     FileContext,
@@ -24,16 +31,21 @@ __all__ = [
     "parse_diff",
     "ParsedFile",
     "ParsedHunk",
+    "HunkLines",
     "detect_language",
     "should_exclude_file",
     "get_changed_line_numbers",
     "get_hunk_context",
+    "PathClass",
+    "PathClassifier",
+    "get_path_classifier",
     "extract_hunks",
     "filter_hunks_for_analysis",
     "group_hunks_by_file",
     "ExtractedHunk",
     "build_analysis_context",
     "build_file_context",
+    "extract_file_context",
     "format_context_for_prompt",
     "AnalysisContext",
     "FileContext",
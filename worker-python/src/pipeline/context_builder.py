@@ -8,10 +8,15 @@ import structlog
 
 from .diff_processor import ParsedFile
 from .hunk_extractor import ExtractedHunk
-from ..config import get_file_content
+from ..config import get_file_content, fetch_file_contents
+from ..ai.tokens import get_token_budget
 
 logger = structlog.get_logger(__name__)
 
+# Tokens of the PR description and of each hunk included in the prompt
+DESCRIPTION_TOKENS = 125
+HUNK_PREVIEW_TOKENS = 125
+
 
 @dataclass
 class FileContext:
@@ -34,6 +39,40 @@ class AnalysisContext:
     static_findings: list[dict]
 
 
+def extract_file_context(file_path: str, language: str, content: str) -> FileContext:
+    """Extract imports and definitions from a file's full content."""
+    # Extract imports (simplified detection)
+    imports = []
+    class_defs = []
+    func_sigs = []
+    
+    for line in content.split('\n')[:100]:  # Check first 100 lines
+        line_stripped = line.strip()
+        if language == 'python':
+            if line_stripped.startswith('import ') or line_stripped.startswith('from '):
+                imports.append(line_stripped)
+            elif line_stripped.startswith('class '):
+                class_defs.append(line_stripped)
+            elif line_stripped.startswith('def '):
+                func_sigs.append(line_stripped)
+        elif language in ('javascript', 'typescript'):
+            if 'import ' in line_stripped or 'require(' in line_stripped:
+                imports.append(line_stripped)
+            elif 'class ' in line_stripped:
+                class_defs.append(line_stripped)
+            elif 'function ' in line_stripped or '=>' in line_stripped:
+                func_sigs.append(line_stripped[:80])
+    
+    return FileContext(
+        file_path=file_path,
+        language=language,
+        full_content=content[:10000],  # Limit content size
+        imports=imports[:10],
+        class_definitions=class_defs[:5],
+        function_signatures=func_sigs[:10],
+    )
+
+
 async def build_file_context(
     installation_id: int,
     owner: str,
@@ -49,36 +88,7 @@ async def build_file_context(
         if content is None:
             return None
         
-        # Extract imports (simplified detection)
-        imports = []
-        class_defs = []
-        func_sigs = []
-        
-        for line in content.split('\n')[:100]:  # Check first 100 lines
-            line_stripped = line.strip()
-            if language == 'python':
-                if line_stripped.startswith('import ') or line_stripped.startswith('from '):
-                    imports.append(line_stripped)
-                elif line_stripped.startswith('class '):
-                    class_defs.append(line_stripped)
-                elif line_stripped.startswith('def '):
-                    func_sigs.append(line_stripped)
-            elif language in ('javascript', 'typescript'):
-                if 'import ' in line_stripped or 'require(' in line_stripped:
-                    imports.append(line_stripped)
-                elif 'class ' in line_stripped:
-                    class_defs.append(line_stripped)
-                elif 'function ' in line_stripped or '=>' in line_stripped:
-                    func_sigs.append(line_stripped[:80])
-        
-        return FileContext(
-            file_path=file_path,
-            language=language,
-            full_content=content[:10000],  # Limit content size
-            imports=imports[:10],
-            class_definitions=class_defs[:5],
-            function_signatures=func_sigs[:10],
-        )
+        return extract_file_context(file_path, language, content)
     except Exception as e:
         logger.warning("Failed to fetch file context", file=file_path, error=str(e))
         return None
@@ -99,22 +109,24 @@ async def build_analysis_context(
     file_contexts: list[FileContext] = []
     
     # Fetch context for top files by additions
-    top_files = sorted(files, key=lambda f: f.additions, reverse=True)[:10]
+    top_files = [
+        file
+        for file in sorted(files, key=lambda f: f.additions, reverse=True)[:10]
+        if not file.is_binary and file.status != 'deleted'
+    ]
+    
+    contents = await fetch_file_contents(
+        installation_id,
+        owner,
+        repo,
+        head_sha,
+        [file.path for file in top_files],
+    )
     
     for file in top_files:
-        if file.is_binary or file.status == 'deleted':
-            continue
-            
-        context = await build_file_context(
-            installation_id,
-            owner,
-            repo,
-            head_sha,
-            file.path,
-            file.language,
-        )
-        if context:
-            file_contexts.append(context)
+        content = contents.get(file.path)
+        if content is not None:
+            file_contexts.append(extract_file_context(file.path, file.language, content))
     
     logger.info(
         "Built analysis context",
@@ -131,15 +143,20 @@ async def build_analysis_context(
     )
 
 
-def format_context_for_prompt(context: AnalysisContext, max_tokens: int = 8000) -> str:
-    """Format context into a string for AI prompt."""
+def format_context_for_prompt(
+    context: AnalysisContext,
+    max_tokens: int = 8000,
+    model: Optional[str] = None,
+) -> str:
+    """Format context into a string for AI prompt, counted in the model's tokens."""
+    counter = get_token_budget(model).counter
     parts = []
     
     if context.pr_title:
         parts.append(f"## PR: {context.pr_title}\n")
     
     if context.pr_description:
-        parts.append(f"Description: {context.pr_description[:500]}\n")
+        parts.append(f"Description: {counter.truncate(context.pr_description, DESCRIPTION_TOKENS)}\n")
     
     # Add file contexts
     parts.append("\n## Changed Files\n")
@@ -150,18 +167,19 @@ def format_context_for_prompt(context: AnalysisContext, max_tokens: int = 8000)
     
     # Add hunks
     parts.append("\n## Code Changes\n")
-    char_count = sum(len(p) for p in parts)
+    token_count = counter.count("".join(parts))
     
     for hunk in context.hunks:
         hunk_text = f"\n### {hunk.file_path}:{hunk.start_line}-{hunk.end_line}\n"
-        hunk_text += "```diff\n" + hunk.raw_diff[:500] + "\n```\n"
+        hunk_text += "```diff\n" + counter.truncate(hunk.raw_diff, HUNK_PREVIEW_TOKENS) + "\n```\n"
+        hunk_tokens = counter.count_cached(hunk_text)
         
-        if char_count + len(hunk_text) > max_tokens * 4:  # ~4 chars per token
+        if token_count + hunk_tokens > max_tokens:
             parts.append("\n[Additional hunks truncated...]\n")
             break
             
         parts.append(hunk_text)
-        char_count += len(hunk_text)
+        token_count += hunk_tokens
     
     # Add static findings as signals
     if context.static_findings:
@@ -3,25 +3,135 @@
 # ===========================================
 
 import re
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from typing import Optional
-from unidiff import PatchSet, PatchedFile, Hunk
+from typing import AsyncIterator, Iterable, Iterator, Optional
 import structlog
 
+from .path_classifier import PathClassifier, get_path_classifier
+
 logger = structlog.get_logger(__name__)
 
 
+# Kind byte of each line in a hunk: its diff prefix
+LINE_ADDED = ord("+")
+LINE_DELETED = ord("-")
+LINE_CONTEXT = ord(" ")
+
+
+class HunkLines(Sequence):
+    """
+    (line_no, content) view of one kind of line in a hunk. Tuples are
+    built as the view is read rather than kept in the hunk.
+    """
+    __slots__ = ("hunk", "kind")
+    
+    def __init__(self, hunk: "ParsedHunk", kind: int) -> None:
+        self.hunk = hunk
+        self.kind = kind
+    
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        hunk = self.hunk
+        body, starts, ends, line_numbers, kinds = (
+            hunk.body, hunk.starts, hunk.ends, hunk.line_numbers, hunk.kinds
+        )
+        i = kinds.find(self.kind)
+        while i >= 0:
+            yield line_numbers[i], body[starts[i]:ends[i]]
+            i = kinds.find(self.kind, i + 1)
+    
+    def __len__(self) -> int:
+        return self.hunk.kinds.count(self.kind)
+    
+    def __getitem__(self, index):
+        return list(self)[index]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (HunkLines, list)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 @dataclass
 class ParsedHunk:
-    """Parsed diff hunk with line information."""
+    """
+    Parsed diff hunk with line information.
+    
+    Lines are held compactly rather than as tuples: the hunk body as one
+    string, array offsets of each line's content in it, each line's number
+    (in the new file, or the old one for deletions) and a kind byte per
+    line. additions, deletions and context are views over them.
+    """
     old_start: int
     old_lines: int
     new_start: int
     new_lines: int
-    additions: list[tuple[int, str]] = field(default_factory=list)  # (line_no, content)
-    deletions: list[tuple[int, str]] = field(default_factory=list)
-    context: list[tuple[int, str]] = field(default_factory=list)
-    raw_content: str = ""
+    body: str = field(default="", repr=False)  # Hunk lines as diff text
+    starts: array = field(default_factory=lambda: array("I"), repr=False)
+    ends: array = field(default_factory=lambda: array("I"), repr=False)
+    line_numbers: array = field(default_factory=lambda: array("I"), repr=False)
+    kinds: bytearray = field(default_factory=bytearray, repr=False)
+    
+    @classmethod
+    def from_lines(
+        cls,
+        old_start: int,
+        old_lines: int,
+        new_start: int,
+        new_lines: int,
+        lines: Iterable[tuple[str, int, str]],
+    ) -> "ParsedHunk":
+        """Build a hunk from (prefix, line_no, content) lines in diff order."""
+        hunk = cls(old_start, old_lines, new_start, new_lines)
+        parts = []
+        pos = 0
+        for prefix, line_no, content in lines:
+            hunk.starts.append(pos + 1)
+            hunk.ends.append(pos + 1 + len(content))
+            hunk.line_numbers.append(line_no)
+            hunk.kinds.append(ord(prefix))
+            parts.append(f"{prefix}{content}\n")
+            pos += len(content) + 2
+        hunk.body = "".join(parts)
+        return hunk
+    
+    @property
+    def additions(self) -> HunkLines:
+        return HunkLines(self, LINE_ADDED)
+    
+    @property
+    def deletions(self) -> HunkLines:
+        return HunkLines(self, LINE_DELETED)
+    
+    @property
+    def context(self) -> HunkLines:
+        return HunkLines(self, LINE_CONTEXT)
+    
+    @property
+    def raw_content(self) -> str:
+        """The hunk as unified diff text."""
+        header = f"@@ -{self.old_start},{self.old_lines} +{self.new_start},{self.new_lines} @@\n"
+        if self.body and not self.body.endswith("\n"):
+            return header + self.body + "\n"
+        return header + self.body
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ParsedHunk):
+            return NotImplemented
+        return (
+            (self.old_start, self.old_lines, self.new_start, self.new_lines)
+            == (other.old_start, other.old_lines, other.new_start, other.new_lines)
+            and self.kinds == other.kinds
+            and self.line_numbers == other.line_numbers
+            and all(
+                self.body[self.starts[i]:self.ends[i]] == other.body[other.starts[i]:other.ends[i]]
+                for i in range(len(self.kinds))
+            )
+        )
 
 
 @dataclass
@@ -37,137 +147,279 @@ class ParsedFile:
     is_binary: bool = False
 
 
-# File extension to language mapping
-LANGUAGE_MAP = {
-    ".py": "python",
-    ".js": "javascript",
-    ".ts": "typescript",
-    ".jsx": "javascript",
-    ".tsx": "typescript",
-    ".java": "java",
-    ".go": "go",
-    ".rs": "rust",
-    ".rb": "ruby",
-    ".php": "php",
-    ".cs": "csharp",
-    ".cpp": "cpp",
-    ".c": "c",
-    ".h": "c",
-    ".hpp": "cpp",
-    ".swift": "swift",
-    ".kt": "kotlin",
-    ".scala": "scala",
-    ".sql": "sql",
-    ".html": "html",
-    ".css": "css",
-    ".scss": "scss",
-    ".json": "json",
-    ".yaml": "yaml",
-    ".yml": "yaml",
-    ".md": "markdown",
-    ".sh": "shell",
-    ".bash": "shell",
-}
-
-# Patterns for files to exclude
-EXCLUDED_PATTERNS = [
-    r"package-lock\.json$",
-    r"yarn\.lock$",
-    r"pnpm-lock\.yaml$",
-    r"Gemfile\.lock$",
-    r"poetry\.lock$",
-    r"composer\.lock$",
-    r"Cargo\.lock$",
-    r"\.min\.js$",
-    r"\.min\.css$",
-    r"\.map$",
-    r"\.d\.ts$",
-    r"__pycache__/",
-    r"node_modules/",
-    r"vendor/",
-    r"\.git/",
-    r"\.svn/",
-    r"dist/",
-    r"build/",
-    r"\.next/",
-    r"coverage/",
-]
-
-
 def detect_language(path: str) -> str:
     """Detect programming language from file extension."""
-    for ext, lang in LANGUAGE_MAP.items():
-        if path.endswith(ext):
-            return lang
-    return "unknown"
+    return get_path_classifier().language(path)
 
 
-def should_exclude_file(path: str, custom_patterns: Optional[list[str]] = None) -> bool:
+def should_exclude_file(
+    path: str,
+    custom_patterns: Optional[list[str]] = None,
+    excluded_paths: Optional[list[str]] = None,
+) -> bool:
     """Check if file should be excluded from analysis."""
-    patterns = EXCLUDED_PATTERNS + (custom_patterns or [])
+    return get_path_classifier(custom_patterns, excluded_paths).is_excluded(path)
+
+
+DEV_NULL = "/dev/null"
+
+RE_DIFF_GIT_HEADER = re.compile(r"^diff --git (?P<source>a/[^\t\n]+) (?P<target>b/[^\t\n]+)")
+RE_DIFF_GIT_HEADER_NO_PREFIX = re.compile(r"^diff --git (?P<source>[^\t\n]+) (?P<target>[^\t\n]+)")
+RE_NEW_FILE_MODE = re.compile(r"^new file mode \d+$")
+RE_DELETED_FILE_MODE = re.compile(r"^deleted file mode \d+$")
+RE_SOURCE_FILENAME = re.compile(r"^--- (?P<filename>[^\t\n]+)")
+RE_TARGET_FILENAME = re.compile(r"^\+\+\+ (?P<filename>[^\t\n]+)")
+RE_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+RE_BINARY_DIFF = re.compile(
+    r"^Binary files? (?P<source>[^\t]+?)(?:\t[\s0-9:+-]+)?"
+    r"(?: and (?P<target>[^\t]+?)(?:\t[\s0-9:+-]+)?)? (?:differ|has changed)"
+)
+NO_NEWLINE_MARKER = "\\ No newline at end of file"
+NEXT_FILE_HEADER = "\ndiff --git "
+
+
+class DiffParseError(ValueError):
+    """Raised on a malformed diff."""
+
+
+@dataclass
+class _DiffFile:
+    """A file's headers and hunks while a diff is being parsed."""
+    source: Optional[str]
+    target: Optional[str]
+    is_binary: bool = False
+    excluded: bool = False
+    hunks: list[ParsedHunk] = field(default_factory=list)
     
-    for pattern in patterns:
-        if re.search(pattern, path):
-            return True
+    @property
+    def old_path(self) -> Optional[str]:
+        if not self.source or self.source == DEV_NULL:
+            return None
+        return self.source[2:] if self.source.startswith("a/") else self.source
     
-    return False
+    @property
+    def path(self) -> Optional[str]:
+        if not self.target or self.target == DEV_NULL:
+            return self.old_path
+        return self.target[2:] if self.target.startswith("b/") else self.target
 
 
-def parse_diff(diff_text: str, excluded_patterns: Optional[list[str]] = None) -> list[ParsedFile]:
-    """Parse unified diff text into structured format."""
-    try:
-        patch_set = PatchSet(diff_text)
-    except Exception as e:
-        logger.error("Failed to parse diff", error=str(e))
-        return []
-    
-    parsed_files: list[ParsedFile] = []
+def _parse_hunk(text: str, pos: int, header: re.Match) -> tuple[ParsedHunk, int]:
+    """
+    Parse the hunk body starting at `pos`, returning the hunk and the
+    position after it. The body is sliced out of the text once and lines
+    are recorded by offset into it.
+    """
+    old_start, old_lines, new_start, new_lines = header.groups()
+    hunk = ParsedHunk(
+        old_start=int(old_start),
+        old_lines=1 if old_lines is None else int(old_lines),
+        new_start=int(new_start),
+        new_lines=1 if new_lines is None else int(new_lines),
+    )
+    old_line, new_line = hunk.old_start, hunk.new_start
+    old_end, new_end = old_line + hunk.old_lines, new_line + hunk.new_lines
+    starts, ends, line_numbers, kinds = hunk.starts, hunk.ends, hunk.line_numbers, hunk.kinds
+    base = pos
+    size = len(text)
     
-    for patched_file in patch_set:
-        path = patched_file.path
-        
-        # Handle old/new paths for renames
-        if patched_file.source_file and patched_file.target_file:
-            old_path = patched_file.source_file.lstrip("a/")
-            new_path = patched_file.target_file.lstrip("b/")
-            path = new_path
+    while old_line < old_end or new_line < new_end:
+        if pos >= size:
+            raise DiffParseError("Hunk is shorter than expected")
+        end = text.find("\n", pos)
+        if end < 0:
+            end = next_pos = size
         else:
-            old_path = None
+            next_pos = end + 1
         
-        # Skip excluded files
-        if should_exclude_file(path, excluded_patterns):
-            logger.debug("Excluding file from analysis", path=path)
+        line_type = text[pos]
+        if line_type == "+":
+            starts.append(pos + 1 - base)
+            line_numbers.append(new_line)
+            kinds.append(LINE_ADDED)
+            new_line += 1
+        elif line_type == "-":
+            starts.append(pos + 1 - base)
+            line_numbers.append(old_line)
+            kinds.append(LINE_DELETED)
+            old_line += 1
+        elif line_type == " " or line_type == "\n" or line_type == "\r":
+            # A line starting with a newline is an empty context line, its
+            # leading space stripped
+            starts.append(pos + (line_type == " ") - base)
+            line_numbers.append(new_line)
+            kinds.append(LINE_CONTEXT)
+            old_line += 1
+            new_line += 1
+        elif line_type == "\\":  # "\ No newline at end of file"
+            pos = next_pos
             continue
-        
-        # Determine status
-        if patched_file.is_added_file:
-            status = "added"
-        elif patched_file.is_removed_file:
-            status = "deleted"
-        elif old_path and old_path != path:
-            status = "renamed"
         else:
-            status = "modified"
+            raise DiffParseError(f"Hunk diff line expected: {text[pos:end]!r}")
+        ends.append(end - base)
+        
+        if old_line > old_end or new_line > new_end:
+            raise DiffParseError("Hunk is longer than expected")
+        pos = next_pos
+    
+    hunk.body = text[base:pos]
+    return hunk, pos
+
+
+def _parse_diff_files(text: str, classifier: PathClassifier) -> list[_DiffFile]:
+    """
+    Parse a git diff in a single pass over its text.
+    
+    Headers are matched line by line; hunk bodies are indexed by offset
+    straight into ParsedHunk's line arrays. Hunks of excluded files are
+    skipped without being parsed.
+    """
+    files: list[_DiffFile] = []
+    current: Optional[_DiffFile] = None
+    source_name: Optional[str] = None
+    in_header = False  # Between a file's `diff --git` line and its first hunk
+    pos, size = 0, len(text)
+    
+    while pos < size:
+        end = text.find("\n", pos)
+        next_pos = size if end < 0 else end + 1
+        line = text[pos:next_pos]
         
-        # Check for binary
-        is_binary = patched_file.is_binary_file
+        if line.startswith("diff --git "):
+            match = RE_DIFF_GIT_HEADER.match(line) or RE_DIFF_GIT_HEADER_NO_PREFIX.match(line)
+            current = _DiffFile(source=match["source"], target=match["target"])
+            files.append(current)
+            in_header = True
         
-        parsed_file = ParsedFile(
-            path=path,
-            old_path=old_path,
-            status=status,
-            language=detect_language(path),
-            additions=patched_file.added,
-            deletions=patched_file.removed,
-            is_binary=is_binary,
-        )
+        elif RE_NEW_FILE_MODE.match(line):
+            if current is None:
+                raise DiffParseError(f"Unexpected new file found: {line!r}")
+            current.source = DEV_NULL
         
-        if not is_binary:
-            for hunk in patched_file:
-                parsed_hunk = parse_hunk(hunk)
-                parsed_file.hunks.append(parsed_hunk)
+        elif RE_DELETED_FILE_MODE.match(line):
+            if current is None:
+                raise DiffParseError(f"Unexpected deleted file found: {line!r}")
+            current.target = DEV_NULL
         
-        parsed_files.append(parsed_file)
+        elif match := RE_SOURCE_FILENAME.match(line):
+            source_name = match["filename"]
+            if current is not None and current.source != source_name:
+                current = None
+        
+        elif match := RE_TARGET_FILENAME.match(line):
+            target_name = match["filename"]
+            if current is not None and current.target != target_name:
+                raise DiffParseError(f"Target without source: {line!r}")
+            if current is None:
+                current = _DiffFile(source=source_name, target=target_name)
+                files.append(current)
+                in_header = False
+        
+        elif match := RE_HUNK_HEADER.match(line):
+            in_header = False
+            if current is None:
+                raise DiffParseError(f"Unexpected hunk found: {line!r}")
+            
+            if not current.hunks and not current.excluded:
+                current.excluded = classifier.is_excluded(current.path)
+            if current.excluded:
+                # Skip the rest of the file unparsed
+                next_file = text.find(NEXT_FILE_HEADER, end)
+                pos = size if next_file < 0 else next_file + 1
+                continue
+            
+            hunk, next_pos = _parse_hunk(text, next_pos, match)
+            current.hunks.append(hunk)
+        
+        elif line.startswith(NO_NEWLINE_MARKER):
+            if current is None:
+                raise DiffParseError(f"Unexpected marker: {line!r}")
+        
+        elif line == "\n" and current is not None:
+            pass  # Blank line trailing a hunk
+        
+        else:
+            # Extended header info, e.g. index, mode or rename lines
+            if not in_header:
+                current = None
+                in_header = True
+            
+            if match := RE_BINARY_DIFF.match(line):
+                if current is not None:
+                    current.is_binary = True
+                else:
+                    files.append(_DiffFile(source=match["source"], target=match["target"], is_binary=True))
+                current = None
+                in_header = False
+            elif line == "GIT binary patch\n" and current is not None:
+                current.is_binary = True
+                current = None
+                in_header = False
+        
+        pos = next_pos
+    
+    return files
+
+
+def _build_parsed_file(diff_file: _DiffFile, classifier: PathClassifier) -> Optional[ParsedFile]:
+    """Convert one file of a diff, or None if it is excluded from analysis."""
+    path = diff_file.path
+    if diff_file.excluded or path is None:
+        return None
+    path_class = classifier.classify(path)
+    
+    # Skip excluded files
+    if path_class.excluded:
+        logger.debug("Excluding file from analysis", path=path)
+        return None
+    
+    # Determine status
+    hunks = diff_file.hunks
+    old_path = diff_file.old_path
+    if diff_file.source == DEV_NULL or (
+        len(hunks) == 1 and hunks[0].old_start == 0 and hunks[0].old_lines == 0
+    ):
+        status = "added"
+    elif diff_file.target == DEV_NULL or (
+        len(hunks) == 1 and hunks[0].new_start == 0 and hunks[0].new_lines == 0
+    ):
+        status = "deleted"
+    elif old_path and old_path != path:
+        status = "renamed"
+    else:
+        status = "modified"
+    
+    return ParsedFile(
+        path=path,
+        old_path=old_path,
+        status=status,
+        language=path_class.language,
+        additions=sum(len(hunk.additions) for hunk in hunks),
+        deletions=sum(len(hunk.deletions) for hunk in hunks),
+        hunks=hunks,
+        is_binary=diff_file.is_binary,
+    )
+
+
+def parse_diff(
+    diff_text: str,
+    excluded_patterns: Optional[list[str]] = None,
+    excluded_paths: Optional[list[str]] = None,
+) -> list[ParsedFile]:
+    """Parse unified diff text into structured format."""
+    classifier = get_path_classifier(excluded_patterns, excluded_paths)
+    try:
+        diff_files = _parse_diff_files(diff_text, classifier)
+    except DiffParseError as e:
+        logger.error("Failed to parse diff", error=str(e))
+        return []
+    
+    parsed_files: list[ParsedFile] = []
+    
+    for diff_file in diff_files:
+        parsed_file = _build_parsed_file(diff_file, classifier)
+        if parsed_file is not None:
+            parsed_files.append(parsed_file)
     
     logger.info(
         "Parsed diff",
@@ -179,32 +431,126 @@ def parse_diff(diff_text: str, excluded_patterns: Optional[list[str]] = None) ->
     return parsed_files
 
 
-def parse_hunk(hunk: Hunk) -> ParsedHunk:
-    """Parse a single hunk into structured format."""
-    parsed = ParsedHunk(
-        old_start=hunk.source_start,
-        old_lines=hunk.source_length,
-        new_start=hunk.target_start,
-        new_lines=hunk.target_length,
-        raw_content=str(hunk),
-    )
+@dataclass
+class DiffBudget:
+    """Limits enforced while streaming a diff, and what they dropped."""
+    max_lines: Optional[int] = None  # Added plus deleted lines across files
+    max_file_bytes: Optional[int] = None
+    lines: int = 0
+    files_excluded: int = 0
+    files_oversized: int = 0
+    truncated: bool = False  # Stopped before the end of the diff
+
+
+DIFF_FILE_HEADER = "diff --git "
+
+
+def _diff_git_path(header: str) -> str:
+    """New path from a `diff --git a/<old> b/<new>` header line."""
+    _, _, path = header.rstrip("\n").rpartition(" b/")
+    return path
+
+
+async def stream_parse_diff(
+    lines: AsyncIterator[str],
+    excluded_patterns: Optional[list[str]] = None,
+    budget: Optional[DiffBudget] = None,
+    excluded_paths: Optional[list[str]] = None,
+) -> AsyncIterator[ParsedFile]:
+    """
+    Parse a git diff from a stream of lines, yielding one file at a time.
     
-    current_new_line = hunk.target_start
-    current_old_line = hunk.source_start
+    Only the current file's lines are held in memory. Excluded files are
+    skipped from their header on, and a file larger than the budget's
+    max_file_bytes stops being buffered and is dropped. Reading stops once
+    the next file would take the PR past max_lines.
+    """
+    budget = budget or DiffBudget()
+    classifier = get_path_classifier(excluded_patterns, excluded_paths)
+    section: list[str] = []
+    section_bytes = 0
+    skipping = False
     
-    for line in hunk:
-        if line.is_added:
-            parsed.additions.append((current_new_line, line.value.rstrip("\n")))
-            current_new_line += 1
-        elif line.is_removed:
-            parsed.deletions.append((current_old_line, line.value.rstrip("\n")))
-            current_old_line += 1
-        else:
-            parsed.context.append((current_new_line, line.value.rstrip("\n")))
-            current_new_line += 1
-            current_old_line += 1
+    def finish() -> Optional[ParsedFile]:
+        if not section or skipping:
+            return None
+        try:
+            diff_files = _parse_diff_files("".join(section), classifier)
+        except DiffParseError as e:
+            logger.error("Failed to parse diff file", path=_diff_git_path(section[0]), error=str(e))
+            return None
+        if not diff_files:
+            return None
+        return _build_parsed_file(diff_files[0], classifier)
+    
+    def within_budget(parsed_file: ParsedFile) -> bool:
+        file_lines = parsed_file.additions + parsed_file.deletions
+        if budget.max_lines is not None and budget.lines + file_lines > budget.max_lines:
+            budget.truncated = True
+            return False
+        budget.lines += file_lines
+        return True
+    
+    async for line in lines:
+        if line.startswith(DIFF_FILE_HEADER):
+            parsed_file = finish()
+            if parsed_file is not None:
+                if not within_budget(parsed_file):
+                    break
+                yield parsed_file
+            
+            path = _diff_git_path(line)
+            section, section_bytes = [line], len(line)
+            skipping = classifier.is_excluded(path)
+            if skipping:
+                logger.debug("Excluding file from analysis", path=path)
+                budget.files_excluded += 1
+            continue
+        
+        if skipping:
+            continue
+        
+        section_bytes += len(line)
+        if budget.max_file_bytes is not None and section_bytes > budget.max_file_bytes:
+            logger.info("Skipping oversized file diff", path=_diff_git_path(section[0]))
+            budget.files_oversized += 1
+            skipping = True
+            continue
+        section.append(line)
+    else:
+        parsed_file = finish()
+        if parsed_file is not None and within_budget(parsed_file):
+            yield parsed_file
+    
+    logger.info(
+        "Streamed diff",
+        lines=budget.lines,
+        files_excluded=budget.files_excluded,
+        files_oversized=budget.files_oversized,
+        truncated=budget.truncated,
+    )
+
+
+def parse_patch(patch: str) -> list[ParsedHunk]:
+    """Parse the hunks of one file's patch, as returned by the GitHub API."""
+    hunks: list[ParsedHunk] = []
+    pos, size = 0, len(patch)
+    
+    try:
+        while pos < size:
+            end = patch.find("\n", pos)
+            next_pos = size if end < 0 else end + 1
+            # Match on the line itself: the header regex is anchored at ^
+            match = RE_HUNK_HEADER.match(patch[pos:next_pos])
+            if match:
+                hunk, next_pos = _parse_hunk(patch, next_pos, match)
+                hunks.append(hunk)
+            pos = next_pos
+    except DiffParseError as e:
+        logger.error("Failed to parse patch", error=str(e))
+        return []
     
-    return parsed
+    return hunks
 
 
 def get_changed_line_numbers(parsed_file: ParsedFile) -> set[int]:
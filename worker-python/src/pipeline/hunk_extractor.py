@@ -3,27 +3,57 @@
 # ===========================================
 
 from dataclasses import dataclass
+from itertools import islice
 from typing import Optional
 import structlog
 
-from .diff_processor import ParsedFile, ParsedHunk
+from .diff_processor import HunkLines, ParsedFile, ParsedHunk
 
 logger = structlog.get_logger(__name__)
 
 
 @dataclass
 class ExtractedHunk:
-    """Hunk with additional context for analysis."""
+    """
+    Hunk with additional context for analysis. Lines are read through the
+    parsed hunk rather than copied out of it.
+    """
     file_path: str
     language: str
     hunk_index: int
-    start_line: int
-    end_line: int
-    added_lines: list[tuple[int, str]]
-    deleted_lines: list[tuple[int, str]] 
-    context_before: list[str]
-    context_after: list[str]
-    raw_diff: str
+    hunk: ParsedHunk
+    
+    @property
+    def start_line(self) -> int:
+        return self.hunk.new_start
+    
+    @property
+    def end_line(self) -> int:
+        return self.hunk.new_start + self.hunk.new_lines - 1
+    
+    @property
+    def added_lines(self) -> HunkLines:
+        return self.hunk.additions
+    
+    @property
+    def deleted_lines(self) -> HunkLines:
+        return self.hunk.deletions
+    
+    @property
+    def context_before(self) -> list[str]:
+        """Last 3 context lines before the hunk's first line."""
+        before = [content for line_no, content in self.hunk.context if line_no < self.hunk.new_start]
+        return before[-3:]
+    
+    @property
+    def context_after(self) -> list[str]:
+        """First 3 context lines from the hunk's first line on."""
+        after = (content for line_no, content in self.hunk.context if line_no >= self.hunk.new_start)
+        return list(islice(after, 3))
+    
+    @property
+    def raw_diff(self) -> str:
+        return self.hunk.raw_content
 
 
 def extract_hunks(files: list[ParsedFile]) -> list[ExtractedHunk]:
@@ -35,29 +65,12 @@ def extract_hunks(files: list[ParsedFile]) -> list[ExtractedHunk]:
             continue
             
         for i, hunk in enumerate(file.hunks):
-            context_before = []
-            context_after = []
-            
-            # Get context lines
-            for line_no, content in hunk.context:
-                if line_no < hunk.new_start:
-                    context_before.append(content)
-                else:
-                    context_after.append(content)
-            
-            extracted_hunk = ExtractedHunk(
+            extracted.append(ExtractedHunk(
                 file_path=file.path,
                 language=file.language,
                 hunk_index=i,
-                start_line=hunk.new_start,
-                end_line=hunk.new_start + hunk.new_lines - 1,
-                added_lines=hunk.additions,
-                deleted_lines=hunk.deletions,
-                context_before=context_before[-3:],  # Last 3 context lines before
-                context_after=context_after[:3],     # First 3 context lines after
-                raw_diff=hunk.raw_content,
-            )
-            extracted.append(extracted_hunk)
+                hunk=hunk,
+            ))
     
     logger.info("Extracted hunks", hunk_count=len(extracted))
     return extracted
@@ -0,0 +1,343 @@
+# ===========================================
+# Python Worker - Incremental Re-Review
+# ===========================================
+
+import asyncio
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from typing import Optional
+import structlog
+
+from ..config import compare_commits, settings
+from ..filters.classifier import NormalizedFinding, generate_fingerprint
+from ..output.storage import get_previous_run, get_run_findings
+from .diff_processor import ParsedFile, ParsedHunk, parse_patch
+
+logger = structlog.get_logger(__name__)
+
+# The compare API lists at most this many files; beyond it, review in full
+COMPARE_MAX_FILES = 300
+
+# Compare statuses where the previous head is an ancestor of the new one
+INCREMENTAL_COMPARE_STATUSES = ("ahead", "identical")
+
+
+@dataclass
+class LineMap:
+    """
+    Maps line numbers of a file at the previous head to the new head,
+    from the hunks of the diff between the two.
+    """
+    hunks: list[ParsedHunk]
+    context_maps: list[dict[int, int]] = field(init=False)
+    touched: set[int] = field(init=False)  # New-head lines added or next to a deletion
+
+    def __post_init__(self) -> None:
+        self.context_maps = []
+        self.touched = set()
+
+        for hunk in self.hunks:
+            deleted = {line for line, _ in hunk.deletions}
+            added = {line for line, _ in hunk.additions}
+            old_context = [
+                line for line in range(hunk.old_start, hunk.old_start + hunk.old_lines)
+                if line not in deleted
+            ]
+            new_context = [
+                line for line in range(hunk.new_start, hunk.new_start + hunk.new_lines)
+                if line not in added
+            ]
+            context_map = dict(zip(old_context, new_context))
+            self.context_maps.append(context_map)
+            self.touched.update(added)
+
+            # A deletion touches the new lines on either side of it
+            next_line = hunk.new_start + hunk.new_lines
+            for line in reversed(range(hunk.old_start, hunk.old_start + hunk.old_lines)):
+                if line in context_map:
+                    next_line = context_map[line]
+                elif line in deleted:
+                    self.touched.update((next_line - 1, next_line))
+
+    def map_line(self, line: int) -> Optional[int]:
+        """Get a line's number at the new head, or None if it was changed."""
+        offset = 0
+        for hunk, context_map in zip(self.hunks, self.context_maps):
+            if hunk.old_lines and hunk.old_start <= line < hunk.old_start + hunk.old_lines:
+                return context_map.get(line)
+            old_end = hunk.old_start + (hunk.old_lines or 1)
+            if line < old_end:
+                return line + offset
+            offset = hunk.new_start + (hunk.new_lines or 1) - old_end
+        return line + offset
+
+
+@dataclass
+class FileChange:
+    """A file changed between the previous head and the new one."""
+    previous_path: str
+    path: str
+    line_map: Optional[LineMap]  # None if the change can't be mapped (binary, patch omitted)
+
+
+@dataclass
+class IncrementalBase:
+    """The previous run a new run can be reviewed incrementally against."""
+    run_id: str
+    head_sha: str
+    compare: dict
+    findings: list[dict]
+
+
+@dataclass
+class IncrementalPlan:
+    """PR files cut down to the hunks changed since the previous run."""
+    base_sha: str
+    files: list[ParsedFile]
+    changes: dict[str, FileChange]  # By path at the previous head
+    unchanged_ranges: dict[str, list[tuple[int, int]]]  # New-head line ranges of skipped hunks
+    unchanged_files: set[str]  # PR files with no changed hunks
+    hunks_total: int
+    hunks_changed: int
+
+
+async def load_incremental_base(
+    installation_id: int,
+    owner: str,
+    repo: str,
+    pr_id: str,
+    run_id: str,
+    head_sha: str,
+) -> Optional[IncrementalBase]:
+    """
+    Find the latest run on the PR that reviewed it completely and compare
+    its head commit with the new one. Returns None when the run should
+    review in full.
+    """
+    if not settings.incremental_review:
+        return None
+
+    previous = await get_previous_run(pr_id, exclude_run_id=run_id)
+    if not previous or previous["headSha"] == head_sha:
+        return None
+
+    previous_run_id = str(previous["_id"])
+    try:
+        compare, findings = await asyncio.gather(
+            compare_commits(installation_id, owner, repo, previous["headSha"], head_sha),
+            get_run_findings(previous_run_id, only_active=False),
+        )
+    except Exception as e:
+        logger.warning(
+            "Failed to load previous run, reviewing in full",
+            previous_run_id=previous_run_id,
+            error=str(e),
+        )
+        return None
+
+    return IncrementalBase(
+        run_id=previous_run_id,
+        head_sha=previous["headSha"],
+        compare=compare,
+        findings=findings,
+    )
+
+
+def build_file_changes(compare: dict) -> dict[str, FileChange]:
+    """Map each file changed in a compare response by its previous path."""
+    changes: dict[str, FileChange] = {}
+    for entry in compare.get("files", []):
+        path = entry["filename"]
+        previous_path = entry.get("previous_filename") or path
+        patch = entry.get("patch")
+
+        if patch is not None:
+            line_map = LineMap(parse_patch(patch))
+        elif not entry.get("changes"):
+            line_map = LineMap([])  # Renamed without content changes
+        else:
+            line_map = None
+
+        changes[previous_path] = FileChange(
+            previous_path=previous_path,
+            path=path,
+            line_map=line_map,
+        )
+    return changes
+
+
+def _hunk_lines(hunk: ParsedHunk) -> range:
+    return range(hunk.new_start, hunk.new_start + max(hunk.new_lines, 1))
+
+
+def plan_incremental_review(
+    files: list[ParsedFile],
+    base: IncrementalBase,
+) -> Optional[IncrementalPlan]:
+    """
+    Select the PR hunks whose content changed since the previous run.
+
+    Returns None if the previous head isn't an ancestor of the new one
+    (e.g. after a force push) or the compare response may be incomplete.
+    """
+    status = base.compare.get("status")
+    changed_files = base.compare.get("files", [])
+    if status not in INCREMENTAL_COMPARE_STATUSES or len(changed_files) >= COMPARE_MAX_FILES:
+        logger.info(
+            "Cannot review incrementally, reviewing in full",
+            compare_status=status,
+            changed_files=len(changed_files),
+        )
+        return None
+
+    changes = build_file_changes(base.compare)
+    by_path = {change.path: change for change in changes.values()}
+
+    plan = IncrementalPlan(
+        base_sha=base.head_sha,
+        files=[],
+        changes=changes,
+        unchanged_ranges={},
+        unchanged_files=set(),
+        hunks_total=0,
+        hunks_changed=0,
+    )
+
+    for file in files:
+        plan.hunks_total += len(file.hunks)
+        change = by_path.get(file.path)
+
+        if change is None:
+            changed, unchanged = [], file.hunks
+        elif change.line_map is None:
+            changed, unchanged = file.hunks, []
+        else:
+            touched = change.line_map.touched
+            changed, unchanged = [], []
+            for hunk in file.hunks:
+                if touched.isdisjoint(_hunk_lines(hunk)):
+                    unchanged.append(hunk)
+                else:
+                    changed.append(hunk)
+
+        plan.unchanged_ranges[file.path] = sorted(
+            (hunk.new_start, hunk.new_start + max(hunk.new_lines, 1)) for hunk in unchanged
+        )
+        if not changed:
+            plan.unchanged_files.add(file.path)
+            continue
+
+        plan.hunks_changed += len(changed)
+        plan.files.append(replace(
+            file,
+            hunks=changed,
+            additions=sum(len(hunk.additions) for hunk in changed),
+            deletions=sum(len(hunk.deletions) for hunk in changed),
+        ))
+
+    logger.info(
+        "Planned incremental review",
+        base_sha=base.head_sha,
+        files_changed=len(plan.files),
+        hunks_total=plan.hunks_total,
+        hunks_changed=plan.hunks_changed,
+    )
+    return plan
+
+
+def _in_ranges(ranges: list[tuple[int, int]], line: int) -> bool:
+    index = bisect_right(ranges, (line, float("inf"))) - 1
+    return index >= 0 and ranges[index][0] <= line < ranges[index][1]
+
+
+def carry_forward_findings(
+    previous: list[dict],
+    plan: IncrementalPlan,
+    run_id: str,
+) -> list[NormalizedFinding]:
+    """
+    Carry the previous run's findings on unchanged hunks into a new run,
+    with their lines remapped to the new head.
+
+    Findings keep their fingerprint and suppression, so cross-run dedup
+    recognises the ones already reported. Findings on changed hunks are
+    dropped; those hunks are analyzed again.
+    """
+    carried: list[NormalizedFinding] = []
+
+    for doc in previous:
+        change = plan.changes.get(doc["filePath"])
+        path = change.path if change else doc["filePath"]
+        line_start = doc.get("lineStart")
+        line_end = doc.get("lineEnd")
+
+        if not line_start:
+            # File-level findings survive only if the file is untouched
+            if change is not None or path not in plan.unchanged_files:
+                continue
+        else:
+            if change is not None:
+                if change.line_map is None:
+                    continue
+                line_start = change.line_map.map_line(line_start)
+                if line_start is None:
+                    continue
+                if line_end:
+                    line_end = change.line_map.map_line(line_end) or line_start
+            if not _in_ranges(plan.unchanged_ranges.get(path, []), line_start):
+                continue
+
+        carried.append(NormalizedFinding(
+            run_id=run_id,
+            file_path=path,
+            line_start=line_start,
+            line_end=line_end,
+            source=doc["source"],
+            category=doc["category"],
+            severity=doc["severity"],
+            confidence=doc["confidence"],
+            title=doc["title"],
+            message=doc["message"],
+            suggestion=doc.get("suggestion"),
+            code_snippet=doc.get("codeSnippet"),
+            rule_id=doc.get("ruleId"),
+            ai_reasoning=doc.get("aiReasoning"),
+            ai_model=doc.get("aiModel"),
+            suppressed=doc.get("suppressed", False),
+            suppression_reason=doc.get("suppressionReason"),
+            fingerprint=doc.get("fingerprint") or generate_fingerprint(
+                path,
+                line_start,
+                doc["source"],
+                doc["title"],
+                doc.get("ruleId"),
+            ),
+        ))
+
+    logger.info(
+        "Carried forward findings",
+        previous=len(previous),
+        carried=len(carried),
+    )
+    return carried
+
+
+def add_carried_findings(
+    findings: list[NormalizedFinding],
+    stats: dict,
+    carried: list[NormalizedFinding],
+) -> tuple[list[NormalizedFinding], dict]:
+    """Append carried findings after a run's new ones and count them in stats."""
+    fingerprints = {f.fingerprint for f in findings}
+    carried = [f for f in carried if f.fingerprint not in fingerprints]
+
+    stats = {
+        **stats,
+        "total": stats["total"] + len(carried),
+        "static": stats["static"] + sum(1 for f in carried if f.source == "static"),
+        "ai": stats["ai"] + sum(1 for f in carried if f.source == "ai"),
+        "suppressed": stats["suppressed"] + sum(1 for f in carried if f.suppressed),
+        "active": stats["active"] + sum(1 for f in carried if not f.suppressed),
+        "carried": len(carried),
+    }
+    return findings + carried, stats
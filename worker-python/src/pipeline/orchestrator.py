@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import aclosing
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -6,19 +7,36 @@ import structlog
 from beanie import PydanticObjectId
 
 from ..config import (
-    get_pull_request_diff,
+    stream_pull_request_diff,
     settings,
 )
 from ..models.Organization import Organization
 from ..models.Repository import Repository
 from ..models.PullRequest import PullRequest
-from ..models.Run import Run
-from ..models.Finding import Finding
-from .diff_processor import parse_diff, ParsedFile
-from ..rules.engine import run_static_analysis, StaticFinding
+from .diff_processor import stream_parse_diff, DiffBudget, ParsedFile
+from .incremental import (
+    load_incremental_base,
+    plan_incremental_review,
+    carry_forward_findings,
+    add_carried_findings,
+)
+from .scheduler import StageScheduler
+from ..rules.engine import StaticFinding
+from ..rules.parallel import run_static_analysis_async
 from ..ai.reviewer import run_ai_review, AIFinding
 from ..filters.classifier import filter_and_classify, NormalizedFinding
+from ..filters.noise_filter import deduplicate_across_runs
 from ..output.commenter import post_review_comments
+from ..output.storage import (
+    save_findings_batch,
+    update_run_started,
+    update_run_completed,
+    update_run_failed,
+    update_run_skipped,
+    record_run_stats,
+    get_reported_fingerprints,
+    record_reported_fingerprints,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -37,6 +55,8 @@ class AnalysisConfig:
     excluded_file_patterns: Optional[list[str]] = None
     enabled_rules: Optional[list[str]] = None
     disabled_rules: Optional[list[str]] = None
+    ai_max_input_tokens: Optional[int] = None  # Per-org cap on AI input tokens
+    max_pr_lines: Optional[int] = None  # Added plus deleted lines read from the diff
 
 
 @dataclass
@@ -94,78 +114,43 @@ async def load_analysis_context(
             excluded_file_patterns=config.excluded_file_patterns,
             enabled_rules=config.enabled_rules,
             disabled_rules=config.disabled_rules,
+            ai_max_input_tokens=org.settings.get("aiMaxInputTokens"),
+            max_pr_lines=config.max_pr_lines,
         ),
     }
 
 
-async def update_run_status(
+async def save_findings(
     run_id: str,
-    status: str,
-    reason: Optional[str] = None,
-    error: Optional[str] = None,
-    metrics: Optional[dict] = None,
+    findings: list[NormalizedFinding],
+    pr_id: Optional[str] = None,
+    repo_id: Optional[str] = None,
 ) -> None:
-    """Update run status in database."""
-    run = await Run.get(PydanticObjectId(run_id))
-    if not run:
-        return
-
-    run.status = status
-    run.reason = reason
-    run.error = error
-    run.updated_at = datetime.utcnow()
-
-    if metrics:
-        run.files_analyzed = metrics.get("files_analyzed", 0)
-        run.lines_analyzed = metrics.get("lines_analyzed", 0)
-        run.hunks_analyzed = metrics.get("hunks_analyzed", 0)
-        run.findings_total = metrics.get("findings_total", 0)
-        run.findings_static = metrics.get("findings_static", 0)
-        run.findings_ai = metrics.get("findings_ai", 0)
-        run.findings_suppressed = metrics.get("findings_suppressed", 0)
-        run.token_count_input = metrics.get("tokens_in", 0)
-        run.token_count_output = metrics.get("tokens_out", 0)
-        run.token_cost = metrics.get("token_cost", 0)
-        run.ai_model_used = metrics.get("ai_model")
-        run.ai_tier = metrics.get("ai_tier")
+    """Save findings to database."""
+    await save_findings_batch(findings, pr_id=pr_id, repo_id=repo_id)
 
-    await run.save()
 
+SEVERITY_RANK = {"block": 0, "high": 1, "medium": 2, "low": 3}
 
-async def save_findings(run_id: str, findings: list[NormalizedFinding]) -> None:
-    """Save findings to database."""
-    run = await Run.get(PydanticObjectId(run_id), fetch_links=True)
-    if not run:
-        return
 
-    docs = []
-    for finding in findings:
-        doc = Finding(
-            run_id=PydanticObjectId(run_id),
-            pr_id=run.pr_id.id if run.pr_id else None,
-            repo_id=run.pr_id.repo_id.id if run.pr_id and run.pr_id.repo_id else None,
-            file_path=finding.file_path,
-            line_start=finding.line_start,
-            line_end=finding.line_end,
-            source=finding.source,
-            category=finding.category,
-            severity=finding.severity,
-            confidence=finding.confidence,
-            title=finding.title,
-            message=finding.message,
-            suggestion=finding.suggestion,
-            code_snippet=finding.code_snippet,
-            rule_id=finding.rule_id,
-            ai_reasoning=finding.ai_reasoning,
-            ai_model=finding.ai_model,
-            suppressed=finding.suppressed,
-            suppression_reason=finding.suppression_reason,
-            fingerprint=finding.fingerprint,
+async def wait_for_static_signals(static_task: asyncio.Task) -> list[StaticFinding]:
+    """
+    Get static findings, most severe first, to feed the AI as signals and
+    to rank hunks by. Each chunk is sent at most AI_MAX_STATIC_SIGNALS.
+    
+    The AI review does not wait for a slow static pass: if findings are
+    not ready within AI_STATIC_SIGNAL_WAIT_MS it proceeds without them.
+    """
+    try:
+        findings = await asyncio.wait_for(
+            asyncio.shield(static_task),
+            timeout=settings.ai_static_signal_wait_ms / 1000,
         )
-        docs.append(doc)
+    except asyncio.TimeoutError:
+        logger.info("Static signals not ready, starting AI review without them")
+        return []
     
-    if docs:
-        await Finding.insert_many(docs)
+    return sorted(findings, key=lambda f: SEVERITY_RANK.get(f.severity.value, 4))
 
 
 async def run_analysis(
@@ -178,7 +163,7 @@ async def run_analysis(
     run_mode: str,
 ) -> AnalysisResult:
     """Main analysis pipeline orchestrator."""
-    started_at = datetime.utcnow()
+    started_at: Optional[datetime] = None
     
     logger.info(
         "Starting analysis",
@@ -190,11 +175,7 @@ async def run_analysis(
     
     try:
         # Mark as running
-        run = await Run.get(PydanticObjectId(run_id))
-        if run:
-            run.status = "running"
-            run.started_at = datetime.utcnow()
-            await run.save()
+        started_at = await update_run_started(run_id, head_sha)
         
         # Load context
         context = await load_analysis_context(pr_id, repo_id, org_id)
@@ -206,85 +187,175 @@ async def run_analysis(
         elif run_mode == "active":
             config.shadow_mode = False
         
-        # Fetch diff
-        logger.info("Fetching PR diff")
-        diff_text = await get_pull_request_diff(
-            context["installation_id"],
-            context["owner"],
-            context["repo_name"],
-            context["pr_number"],
+        scheduler = StageScheduler()
+        
+        # Stream and parse the diff within the PR's budget, and find what
+        # changed since the previous run
+        budget = DiffBudget(
+            max_lines=config.max_pr_lines or settings.max_pr_lines,
+            max_file_bytes=settings.max_file_size_kb * 1024,
         )
         
-        # Parse diff
-        parsed_files = parse_diff(diff_text, config.excluded_file_patterns)
+        async def ingest_diff() -> list[ParsedFile]:
+            async with aclosing(stream_pull_request_diff(
+                context["installation_id"],
+                context["owner"],
+                context["repo_name"],
+                context["pr_number"],
+            )) as lines:
+                return [
+                    parsed_file
+                    async for parsed_file in stream_parse_diff(
+                        lines,
+                        config.excluded_file_patterns,
+                        budget,
+                        excluded_paths=config.excluded_paths,
+                    )
+                ]
+        
+        logger.info("Fetching PR diff")
+        async with scheduler.timed("fetch_diff"):
+            parsed_files, incremental_base = await asyncio.gather(
+                ingest_diff(),
+                load_incremental_base(
+                    context["installation_id"],
+                    context["owner"],
+                    context["repo_name"],
+                    pr_id,
+                    run_id,
+                    head_sha,
+                ),
+            )
         
         if not parsed_files:
-            logger.info("No analyzable files in diff")
-            await update_run_status(run_id, "skipped", reason="No analyzable files in diff")
+            reason = "Diff exceeds the PR line budget" if budget.truncated else "No analyzable files in diff"
+            logger.info(reason)
+            await update_run_skipped(run_id, reason, started_at)
+            await record_run_stats(run_id, org_id, repo_id, "skipped", started_at=started_at)
             return AnalysisResult(
                 run_id=run_id,
                 status="skipped",
-                reason="No analyzable files in diff",
+                reason=reason,
                 error=None,
                 findings=[],
                 metrics={},
                 posted=False,
             )
         
+        # Only analyze hunks changed since the previous run, keeping its
+        # findings on the rest
+        plan = plan_incremental_review(parsed_files, incremental_base) if incremental_base else None
+        carried: list[NormalizedFinding] = []
+        if plan:
+            parsed_files = plan.files
+            carried = carry_forward_findings(incremental_base.findings, plan, run_id)
+        
         # Calculate metrics
         files_count = len(parsed_files)
         lines_count = sum(f.additions + f.deletions for f in parsed_files)
         hunks_count = sum(len(f.hunks) for f in parsed_files)
         
-        # Run static analysis
-        static_findings: list[StaticFinding] = []
-        if config.enable_static:
+        # Static analysis and AI review start together as soon as the diff
+        # is parsed; saving and posting overlap once findings are classified.
+        async def static_stage() -> list[StaticFinding]:
+            if not config.enable_static:
+                return []
             logger.info("Running static analysis")
-            static_findings = run_static_analysis(
+            return await run_static_analysis_async(
                 parsed_files,
                 config.enabled_rules,
                 config.disabled_rules,
             )
         
-        # Run AI review
-        ai_findings: list[AIFinding] = []
-        ai_usage = {"model": None, "tokens_in": 0, "tokens_out": 0}
-        
-        if config.enable_ai:
-            logger.info("Running AI review")
-            ai_findings, ai_usage = await run_ai_review(
+        async def ai_stage() -> tuple[list[AIFinding], dict]:
+            if not config.enable_ai:
+                return [], {"model": None, "tokens_in": 0, "tokens_out": 0}
+            signals = await wait_for_static_signals(scheduler.started("static"))
+            logger.info("Running AI review", signal_count=len(signals))
+            return await run_ai_review(
                 parsed_files,
-                static_findings,
+                signals,
                 config.ai_mode,
                 config.ai_model_override,
+                config.ai_max_input_tokens,
             )
         
-        # Filter and classify
-        logger.info("Filtering and classifying findings")
-        normalized_findings, filter_stats = filter_and_classify(
-            static_findings,
-            ai_findings,
-            run_id,
-            config.min_severity,
-            config.max_comments * 5,  # Keep extra for storage
-        )
+        async def classify_stage(
+            static: list[StaticFinding],
+            ai: tuple[list[AIFinding], dict],
+        ) -> tuple[list[NormalizedFinding], dict]:
+            logger.info("Filtering and classifying findings")
+            findings, stats = filter_and_classify(
+                static,
+                ai[0],
+                run_id,
+                config.min_severity,
+                config.max_comments * 5,  # Keep extra for storage
+            )
+            if carried:
+                findings, stats = add_carried_findings(findings, stats, carried)
+            if not settings.dedupe_across_runs:
+                return findings, stats
+            
+            # Don't report again what an earlier push to this PR already did
+            active = [f for f in findings if not f.suppressed]
+            reported = await get_reported_fingerprints(
+                pr_id,
+                [f.fingerprint for f in active],
+                exclude_run_id=run_id,
+            )
+            unique = deduplicate_across_runs(active, reported)
+            deduplicated = len(active) - len(unique)
+            stats["suppressed"] += deduplicated
+            stats["active"] -= deduplicated
+            stats["deduplicated"] = deduplicated
+            return findings, stats
         
-        # Save findings
-        logger.info("Saving findings to database")
-        await save_findings(run_id, normalized_findings)
+        async def save_stage(classify: tuple[list[NormalizedFinding], dict]) -> None:
+            logger.info("Saving findings to database")
+            await save_findings(run_id, classify[0], pr_id, repo_id)
         
-        # Post comments
-        logger.info("Posting review comments")
-        post_result = await post_review_comments(
-            context["installation_id"],
-            context["owner"],
-            context["repo_name"],
-            context["pr_number"],
-            normalized_findings,
-            run_id,
-            config.shadow_mode,
-            config.max_comments,
-        )
+        # Say so when the review stopped at the PR line budget
+        diff_notice = None
+        if budget.truncated:
+            diff_notice = (
+                f"This PR exceeds the {budget.max_lines}-line review limit; "
+                f"only the first {budget.lines} changed lines were reviewed."
+            )
+        
+        async def post_stage(classify: tuple[list[NormalizedFinding], dict]) -> dict:
+            logger.info("Posting review comments")
+            result = await post_review_comments(
+                context["installation_id"],
+                context["owner"],
+                context["repo_name"],
+                context["pr_number"],
+                classify[0],
+                run_id,
+                config.shadow_mode,
+                config.max_comments,
+                notice=diff_notice,
+            )
+            # Only once reported: a retry after a failed post must not dedupe against itself
+            if not result.get("error"):
+                await record_reported_fingerprints(
+                    pr_id,
+                    [f.fingerprint for f in classify[0] if not f.suppressed],
+                )
+            return result
+        
+        scheduler.add("static", static_stage)
+        scheduler.add("ai", ai_stage)
+        scheduler.add("classify", classify_stage, deps=("static", "ai"))
+        # Findings are saved even if posting the review fails
+        scheduler.add("save", save_stage, deps=("classify",), shielded=True)
+        scheduler.add("post", post_stage, deps=("classify",))
+        
+        results = await scheduler.run()
+        
+        ai_usage = results["ai"][1]
+        normalized_findings, filter_stats = results["classify"]
+        post_result = results["post"]
         
         # Update run with metrics
         metrics = {
@@ -300,16 +371,28 @@ async def run_analysis(
             "token_cost": 0,  # Calculate based on model pricing
             "ai_model": ai_usage.get("model"),
             "ai_tier": ai_usage.get("tier"),
+            "review_mode": "incremental" if plan else "full",
+            "diff_truncated": budget.truncated,
+            "files_oversized": budget.files_oversized,
+            "findings_carried": filter_stats.get("carried", 0),
+            "ai_chunks": ai_usage.get("chunks", 0),
+            "ai_hunks_reviewed": ai_usage.get("hunks_reviewed", 0),
+            "ai_hunks_truncated": ai_usage.get("hunks_truncated", 0),
+            "ai_hunks_skipped": ai_usage.get("hunks_skipped", []),
+            "ai_chunks_failed": ai_usage.get("chunks_failed", 0),
+            "ai_fallback_chunks": ai_usage.get("fallback_chunks", 0),
+            "ai_error": ai_usage.get("error"),
+            "ai_responses_truncated": ai_usage.get("responses_truncated", 0),
+            "ai_first_finding_ms": ai_usage.get("first_finding_ms"),
+            "ai_cache_hits": ai_usage.get("cache_hits", 0),
+            "ai_cache_misses": ai_usage.get("cache_misses", 0),
+            "ai_tokens_saved": ai_usage.get("tokens_saved", 0),
+            "stage_timings": scheduler.timings,
         }
         
-        await update_run_status(run_id, "completed", metrics=metrics)
-        
+        await update_run_completed(run_id, metrics, started_at)
+        await record_run_stats(run_id, org_id, repo_id, "completed", metrics, started_at)
         duration_ms = int((datetime.utcnow() - started_at).total_seconds() * 1000)
-        run = await Run.get(PydanticObjectId(run_id))
-        if run:
-            run.duration_ms = duration_ms
-            run.completed_at = datetime.utcnow()
-            await run.save()
         
         logger.info(
             "Analysis completed",
@@ -330,9 +413,17 @@ async def run_analysis(
             posted=post_result["posted"],
         )
     
+    except asyncio.CancelledError:
+        # Timed out or cancelled by a draining worker; don't leave the run "running"
+        logger.warning("Analysis cancelled", run_id=run_id)
+        await update_run_failed(run_id, "Analysis cancelled", started_at)
+        await record_run_stats(run_id, org_id, repo_id, "failed", started_at=started_at)
+        raise
+    
     except Exception as e:
         logger.error("Analysis failed", run_id=run_id, error=str(e))
-        await update_run_status(run_id, "failed", error=str(e))
+        await update_run_failed(run_id, str(e), started_at)
+        await record_run_stats(run_id, org_id, repo_id, "failed", started_at=started_at)
         
         return AnalysisResult(
             run_id=run_id,
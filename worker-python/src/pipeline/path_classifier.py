@@ -0,0 +1,191 @@
+# ===========================================
+# Python Worker - Path Classifier
+# ===========================================
+
+import fnmatch
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Paths memoized per classifier
+PATH_CACHE_SIZE = 4096
+
+# File extension to language mapping
+LANGUAGE_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".jsx": "javascript",
+    ".tsx": "typescript",
+    ".java": "java",
+    ".go": "go",
+    ".rs": "rust",
+    ".rb": "ruby",
+    ".php": "php",
+    ".cs": "csharp",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".h": "c",
+    ".hpp": "cpp",
+    ".swift": "swift",
+    ".kt": "kotlin",
+    ".scala": "scala",
+    ".sql": "sql",
+    ".html": "html",
+    ".css": "css",
+    ".scss": "scss",
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".md": "markdown",
+    ".sh": "shell",
+    ".bash": "shell",
+}
+
+# Patterns for files to exclude
+EXCLUDED_PATTERNS = [
+    r"package-lock\.json$",
+    r"yarn\.lock$",
+    r"pnpm-lock\.yaml$",
+    r"Gemfile\.lock$",
+    r"poetry\.lock$",
+    r"composer\.lock$",
+    r"Cargo\.lock$",
+    r"\.min\.js$",
+    r"\.min\.css$",
+    r"\.map$",
+    r"\.d\.ts$",
+    r"__pycache__/",
+    r"node_modules/",
+    r"vendor/",
+    r"\.git/",
+    r"\.svn/",
+    r"dist/",
+    r"build/",
+    r"\.next/",
+    r"coverage/",
+]
+
+# Files that typically generate false positives
+NOISY_FILES = [
+    r"\.test\.(js|ts|py)$",
+    r"\.spec\.(js|ts)$",
+    r"_test\.py$",
+    r"test_.*\.py$",
+    r"__mocks__/",
+    r"fixtures/",
+    r"\.stories\.(js|ts|tsx)$",
+    r"\.config\.(js|ts|mjs)$",
+]
+
+GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+@dataclass(frozen=True)
+class PathClass:
+    """What the pipeline needs to know about a file path."""
+    excluded: bool
+    language: str
+    noisy: bool
+
+
+def file_pattern_regex(pattern: str) -> str:
+    """
+    Regex for an excluded file pattern. Patterns are regexes searched in
+    the path; one that isn't a valid regex (e.g. "*.lock") is a glob.
+    """
+    try:
+        re.compile(pattern)
+        return pattern
+    except re.error:
+        return fnmatch.translate(pattern)
+
+
+def excluded_path_regex(path: str) -> str:
+    """
+    Regex for an excluded path: a directory or file prefix of the path
+    (e.g. "docs" or "src/generated/"), or a glob over the whole path.
+    """
+    if GLOB_CHARS.search(path):
+        return fnmatch.translate(path.lstrip("/"))
+    return "^" + re.escape(path.strip("/")) + "(?:/|$)"
+
+
+class _AnyPattern:
+    """
+    Searches for any of a set of patterns with one combined alternation,
+    or one by one if they can't be combined (e.g. clashing group names).
+    """
+
+    def __init__(self, patterns: list[str]):
+        self._combined: Optional[re.Pattern] = None
+        self._each: list[re.Pattern] = []
+        if not patterns:
+            return
+        try:
+            self._combined = re.compile("|".join(f"(?:{p})" for p in patterns))
+        except re.error:
+            self._each = [re.compile(p) for p in patterns]
+
+    def search(self, path: str) -> bool:
+        if self._combined is not None:
+            return self._combined.search(path) is not None
+        return any(pattern.search(path) for pattern in self._each)
+
+
+class PathClassifier:
+    """
+    Classifies file paths as excluded, noisy and by language for one repo
+    config.
+
+    Built-in and the repo's exclusion patterns are compiled into a single
+    regex, as are the noisy-file patterns, and languages are looked up by
+    extension in one dict probe. Results are memoized per path, so a path
+    seen by the diff parser, the rules and the noise filter is classified
+    once.
+    """
+
+    def __init__(
+        self,
+        excluded_patterns: tuple[str, ...] = (),
+        excluded_paths: tuple[str, ...] = (),
+    ):
+        patterns = EXCLUDED_PATTERNS + [file_pattern_regex(p) for p in excluded_patterns]
+        patterns += [excluded_path_regex(p) for p in excluded_paths if p.strip("/")]
+        self._excluded = _AnyPattern(patterns)
+        self._noisy = _AnyPattern(NOISY_FILES)
+        self.classify = lru_cache(maxsize=PATH_CACHE_SIZE)(self._classify)
+
+    def _classify(self, path: str) -> PathClass:
+        dot = path.rfind(".")
+        return PathClass(
+            excluded=self._excluded.search(path),
+            language=LANGUAGE_MAP.get(path[dot:], "unknown") if dot >= 0 else "unknown",
+            noisy=self._noisy.search(path),
+        )
+
+    def is_excluded(self, path: str) -> bool:
+        return self.classify(path).excluded
+
+    def language(self, path: str) -> str:
+        return self.classify(path).language
+
+    def is_noisy(self, path: str) -> bool:
+        return self.classify(path).noisy
+
+
+@lru_cache(maxsize=64)
+def _cached_classifier(excluded_patterns: tuple[str, ...], excluded_paths: tuple[str, ...]) -> PathClassifier:
+    return PathClassifier(excluded_patterns, excluded_paths)
+
+
+def get_path_classifier(
+    excluded_patterns: Optional[list[str]] = None,
+    excluded_paths: Optional[list[str]] = None,
+) -> PathClassifier:
+    """Get the cached classifier for a repo's exclusion config."""
+    return _cached_classifier(tuple(excluded_patterns or ()), tuple(excluded_paths or ()))
@@ -0,0 +1,95 @@
+# ===========================================
+# Python Worker - Pipeline Stage Scheduler
+# ===========================================
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class Stage:
+    """A pipeline stage and the stages whose results it needs."""
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+    shielded: bool = False  # Not cancelled when a sibling stage fails
+
+
+@dataclass
+class StageScheduler:
+    """
+    Run pipeline stages as a DAG.
+
+    Each stage starts as soon as all of its dependencies have finished and
+    receives their results as keyword arguments, so independent stages
+    (e.g. saving findings and posting the review) overlap. Wall-clock time
+    per stage is recorded in `timings` (milliseconds).
+
+    If a stage fails, the others are cancelled, except shielded ones
+    (e.g. saving findings), which run to completion first.
+    """
+    stages: dict[str, Stage] = field(default_factory=dict)
+    timings: dict[str, int] = field(default_factory=dict)
+    tasks: dict[str, asyncio.Task] = field(default_factory=dict)
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        deps: tuple[str, ...] = (),
+        shielded: bool = False,
+    ) -> None:
+        """Register a stage."""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+        self.stages[name] = Stage(name=name, fn=fn, deps=deps, shielded=shielded)
+
+    @asynccontextmanager
+    async def timed(self, name: str):
+        """Record the wall-clock time of an inline stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = int((time.perf_counter() - started) * 1000)
+
+    async def _run_stage(self, stage: Stage) -> Any:
+        results = {dep: await self.tasks[dep] for dep in stage.deps}
+        async with self.timed(stage.name):
+            return await stage.fn(**results)
+
+    async def run(self) -> dict[str, Any]:
+        """Run all stages and return their results by name."""
+        # Stages can only depend on earlier ones, so insertion order is topological
+        for stage in self.stages.values():
+            self.tasks[stage.name] = asyncio.create_task(
+                self._run_stage(stage),
+                name=f"stage:{stage.name}",
+            )
+
+        try:
+            # Cancelling the gather cancels its children; shield those that must finish
+            await asyncio.gather(*[
+                asyncio.shield(self.tasks[stage.name]) if stage.shielded else self.tasks[stage.name]
+                for stage in self.stages.values()
+            ])
+        except BaseException:
+            for stage in self.stages.values():
+                if not stage.shielded:
+                    self.tasks[stage.name].cancel()
+            await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+            raise
+
+        logger.debug("Pipeline stages complete", timings=self.timings)
+        return {name: task.result() for name, task in self.tasks.items()}
+
+    def started(self, name: str) -> asyncio.Task:
+        """Get the task of a running stage, e.g. to wait on it with a deadline."""
+        return self.tasks[name]
@@ -4,10 +4,21 @@ from .engine import (
     Severity,
     Category,
     Confidence,
+    HunkContext,
+    build_hunk_context,
     run_static_analysis,
+    analyze_files,
     get_rules_for_file,
+    get_rule_matcher,
+    warm_rule_matchers,
+    RuleMatcher,
     ALL_RULES,
 )
+from .parallel import (
+    run_static_analysis_async,
+    shard_files,
+    shutdown_static_executor,
+)
 from .security import SECURITY_RULES
 from .quality import QUALITY_RULES
 from .performance import PERFORMANCE_RULES
@@ -18,8 +29,17 @@ __all__ = [
     "Severity",
     "Category",
     "Confidence",
+    "HunkContext",
+    "build_hunk_context",
     "run_static_analysis",
+    "analyze_files",
+    "run_static_analysis_async",
+    "shard_files",
+    "shutdown_static_executor",
     "get_rules_for_file",
+    "get_rule_matcher",
+    "warm_rule_matchers",
+    "RuleMatcher",
     "ALL_RULES",
     "SECURITY_RULES",
     "QUALITY_RULES",
@@ -3,13 +3,21 @@
 # ===========================================
 
 import re
-from abc import ABC, abstractmethod
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+from abc import ABC
 from dataclasses import dataclass
 from typing import Optional, Callable
+from functools import lru_cache, cached_property
+from bisect import bisect_right
 from enum import Enum
 import structlog
 
-from ..pipeline.diff_processor import ParsedFile, ParsedHunk
+from ..pipeline.diff_processor import HunkLines, ParsedFile, ParsedHunk
+from ..pipeline.path_classifier import LANGUAGE_MAP
 
 logger = structlog.get_logger(__name__)
 
@@ -52,6 +60,52 @@ class StaticFinding:
     code_snippet: Optional[str] = None
 
 
+# Loop keywords multi-line rules use to tell whether a hunk contains loops
+LOOP_KEYWORD_PATTERN = re.compile(r'for\s|while\s|\.forEach|\.map\(')
+
+
+@dataclass
+class HunkContext:
+    """
+    Analysis context for a single hunk, built once and shared by all
+    multi-line rules instead of each rule rebuilding it per added line.
+    """
+    additions: HunkLines  # (line_no, content)
+    text: str  # Added lines joined with newlines
+    
+    @cached_property
+    def line_offsets(self) -> list[int]:
+        """Offset in text where each added line starts."""
+        offsets = []
+        pos = 0
+        for _, content in self.additions:
+            offsets.append(pos)
+            pos += len(content) + 1
+        return offsets
+    
+    @cached_property
+    def indentation(self) -> list[int]:
+        """Leading whitespace width of each added line."""
+        return [len(content) - len(content.lstrip()) for _, content in self.additions]
+    
+    @cached_property
+    def loop_positions(self) -> list[int]:
+        """Offsets in text where loop keywords start."""
+        return [m.start() for m in LOOP_KEYWORD_PATTERN.finditer(self.text)]
+    
+    def line_index_at(self, offset: int) -> int:
+        """Get the index into additions of the line containing a text offset."""
+        return bisect_right(self.line_offsets, offset) - 1
+
+
+def build_hunk_context(hunk: ParsedHunk) -> HunkContext:
+    """Build the shared analysis context for a hunk."""
+    return HunkContext(
+        additions=hunk.additions,
+        text="\n".join(content for _, content in hunk.additions),
+    )
+
+
 class StaticRule(ABC):
     """Base class for static analysis rules."""
     
@@ -63,10 +117,38 @@ class StaticRule(ABC):
     confidence: Confidence
     languages: list[str]  # Empty means all languages
     
-    @abstractmethod
+    # Line patterns, either raw strings or (pattern, label) tuples.
+    # Compiled once per rule instance when the registry is loaded.
+    PATTERNS: list = []
+    PATTERN_FLAGS: int = 0
+    
+    # Line-scoped rules are checked per added line via check() and only
+    # fire on lines matching one of PATTERNS, which lets the engine skip
+    # them via the combined RuleMatcher. Other rules look at the whole
+    # hunk and are run once per hunk via check_hunk().
+    line_scoped: bool = True
+    
+    def __init__(self) -> None:
+        self.compiled_patterns: list[re.Pattern] = [
+            re.compile(source, self.PATTERN_FLAGS) for source in self.pattern_sources()
+        ]
+    
+    def pattern_sources(self) -> list[str]:
+        """Get raw pattern strings, dropping any labels."""
+        return [p[0] if isinstance(p, tuple) else p for p in self.PATTERNS]
+    
+    @property
+    def is_line_gated(self) -> bool:
+        """Check if the rule can be skipped for lines none of its patterns match."""
+        return self.line_scoped and bool(self.PATTERNS)
+    
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
         """Check a line for rule violations."""
-        pass
+        return None
+    
+    def check_hunk(self, file: ParsedFile, hunk: ParsedHunk, context: HunkContext) -> list[StaticFinding]:
+        """Check a whole hunk for rule violations (multi-line rules)."""
+        return []
     
     def applies_to(self, file: ParsedFile) -> bool:
         """Check if rule applies to file."""
@@ -96,10 +178,11 @@ class SQLInjectionRule(StaticRule):
         r'raw\s*\(\s*["\'].*\+',
         r'\.query\s*\(\s*`.*\$\{',
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -133,10 +216,11 @@ class HardcodedSecretRule(StaticRule):
         (r'(?:aws_secret|aws_access)\s*[=:]\s*["\'][A-Za-z0-9/+=]{20,}["\']', "AWS credential"),
         (r'-----BEGIN (?:RSA |DSA |EC )?PRIVATE KEY-----', "private key"),
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern, secret_type in self.PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
+        for pattern, (_, secret_type) in zip(self.compiled_patterns, self.PATTERNS):
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -171,10 +255,11 @@ class InsecureHashRule(StaticRule):
         r'MessageDigest\.getInstance\s*\(\s*["\']MD5["\']',
         r'MessageDigest\.getInstance\s*\(\s*["\']SHA-1["\']',
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -218,8 +303,8 @@ class NullCheckRule(StaticRule):
         if "?." in content or "!= null" in content or "!== null" in content:
             return None
         
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -253,8 +338,8 @@ class SwallowedExceptionRule(StaticRule):
     ]
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content.replace("\n", " ")):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content.replace("\n", " ")):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -290,26 +375,30 @@ class NPlusOneQueryRule(StaticRule):
         r'\.forEach\s*\([^)]*\)\s*=>\s*{[^}]*\.find',
         r'\.map\s*\([^)]*\)\s*=>\s*{[^}]*await.*\.get',
     ]
+    PATTERN_FLAGS = re.MULTILINE
+    line_scoped = False
     
-    def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        context = "\n".join([c for _, c in hunk.additions])
-        for pattern in self.PATTERNS:
-            if re.search(pattern, context, re.MULTILINE):
-                return StaticFinding(
-                    rule_id=self.id,
-                    rule_name=self.name,
-                    file_path=file.path,
-                    line_start=line_no,
-                    line_end=line_no,
-                    category=self.category,
-                    severity=self.severity,
-                    confidence=self.confidence,
-                    title="Potential N+1 query pattern",
-                    message="Database query inside a loop may cause performance issues at scale.",
-                    suggestion="Consider using batch queries, joins, or eager loading.",
-                    code_snippet=content.strip(),
-                )
-        return None
+    def check_hunk(self, file: ParsedFile, hunk: ParsedHunk, context: HunkContext) -> list[StaticFinding]:
+        if not any(pattern.search(context.text) for pattern in self.compiled_patterns):
+            return []
+        
+        return [
+            StaticFinding(
+                rule_id=self.id,
+                rule_name=self.name,
+                file_path=file.path,
+                line_start=line_no,
+                line_end=line_no,
+                category=self.category,
+                severity=self.severity,
+                confidence=self.confidence,
+                title="Potential N+1 query pattern",
+                message="Database query inside a loop may cause performance issues at scale.",
+                suggestion="Consider using batch queries, joins, or eager loading.",
+                code_snippet=content.strip(),
+            )
+            for line_no, content in context.additions
+        ]
 
 
 # ===========================================
@@ -339,12 +428,151 @@ def get_rules_for_file(file: ParsedFile, enabled: Optional[list[str]] = None, di
     return rules
 
 
-def run_static_analysis(
+# ===========================================
+# Compiled Rule Matcher
+# ===========================================
+
+def _required_literals(parsed) -> set[str]:
+    """
+    Find literals of which at least one must appear in any match.
+    
+    Walks the parsed pattern and keeps the strongest requirement seen:
+    a run of literal characters, or the alternatives of a group/branch.
+    An empty set means no requirement could be derived.
+    """
+    best: set[str] = set()
+    run = ""
+    
+    def strength(literals: set[str]) -> int:
+        return min(map(len, literals)) if literals else 0
+    
+    for op, av in list(parsed) + [(None, None)]:
+        if op is sre_constants.LITERAL:
+            run += chr(av)
+            continue
+        
+        candidates = [{run}] if run else []
+        run = ""
+        
+        if op is sre_constants.SUBPATTERN:
+            candidates.append(_required_literals(av[-1]))
+        elif op is sre_constants.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            if branches and all(branches):
+                candidates.append(set().union(*branches))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            candidates.append(_required_literals(av[2]))
+        
+        for literals in candidates:
+            if strength(literals) > strength(best):
+                best = literals
+    
+    return best
+
+
+def _rule_keywords(rule: StaticRule) -> set[str]:
+    """Get lowercase keywords one of which must appear on any line the rule flags."""
+    keywords: set[str] = set()
+    for source in rule.pattern_sources():
+        literals = _required_literals(sre_parse.parse(source))
+        if not literals or not all(literal.isascii() for literal in literals):
+            return set()
+        keywords.update(literal.lower() for literal in literals)
+    return keywords
+
+
+class RuleMatcher:
+    """
+    Single scanner over the line patterns of a set of rules.
+    
+    Every line-gated rule contributes the keywords its patterns require
+    (e.g. "hashlib.md5", "execute") to one alternation, so a line that
+    contains none of them costs a single regex search. At each keyword
+    hit, a probe with one named lookahead group per rule finds every
+    rule whose keyword is there; only those rules run their own checks.
+    """
+    
+    def __init__(self, rules: tuple[StaticRule, ...]):
+        self.rules = rules
+        self.gated = [rule.is_line_gated for rule in rules]
+        self.unanchored: set[int] = set()
+        
+        alternatives = []
+        probes = []
+        for i, rule in enumerate(rules):
+            if not rule.is_line_gated:
+                continue
+            keywords = _rule_keywords(rule)
+            if not keywords:
+                self.unanchored.add(i)
+                continue
+            body = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+            alternatives.append(body)
+            probes.append(f"(?:(?=(?P<r{i}>{body})))?")
+        
+        self.keyword_count = len(probes)
+        self._any = re.compile("|".join(alternatives)) if alternatives else None
+        self._probe = re.compile("".join(probes)) if probes else None
+    
+    def matched_rules(self, content: str) -> set[int]:
+        """Get indexes of gated rules whose keywords appear on the line."""
+        hits: set[int] = set()
+        if self._any is None:
+            return hits
+        
+        lowered = content.lower()
+        pos = 0
+        while len(hits) < self.keyword_count:
+            match = self._any.search(lowered, pos)
+            if match is None:
+                break
+            probe = self._probe.match(lowered, match.start())
+            hits.update(int(name[1:]) for name, value in probe.groupdict().items() if value is not None)
+            pos = match.start() + 1
+        
+        return hits
+    
+    def rules_for_line(self, content: str) -> list[StaticRule]:
+        """Get the rules worth running on a line, in registry order."""
+        hits = self.matched_rules(content)
+        return [
+            rule for i, rule in enumerate(self.rules)
+            if not self.gated[i] or i in hits or i in self.unanchored
+        ]
+
+
+@lru_cache(maxsize=64)
+def get_rule_matcher(rules: tuple[StaticRule, ...]) -> RuleMatcher:
+    """Get the cached matcher for a set of rules (one per language/config)."""
+    return RuleMatcher(rules)
+
+
+def warm_rule_matchers() -> None:
+    """Build the default matcher for every known language ahead of the first job."""
+    for language in {*LANGUAGE_MAP.values(), "unknown"}:
+        file = ParsedFile(
+            path="",
+            old_path=None,
+            status="modified",
+            language=language,
+            additions=0,
+            deletions=0,
+        )
+        get_rule_matcher(tuple(r for r in get_rules_for_file(file) if r.line_scoped))
+
+
+def analyze_files(
     files: list[ParsedFile],
     enabled_rules: Optional[list[str]] = None,
     disabled_rules: Optional[list[str]] = None,
+    compiled: bool = True,
 ) -> list[StaticFinding]:
-    """Run static analysis on all files."""
+    """
+    Run all applicable rules over files and return findings in file order.
+    
+    compiled: scan each line once with the combined RuleMatcher and only
+    dispatch to rules that hit. When False, every rule checks every line.
+    """
     findings: list[StaticFinding] = []
     
     for file in files:
@@ -352,13 +580,34 @@ def run_static_analysis(
             continue
         
         rules = get_rules_for_file(file, enabled_rules, disabled_rules)
+        line_rules = [r for r in rules if r.line_scoped]
+        hunk_rules = [r for r in rules if not r.line_scoped]
+        matcher = get_rule_matcher(tuple(line_rules)) if compiled else None
         
         for hunk in file.hunks:
             for line_no, content in hunk.additions:
-                for rule in rules:
+                candidates = matcher.rules_for_line(content) if matcher else line_rules
+                for rule in candidates:
                     finding = rule.check(file, hunk, line_no, content)
                     if finding:
                         findings.append(finding)
+            
+            if hunk_rules and hunk.additions:
+                context = build_hunk_context(hunk)
+                for rule in hunk_rules:
+                    findings.extend(rule.check_hunk(file, hunk, context))
+    
+    return findings
+
+
+def run_static_analysis(
+    files: list[ParsedFile],
+    enabled_rules: Optional[list[str]] = None,
+    disabled_rules: Optional[list[str]] = None,
+    compiled: bool = True,
+) -> list[StaticFinding]:
+    """Run static analysis on all files."""
+    findings = analyze_files(files, enabled_rules, disabled_rules, compiled)
     
     logger.info("Static analysis complete", finding_count=len(findings))
     return findings
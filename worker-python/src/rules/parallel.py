@@ -0,0 +1,124 @@
+# ===========================================
+# Python Worker - Parallel Static Analysis
+# ===========================================
+
+import asyncio
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+import structlog
+
+from ..config import settings
+from ..pipeline.diff_processor import ParsedFile
+from .engine import StaticFinding, analyze_files
+
+logger = structlog.get_logger(__name__)
+
+_executor: Optional[Executor] = None
+
+
+def is_free_threaded() -> bool:
+    """Check if running on a free-threaded (no GIL) Python build."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def get_static_workers() -> int:
+    """Get the number of static analysis workers to use."""
+    return settings.static_analysis_workers or os.cpu_count() or 1
+
+
+def get_static_executor() -> Executor:
+    """Get or create the executor used for parallel static analysis."""
+    global _executor
+
+    if _executor is None:
+        workers = get_static_workers()
+        if is_free_threaded():
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="static")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        logger.info(
+            "Static analysis executor initialized",
+            workers=workers,
+            kind=type(_executor).__name__,
+        )
+
+    return _executor
+
+
+def shutdown_static_executor() -> None:
+    """Shut down the static analysis executor."""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        logger.info("Static analysis executor shut down")
+
+
+def shard_files(files: list[ParsedFile], shard_count: int) -> list[list[ParsedFile]]:
+    """
+    Split files into contiguous shards of roughly equal added lines.
+
+    Shards keep the original file order so concatenating their results
+    gives the same ordering as the serial path.
+    """
+    files = [f for f in files if not f.is_binary]
+    if shard_count <= 1 or len(files) <= 1:
+        return [files] if files else []
+
+    total = sum(f.additions for f in files) or len(files)
+    target = total / shard_count
+
+    shards: list[list[ParsedFile]] = [[]]
+    weight = 0
+    for file in files:
+        if weight >= target and len(shards) < shard_count:
+            shards.append([])
+            weight = 0
+        shards[-1].append(file)
+        weight += file.additions or 1
+
+    return shards
+
+
+async def run_static_analysis_async(
+    files: list[ParsedFile],
+    enabled_rules: Optional[list[str]] = None,
+    disabled_rules: Optional[list[str]] = None,
+) -> list[StaticFinding]:
+    """
+    Run static analysis off the event loop.
+
+    Large diffs are sharded by file across the static executor (processes,
+    or threads on free-threaded builds); smaller ones, or any diff when
+    only one worker is available, run in a single thread. Findings are
+    merged in the same order as the serial path.
+
+    In fork mode the executor is never created: each job runs in an RQ
+    work-horse that exits with os._exit(), which would orphan the pool's
+    processes, so analysis always runs in a single thread.
+    """
+    loop = asyncio.get_running_loop()
+    added_lines = sum(f.additions for f in files if not f.is_binary)
+
+    if (
+        settings.worker_mode == "fork"
+        or added_lines < settings.static_parallel_min_lines
+        or get_static_workers() <= 1
+    ):
+        findings = await asyncio.to_thread(analyze_files, files, enabled_rules, disabled_rules)
+    else:
+        shards = shard_files(files, get_static_workers())
+        executor = get_static_executor()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, analyze_files, shard, enabled_rules, disabled_rules)
+            for shard in shards
+        ])
+        findings = [finding for shard_findings in results for finding in shard_findings]
+        logger.debug("Ran sharded static analysis", shard_count=len(shards))
+
+    logger.info("Static analysis complete", finding_count=len(findings))
+    return findings
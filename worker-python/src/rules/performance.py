@@ -4,7 +4,7 @@
 
 import re
 from typing import Optional
-from .engine import StaticRule, StaticFinding, Category, Severity, Confidence
+from .engine import StaticRule, StaticFinding, HunkContext, Category, Severity, Confidence
 from ..pipeline.diff_processor import ParsedFile, ParsedHunk
 
 
@@ -18,41 +18,44 @@ class NestedLoopRule(StaticRule):
     confidence = Confidence.LOW
     languages = ["python", "javascript", "typescript", "java"]
     
-    def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        # Look for loop inside loop patterns
-        context = "\n".join([c for _, c in hunk.additions])
-        
-        # Count indentation levels with loops
-        loop_patterns = [
-            r'for\s+.*:',      # Python
-            r'for\s*\(',       # JS/Java
-            r'while\s+.*:',    # Python
-            r'while\s*\(',     # JS/Java
-        ]
-        
+    line_scoped = False
+    
+    # Loop headers; a line is only flagged if it is one of these
+    PATTERNS = [
+        r'for\s+.*:',      # Python
+        r'for\s*\(',       # JS/Java
+        r'while\s+.*:',    # Python
+        r'while\s*\(',     # JS/Java
+    ]
+    
+    def check_hunk(self, file: ParsedFile, hunk: ParsedHunk, context: HunkContext) -> list[StaticFinding]:
+        # Count loops across the added code
         loop_count = 0
-        for pattern in loop_patterns:
-            loop_count += len(re.findall(pattern, context))
+        for pattern in self.compiled_patterns:
+            loop_count += len(pattern.findall(context.text))
         
-        # Only flag if this specific line is a loop and context has multiple
-        if loop_count >= 2:
-            for pattern in loop_patterns:
-                if re.search(pattern, content):
-                    return StaticFinding(
-                        rule_id=self.id,
-                        rule_name=self.name,
-                        file_path=file.path,
-                        line_start=line_no,
-                        line_end=line_no,
-                        category=self.category,
-                        severity=self.severity,
-                        confidence=self.confidence,
-                        title="Nested loops detected",
-                        message="Nested loops can lead to O(n²) or worse time complexity.",
-                        suggestion="Consider using maps/sets for lookups, or restructuring the algorithm.",
-                        code_snippet=content.strip()[:100],
-                    )
-        return None
+        # Only flag loop lines, and only if the hunk has multiple loops
+        if loop_count < 2:
+            return []
+        
+        findings = []
+        for line_no, content in context.additions:
+            if any(pattern.search(content) for pattern in self.compiled_patterns):
+                findings.append(StaticFinding(
+                    rule_id=self.id,
+                    rule_name=self.name,
+                    file_path=file.path,
+                    line_start=line_no,
+                    line_end=line_no,
+                    category=self.category,
+                    severity=self.severity,
+                    confidence=self.confidence,
+                    title="Nested loops detected",
+                    message="Nested loops can lead to O(n²) or worse time complexity.",
+                    suggestion="Consider using maps/sets for lookups, or restructuring the algorithm.",
+                    code_snippet=content.strip()[:100],
+                ))
+        return findings
 
 
 class StringConcatInLoopRule(StaticRule):
@@ -71,29 +74,31 @@ class StringConcatInLoopRule(StaticRule):
         r'\.concat\s*\(',
     ]
     
-    def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        # Check if we're likely in a loop context
-        context = "\n".join([c for _, c in hunk.additions])
-        in_loop = any(re.search(p, context) for p in [r'for\s', r'while\s', r'\.forEach', r'\.map\('])
+    line_scoped = False
+    
+    def check_hunk(self, file: ParsedFile, hunk: ParsedHunk, context: HunkContext) -> list[StaticFinding]:
+        # Only flag concatenation if we're likely in a loop context
+        if not context.loop_positions:
+            return []
         
-        if in_loop:
-            for pattern in self.PATTERNS:
-                if re.search(pattern, content):
-                    return StaticFinding(
-                        rule_id=self.id,
-                        rule_name=self.name,
-                        file_path=file.path,
-                        line_start=line_no,
-                        line_end=line_no,
-                        category=self.category,
-                        severity=self.severity,
-                        confidence=self.confidence,
-                        title="String concatenation in loop",
-                        message="String concatenation in loops creates many intermediate strings.",
-                        suggestion="Use array join() or StringBuilder. In Python, use list append with join.",
-                        code_snippet=content.strip()[:100],
-                    )
-        return None
+        findings = []
+        for line_no, content in context.additions:
+            if any(pattern.search(content) for pattern in self.compiled_patterns):
+                findings.append(StaticFinding(
+                    rule_id=self.id,
+                    rule_name=self.name,
+                    file_path=file.path,
+                    line_start=line_no,
+                    line_end=line_no,
+                    category=self.category,
+                    severity=self.severity,
+                    confidence=self.confidence,
+                    title="String concatenation in loop",
+                    message="String concatenation in loops creates many intermediate strings.",
+                    suggestion="Use array join() or StringBuilder. In Python, use list append with join.",
+                    code_snippet=content.strip()[:100],
+                ))
+        return findings
 
 
 class UnboundedQueryRule(StaticRule):
@@ -112,14 +117,15 @@ class UnboundedQueryRule(StaticRule):
         r'SELECT\s+\*\s+FROM',
         r'\.all\s*\(\s*\)',
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
         # Skip if limit is present
         if 'limit' in content.lower() or 'take' in content.lower():
             return None
             
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -24,11 +24,11 @@ class TodoFIXMERule(StaticRule):
         r'HACK[:\s]',
         r'XXX[:\s]',
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        content_upper = content.upper()
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content_upper):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -64,10 +64,11 @@ class DebugCodeRule(StaticRule):
         r'pdb\.set_trace\s*\(',
         r'breakpoint\s*\(',
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -95,12 +96,16 @@ class MagicNumberRule(StaticRule):
     confidence = Confidence.LOW
     languages = ["python", "javascript", "typescript", "java"]
     
+    # Numbers in comparisons or assignments
+    PATTERNS = [
+        r'[=<>]\s*(\d{3,})\b',
+    ]
+    
     # Only flag larger numbers, skip common ones
     EXEMPT_NUMBERS = {0, 1, 2, 10, 100, 1000}
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        # Find numbers in comparisons or assignments
-        matches = re.findall(r'[=<>]\s*(\d{3,})\b', content)
+        matches = self.compiled_patterns[0].findall(content)
         
         for match in matches:
             num = int(match)
@@ -26,10 +26,11 @@ class CommandInjectionRule(StaticRule):
         r'child_process\.exec\s*\(',
         r'`\$\{.*\}`',
     ]
+    PATTERN_FLAGS = re.IGNORECASE
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -66,8 +67,8 @@ class PathTraversalRule(StaticRule):
     ]
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -105,8 +106,8 @@ class XSSRule(StaticRule):
     ]
     
     def check(self, file: ParsedFile, hunk: ParsedHunk, line_no: int, content: str) -> Optional[StaticFinding]:
-        for pattern in self.PATTERNS:
-            if re.search(pattern, content):
+        for pattern in self.compiled_patterns:
+            if pattern.search(content):
                 return StaticFinding(
                     rule_id=self.id,
                     rule_name=self.name,
@@ -0,0 +1,66 @@
+# ===========================================
+# Python Worker - Run Stats Command
+# ===========================================
+#
+# Backfills or repairs the daily run stats rollups from the runs
+# themselves, and prints an organization's stats from them:
+#
+#   python -m src.stats rebuild [--org ORG_ID] [--days 90]
+#   python -m src.stats show --org ORG_ID [--repo REPO_ID] [--days 30]
+#
+# Without --org, rebuild covers every organization.
+
+import argparse
+import asyncio
+import json
+import structlog
+
+from .config import init_database, close_database
+from .models.Organization import Organization
+from .output.storage import get_run_stats, rebuild_run_stats
+
+logger = structlog.get_logger(__name__)
+
+
+async def rebuild(org_id: str | None, days: int) -> None:
+    """Recompute the rollups of one organization, or of all of them."""
+    if org_id:
+        org_ids = [org_id]
+    else:
+        org_ids = [str(org.id) for org in await Organization.find_all().to_list()]
+
+    for org_id in org_ids:
+        await rebuild_run_stats(org_id, days)
+        logger.info("Rebuilt run stats", org_id=org_id, days=days)
+
+
+async def run(args: argparse.Namespace) -> None:
+    await init_database()
+    try:
+        if args.command == "rebuild":
+            await rebuild(args.org, args.days)
+        else:
+            stats = await get_run_stats(args.org, args.days, args.repo)
+            print(json.dumps(stats, indent=2))
+    finally:
+        await close_database()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.stats", description="Daily run stats rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = commands.add_parser("rebuild", help="Recompute rollups from runs")
+    rebuild_parser.add_argument("--org", help="Organization id (default: every organization)")
+    rebuild_parser.add_argument("--days", type=int, default=90, help="Days to recompute (default: 90)")
+
+    show_parser = commands.add_parser("show", help="Print an organization's run stats")
+    show_parser.add_argument("--org", required=True, help="Organization id")
+    show_parser.add_argument("--repo", help="Limit to one repository id")
+    show_parser.add_argument("--days", type=int, default=30, help="Days to cover (default: 30)")
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from .loop import (
+    PersistentLoop,
+    start_persistent_loop,
+    stop_persistent_loop,
+    has_persistent_loop,
+    run_async,
+)
+from .async_worker import AsyncWorker
+
+__all__ = [
+    "PersistentLoop",
+    "start_persistent_loop",
+    "stop_persistent_loop",
+    "has_persistent_loop",
+    "run_async",
+    "AsyncWorker",
+]
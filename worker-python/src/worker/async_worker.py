@@ -0,0 +1,200 @@
+# ===========================================
+# Python Worker - Async Job Worker
+# ===========================================
+
+import asyncio
+import signal
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+import structlog
+from redis import Redis
+from rq import Queue
+from rq.defaults import DEFAULT_RESULT_TTL
+from rq.job import Job, JobStatus
+from rq.utils import now
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+JobHandler = Callable[..., Awaitable[Any]]
+
+DEQUEUE_TIMEOUT_SECONDS = 5
+# Extra time a job stays in the started registry past its timeout
+REGISTRY_TTL_GRACE_SECONDS = 60
+
+
+class AsyncWorker:
+    """
+    Run RQ jobs as asyncio tasks, up to `concurrency` at a time.
+
+    Jobs whose function has a registered coroutine handler run on this
+    loop; any other job function runs in a thread (and can't be cancelled).
+    Each job is bounded by its RQ timeout, or JOB_TIMEOUT_SECONDS. On
+    SIGTERM/SIGINT the worker stops taking jobs and waits up to the drain
+    timeout for in-flight ones; a second signal cancels them immediately.
+    Cancelled or timed-out jobs are failed, or retried if they have
+    retries left.
+    """
+
+    def __init__(
+        self,
+        queue_names: list[str],
+        connection: Redis,
+        handlers: dict[str, JobHandler],
+        concurrency: Optional[int] = None,
+        job_timeout: Optional[int] = None,
+        drain_timeout: Optional[float] = None,
+    ) -> None:
+        self.connection = connection
+        self.queues = [Queue(name, connection=connection) for name in queue_names]
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.job_timeout = job_timeout or settings.job_timeout_seconds
+        self.drain_timeout = drain_timeout if drain_timeout is not None else self.job_timeout
+        self.name = f"async-worker-{settings.node_env}-{uuid.uuid4().hex[:8]}"
+        self.jobs_succeeded = 0
+        self.jobs_failed = 0
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+
+    def request_stop(self) -> None:
+        """Stop taking jobs; on a second call, cancel in-flight jobs too."""
+        if self._stopping.is_set():
+            logger.warning("Cancelling in-flight jobs", count=len(self._tasks))
+            for task in self._tasks:
+                task.cancel()
+            return
+
+        logger.info("Draining worker", in_flight=len(self._tasks))
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Take and run jobs until stopped, then drain."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.request_stop)
+
+        logger.info(
+            "Starting async worker",
+            name=self.name,
+            queues=[q.name for q in self.queues],
+            concurrency=self.concurrency,
+        )
+
+        try:
+            while await self._acquire_slot():
+                dequeued = await asyncio.to_thread(
+                    Queue.dequeue_any,
+                    self.queues,
+                    DEQUEUE_TIMEOUT_SECONDS,
+                    connection=self.connection,
+                )
+                if dequeued is None:
+                    self._slots.release()
+                    continue
+
+                job, queue = dequeued
+                task = asyncio.create_task(self._perform(job, queue), name=f"job:{job.id}")
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            await self._drain()
+        finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+
+        logger.info(
+            "Async worker stopped",
+            jobs_succeeded=self.jobs_succeeded,
+            jobs_failed=self.jobs_failed,
+        )
+
+    async def _acquire_slot(self) -> bool:
+        """Wait for a free job slot; False once the worker is stopping."""
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({acquire, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+
+        if not acquire.done():
+            acquire.cancel()
+            return False
+        if self._stopping.is_set():
+            self._slots.release()
+            return False
+        return True
+
+    async def _drain(self) -> None:
+        if not self._tasks:
+            return
+
+        logger.info("Waiting for in-flight jobs", count=len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _perform(self, job: Job, queue: Queue) -> None:
+        timeout = job.timeout if job.timeout and job.timeout > 0 else self.job_timeout
+        deadline = asyncio.timeout(timeout)
+
+        try:
+            await asyncio.to_thread(self._mark_started, job, queue, timeout)
+            async with deadline:
+                result = await self._execute(job)
+        except asyncio.CancelledError:
+            self.jobs_failed += 1
+            await asyncio.shield(asyncio.to_thread(
+                self._mark_failed, job, queue, "Cancelled by worker shutdown",
+            ))
+            raise
+        except Exception as e:
+            self.jobs_failed += 1
+            if deadline.expired():
+                exc_string = f"Job exceeded timeout ({timeout}s)"
+            else:
+                exc_string = traceback.format_exc()
+            logger.error("Job failed", job_id=job.id, error=str(e) or exc_string)
+            await asyncio.to_thread(self._mark_failed, job, queue, exc_string)
+        else:
+            self.jobs_succeeded += 1
+            await asyncio.to_thread(self._mark_finished, job, queue, result)
+        finally:
+            self._slots.release()
+
+    async def _execute(self, job: Job) -> Any:
+        handler = self.handlers.get(job.func_name)
+        if handler is not None:
+            return await handler(*job.args, **job.kwargs)
+        return await asyncio.to_thread(job.func, *job.args, **job.kwargs)
+
+    # RQ bookkeeping runs in threads so Redis round trips don't block the loop
+
+    def _mark_started(self, job: Job, queue: Queue, timeout: int) -> None:
+        with self.connection.pipeline() as pipeline:
+            job.prepare_for_execution(self.name, pipeline)
+            queue.started_job_registry.add(job, timeout + REGISTRY_TTL_GRACE_SECONDS, pipeline)
+            pipeline.lrem(queue.intermediate_queue_key, 1, job.id)
+            pipeline.execute()
+
+    def _mark_finished(self, job: Job, queue: Queue, result: Any) -> None:
+        job._result = result
+        job.ended_at = now()
+        with self.connection.pipeline() as pipeline:
+            job._handle_success(job.get_result_ttl(DEFAULT_RESULT_TTL), pipeline)
+            queue.started_job_registry.remove(job, pipeline)
+            pipeline.execute()
+
+    def _mark_failed(self, job: Job, queue: Queue, exc_string: str) -> None:
+        job.ended_at = now()
+        with self.connection.pipeline() as pipeline:
+            queue.started_job_registry.remove(job, pipeline)
+            if job.retries_left:
+                job.retry(queue, pipeline)
+            else:
+                job.set_status(JobStatus.FAILED, pipeline)
+                job._handle_failure(exc_string, pipeline)
+            pipeline.execute()
@@ -0,0 +1,112 @@
+# ===========================================
+# Python Worker - Persistent Event Loop
+# ===========================================
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class PersistentLoop:
+    """
+    An event loop running on a background thread for the worker's lifetime.
+
+    Jobs submit coroutines from the RQ thread, so the database client,
+    HTTP pools and Redis connections opened on this loop stay warm across
+    jobs instead of dying with a per-job asyncio.run.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self) -> None:
+        """Start the loop thread and wait until it is running."""
+        if self._loop is not None:
+            return
+
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run() -> None:
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(ready.set)
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="worker-loop", daemon=True)
+        self._thread.start()
+        ready.wait()
+        logger.info("Persistent event loop started")
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the loop and block until it finishes.
+
+        If the caller is interrupted (e.g. by RQ's job timeout), the
+        coroutine is cancelled rather than left running on the loop.
+        """
+        if self._loop is None:
+            raise RuntimeError("Persistent event loop is not running")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        if self._loop is None:
+            return
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        logger.info("Persistent event loop stopped")
+
+
+_persistent_loop: Optional[PersistentLoop] = None
+
+
+def start_persistent_loop() -> PersistentLoop:
+    """Start the process-wide persistent loop."""
+    global _persistent_loop
+
+    if _persistent_loop is None:
+        _persistent_loop = PersistentLoop()
+        _persistent_loop.start()
+
+    return _persistent_loop
+
+
+def stop_persistent_loop() -> None:
+    """Stop the process-wide persistent loop."""
+    global _persistent_loop
+
+    if _persistent_loop is not None:
+        _persistent_loop.stop()
+        _persistent_loop = None
+
+
+def has_persistent_loop() -> bool:
+    """Check if the process-wide persistent loop is running."""
+    return _persistent_loop is not None and _persistent_loop.running
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on the persistent loop if running, else in a fresh one."""
+    if has_persistent_loop():
+        return _persistent_loop.run(coro)
+    return asyncio.run(coro)